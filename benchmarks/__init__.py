@@ -0,0 +1 @@
+# Offline benchmarks for the Ignite Travel SDK, run with `python -m benchmarks.run`
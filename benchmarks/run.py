@@ -0,0 +1,203 @@
+"""
+Benchmark every public DimsInventoryClient method against a local stand-in for DIMS
+
+    python -m benchmarks.run --output bench_results.json
+    python -m benchmarks.run --quick --filter bookings
+
+Each scenario reports throughput, latency percentiles, peak traced memory and the per-phase
+timings collected by HistogramCollector. Results are written as JSON so runs can be compared
+across versions.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from importlib import metadata
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from ignite_travel.sdk import DimsInventoryClient, HistogramCollector
+
+from . import synthetic
+from .server import StandInServer
+
+
+RECORDED_DIR = Path(__file__).parent / "recorded"
+
+
+class Scenario:
+
+  def __init__(self, name: str, method: str, responses: Dict[str, bytes], call: Callable[[DimsInventoryClient], object], iterations: int, client_options: dict = None):
+    self.name = name
+    self.method = method
+    self.responses = responses
+    self.call = call
+    self.iterations = iterations
+    self.client_options = client_options or {}
+
+
+def _iso(day: date) -> str:
+  return day.strftime("%Y-%m-%d")
+
+
+def scenarios(quick: bool = False) -> List[Scenario]:
+  resort_id = 1056
+  room_id = 18000
+  rooms = 20 if quick else 200
+  days = 365
+  bookings = 1000 if quick else 10000
+  start = date.today() + timedelta(days=1)
+  end = start + timedelta(days=days - 1)
+  update_dates = [(start + timedelta(days=i)).strftime("%d-%m-%Y") for i in range(days)]
+  update_qty = [i % 10 for i in range(days)]
+  long_days = 3650 if quick else 36500
+  long_dates = [(start + timedelta(days=i)).strftime("%d-%m-%Y") for i in range(long_days)]
+  long_qty = [i % 10 for i in range(long_days)]
+
+  roomlist = synthetic.roomlist(rooms=rooms, rates_per_room=5)
+  availability = synthetic.availability(days=days, start=start)
+  update = synthetic.update_message()
+  booking_list = synthetic.bookings(bookings=bookings)
+  cancelled = synthetic.cancelled_bookings(bookings=bookings)
+  return [
+    Scenario(f"get_roomlist[{rooms} rooms x 5 rates]", "get_roomlist", {"GetRoomList": roomlist},
+             lambda client: client.get_roomlist(resort_id), 50),
+    Scenario(f"retrieve_availability[{days} days]", "retrieve_availability", {"RetrieveAvailability": availability},
+             lambda client: client.retrieve_availability(room_id, resort_id, _iso(start), _iso(end)), 50),
+    Scenario(f"retrieve_availability_for_resort[{days} days x {rooms} rooms]", "retrieve_availability_for_resort",
+             {"GetRoomList": roomlist, "RetrieveAvailability": availability},
+             lambda client: client.retrieve_availability_for_resort(resort_id, _iso(start), _iso(end)), 3),
+    Scenario(f"retrieve_availability_columns[{days} days]", "retrieve_availability_columns", {"RetrieveAvailability": availability},
+             lambda client: client.retrieve_availability_columns(room_id, resort_id, _iso(start), _iso(end)), 50),
+    Scenario(f"retrieve_availability_grid[{days} days x {rooms} rooms]", "retrieve_availability_grid",
+             {"GetRoomList": roomlist, "RetrieveAvailability": availability},
+             lambda client: client.retrieve_availability_grid(resort_id, _iso(start), _iso(end)), 3),
+    Scenario("update_availability[1 day]", "update_availability", {"UpdateInventory": update},
+             lambda client: client.update_availability(room_id, resort_id, update_dates[0], 5), 100),
+    Scenario(f"availability_mass_update[{days} days]", "availability_mass_update", {"UpdateInventory": update},
+             lambda client: client.availability_mass_update(room_id, resort_id, update_dates, update_qty), 50),
+    Scenario(f"availability_mass_update[{long_days} days, streamed]", "availability_mass_update", {"UpdateInventory": update},
+             lambda client: client.availability_mass_update(room_id, resort_id, long_dates, long_qty), 5),
+    Scenario(f"chunked_availability_mass_update[{days} days / 50]", "chunked_availability_mass_update", {"UpdateInventory": update},
+             lambda client: client.chunked_availability_mass_update(room_id, resort_id, update_dates, update_qty, max_dates_per_request=50), 20),
+    Scenario(f"reconcile_availability[{days} days]", "reconcile_availability",
+             {"RetrieveAvailability": availability, "UpdateInventory": update},
+             lambda client: client.reconcile_availability(room_id, resort_id, update_dates, update_qty), 20),
+    Scenario(f"get_bookings[{bookings} bookings]", "get_bookings", {"GetBookingsListWithRoomRateIds": booking_list},
+             lambda client: client.get_bookings(resort_id, "2025-06-01", "2025-06-30"), 3),
+    Scenario(f"iter_bookings[{bookings} bookings]", "iter_bookings", {"GetBookingsListWithRoomRateIds": booking_list},
+             lambda client: sum(1 for _ in client.iter_bookings(resort_id, "2025-06-01", "2025-06-30")), 3),
+    Scenario(f"get_cancelled_bookings[{bookings} bookings]", "get_cancelled_bookings", {"RetrieveCancelledBookings": cancelled},
+             lambda client: client.get_cancelled_bookings(resort_id, "2025-05-01", "2025-05-31"), 3),
+    Scenario(f"retrieve_availability[{days} days, validate_entities=False]", "retrieve_availability", {"RetrieveAvailability": availability},
+             lambda client: client.retrieve_availability(room_id, resort_id, _iso(start), _iso(end)), 50,
+             {"validate_entities": False}),
+    Scenario("get_bookings[recorded]", "get_bookings",
+             {"GetBookingsListWithRoomRateIds": (RECORDED_DIR / "GetBookingsListWithRoomRateIds.xml").read_bytes()},
+             lambda client: client.get_bookings(resort_id, "2025-06-01", "2025-06-30"), 200),
+    Scenario("get_cancelled_bookings[recorded]", "get_cancelled_bookings",
+             {"RetrieveCancelledBookings": (RECORDED_DIR / "RetrieveCancelledBookings.xml").read_bytes()},
+             lambda client: client.get_cancelled_bookings(resort_id, "2025-05-25", "2025-05-31"), 200),
+  ]
+
+
+def _percentile(values: List[float], q: float) -> float:
+  ordered = sorted(values)
+  index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+  return ordered[index]
+
+
+def run_scenario(scenario: Scenario, iterations: int = None) -> dict:
+  iterations = iterations or scenario.iterations
+  with StandInServer(scenario.responses) as server:
+    collector = HistogramCollector()
+    with DimsInventoryClient(instrumentation=collector, **scenario.client_options) as client:
+      client._INVENTORY_SERVICE_URL_ = server.url
+      client._RATES_SERVICE_URL_ = server.url
+      # warm up the connection pool and any lazy imports
+      scenario.call(client)
+      collector.reset()
+
+      latencies = []
+      started = time.perf_counter()
+      for _ in range(iterations):
+        call_started = time.perf_counter()
+        scenario.call(client)
+        latencies.append(time.perf_counter() - call_started)
+      elapsed = time.perf_counter() - started
+      phases = collector.summary()
+
+      tracemalloc.start()
+      scenario.call(client)
+      _, peak_memory = tracemalloc.get_traced_memory()
+      tracemalloc.stop()
+
+  return {
+    "scenario": scenario.name,
+    "method": scenario.method,
+    "iterations": iterations,
+    "throughput_per_s": iterations / elapsed,
+    "latency_s": {
+      "mean": sum(latencies) / len(latencies),
+      "min": min(latencies),
+      "p50": _percentile(latencies, 50),
+      "p95": _percentile(latencies, 95),
+      "p99": _percentile(latencies, 99),
+      "max": max(latencies),
+    },
+    "peak_memory_bytes": peak_memory,
+    "operations": phases,
+  }
+
+
+def _version() -> str:
+  try:
+    return metadata.version("ignite-travel")
+  except metadata.PackageNotFoundError:
+    return "unknown"
+
+
+def main(argv: List[str] = None) -> dict:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--output", default="bench_results.json", help="path of the JSON results file")
+  parser.add_argument("--quick", action="store_true", help="use smaller synthetic responses")
+  parser.add_argument("--iterations", type=int, default=None, help="override the iterations of every scenario")
+  parser.add_argument("--filter", default=None, help="only run scenarios whose name contains this text")
+  args = parser.parse_args(argv)
+
+  # the stand-in server ignores the credentials but the client requires them
+  for variable in ("IGNITE_USERNAME", "IGNITE_PASSWORD", "IGNITE_TOKEN"):
+    os.environ.setdefault(variable, "benchmark")
+
+  results = []
+  for scenario in scenarios(quick=args.quick):
+    if args.filter and args.filter not in scenario.name:
+      continue
+    result = run_scenario(scenario, args.iterations)
+    results.append(result)
+    latency = result["latency_s"]
+    print(
+      f"{scenario.name:<60} {result['throughput_per_s']:>10.1f}/s"
+      f"  p50 {latency['p50'] * 1000:>9.2f}ms  p99 {latency['p99'] * 1000:>9.2f}ms"
+      f"  peak {result['peak_memory_bytes'] / 1024 / 1024:>8.2f}MiB"
+    )
+
+  report = {
+    "version": _version(),
+    "python": sys.version.split()[0],
+    "platform": platform.platform(),
+    "timestamp": datetime.now().isoformat(timespec="seconds"),
+    "quick": args.quick,
+    "results": results,
+  }
+  Path(args.output).write_text(json.dumps(report, indent=2))
+  print(f"results written to {args.output}")
+  return report
+
+
+if __name__ == "__main__":
+  main()
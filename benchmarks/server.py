@@ -0,0 +1,94 @@
+"""
+Local stand-in for the DIMS SOAP endpoints, replays canned responses by SOAPAction
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+  # HTTP/1.1 so the client can keep connections alive like it does against DIMS
+  protocol_version = "HTTP/1.1"
+  # headers and body are written separately, without TCP_NODELAY every response waits on a delayed ACK
+  disable_nagle_algorithm = True
+
+  def _read_body(self) -> int:
+    """
+    Drain the request body, plain or chunked, and return its size
+    """
+    if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+      size = 0
+      while True:
+        chunk_size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+        if chunk_size == 0:
+          # trailer section ends with an empty line
+          while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+            pass
+          return size
+        remaining = chunk_size
+        while remaining > 0:
+          remaining -= len(self.rfile.read(min(remaining, 65536))) or remaining
+        self.rfile.readline()
+        size += chunk_size
+    length = int(self.headers.get("Content-Length", 0))
+    # read in pieces so large request bodies do not count towards the peak memory of the client
+    remaining = length
+    while remaining > 0:
+      remaining -= len(self.rfile.read(min(remaining, 65536))) or remaining
+    return length
+
+  def do_POST(self):
+    self.server.request_bytes += self._read_body()
+    action = self.headers.get("SOAPAction", "").rsplit("/", 1)[-1]
+    body = self.server.responses.get(action)
+    if body is None:
+      self.send_response(500)
+      body = f"No canned response for {action}".encode()
+    else:
+      self.send_response(200)
+    self.send_header("Content-Type", "text/xml; charset=utf-8")
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, format, *args):
+    pass
+
+
+class StandInServer:
+  """
+  Serves responses (SOAP action -> response body) on a local port until closed
+
+      with StandInServer({"GetRoomList": synthetic.roomlist()}) as server:
+        client._INVENTORY_SERVICE_URL_ = server.url
+  """
+
+  def __init__(self, responses: Dict[str, bytes] = None, host: str = "127.0.0.1", port: int = 0):
+    self.httpd = ThreadingHTTPServer((host, port), _StandInHandler)
+    self.httpd.daemon_threads = True
+    self.httpd.responses = dict(responses or {})
+    self.httpd.request_bytes = 0
+    self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+  @property
+  def url(self) -> str:
+    host, port = self.httpd.server_address[:2]
+    return f"http://{host}:{port}/IMSXML/RewardsCorpIMS.asmx"
+
+  @property
+  def responses(self) -> Dict[str, bytes]:
+    return self.httpd.responses
+
+  def start(self):
+    self._thread.start()
+    return self
+
+  def close(self):
+    self.httpd.shutdown()
+    self.httpd.server_close()
+
+  def __enter__(self):
+    return self.start()
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
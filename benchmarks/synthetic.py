@@ -0,0 +1,123 @@
+"""
+Synthetic DIMS SOAP responses generated at scale for the benchmarks
+"""
+from datetime import date, timedelta
+from typing import Iterator
+
+
+ENVELOPE_PREFIX = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+               xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+               xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        <{action}Response xmlns="https://dims.ignitetravel.com/IMSXML">
+            <{action}Result>
+                <RewardsCorpIMS xmlns="">
+"""
+
+ENVELOPE_SUFFIX = """
+                </RewardsCorpIMS>
+            </{action}Result>
+        </{action}Response>
+    </soap:Body>
+</soap:Envelope>"""
+
+
+def envelope(action: str, body: str) -> bytes:
+  return (ENVELOPE_PREFIX.format(action=action) + body + ENVELOPE_SUFFIX.format(action=action)).encode("utf-8")
+
+
+def roomlist(rooms: int = 40, rates_per_room: int = 3, first_room_id: int = 18000) -> bytes:
+  """
+  A RoomList response with rooms rooms, each linked to rates_per_room rate plans
+  """
+  room_xml = "".join(
+    f"<Room><RoomTypeId>{first_room_id + i}</RoomTypeId><Description>Room type {i}</Description></Room>"
+    for i in range(rooms)
+  )
+  rate_xml = "".join(
+    f"<LinkedRate><RateId>{i * rates_per_room + j}</RateId><RateDescription>Rate plan {j}</RateDescription><RoomId>{first_room_id + i}</RoomId></LinkedRate>"
+    for i in range(rooms) for j in range(rates_per_room)
+  )
+  return envelope("GetRoomList", f"<Rooms>{room_xml}</Rooms><LinkedRates>{rate_xml}</LinkedRates>")
+
+
+def availability(days: int = 365, start: date = None) -> bytes:
+  """
+  An availability response with one DateSet per day starting at start (defaults to tomorrow)
+  """
+  start = start or date.today() + timedelta(days=1)
+  datesets = "".join(
+    f"<DateSet><Date>{(start + timedelta(days=i)).strftime('%d-%m-%Y')}</Date>"
+    f"<InventoryAvailable>{i % 7}</InventoryAvailable><LiteralInventory>{i % 7 + 2}</LiteralInventory></DateSet>"
+    for i in range(days)
+  )
+  return envelope("RetrieveAvailability", f"<Dates>{datesets}</Dates>")
+
+
+def update_message() -> bytes:
+  return envelope("UpdateInventory", "<Message>Update Successful</Message>")
+
+
+def _booking(i: int, rooms_per_booking: int) -> str:
+  rooms = "".join(
+    f"""<Room><RoomDetails>
+      <BookingId>{i * rooms_per_booking + j}</BookingId>
+      <RoomDescription>Prestige Water Villa</RoomDescription>
+      <RoomId>{18000 + j}</RoomId>
+      <DateBooked>{1 + i % 28:02d}-05-2025 {i % 24:02d}:{i % 60:02d}:00</DateBooked>
+      <CheckIn>{1 + i % 28:02d}-06-2025</CheckIn>
+      <Nights>{1 + i % 7}</Nights>
+      <Adults>2</Adults>
+      <Children>{i % 3}</Children>
+      <Infants>0</Infants>
+      <SpecialRequests>Late check in</SpecialRequests>
+      <GivenNames>Guest {i}</GivenNames>
+      <Surname>Surname {i}</Surname>
+      <Address>{i} Main St</Address>
+      <Suburb>Anytown</Suburb>
+      <State>NSW</State>
+      <Postcode>2000</Postcode>
+      <EmailAddress>guest{i}@example.com</EmailAddress>
+      <PhoneNumber>0400{i:06d}</PhoneNumber>
+    </RoomDetails></Room>"""
+    for j in range(rooms_per_booking)
+  )
+  return f"""<Booking><BookingDetails>
+    <BookingNumber>E-IG{10000000 + i}RT</BookingNumber>
+    <Rooms>{rooms}</Rooms>
+    <ResortId>1056</ResortId>
+    <ResortName>Best In Town</ResortName>
+    <ResortCurrency>USD</ResortCurrency>
+    <BookingStatusId>2</BookingStatusId>
+    <BookingStatusDescription>Booking Confirmed</BookingStatusDescription>
+  </BookingDetails></Booking>"""
+
+
+def iter_bookings_xml(bookings: int, rooms_per_booking: int) -> Iterator[str]:
+  for i in range(bookings):
+    yield _booking(i, rooms_per_booking)
+
+
+def bookings(bookings: int = 10000, rooms_per_booking: int = 1) -> bytes:
+  """
+  A GetBookingsListWithRoomRateIds response with bookings bookings of rooms_per_booking rooms each
+  """
+  return envelope("GetBookingsListWithRoomRateIds", "<Bookings>" + "".join(iter_bookings_xml(bookings, rooms_per_booking)) + "</Bookings>")
+
+
+def cancelled_bookings(bookings: int = 10000) -> bytes:
+  """
+  A RetrieveCancelledBookings response with bookings cancelled bookings
+  """
+  body = "".join(
+    f"""<Booking>
+      <BookingId>{1600000 + i}</BookingId>
+      <BookingNumber>E-IG{20000000 + i}MG</BookingNumber>
+      <BookingStatusId>5</BookingStatusId>
+      <BookingStatusDescription>Cancelled booking</BookingStatusDescription>
+      <BookingChangeDate>{1 + i % 28:02d}-05-2025 {i % 24:02d}:{i % 60:02d}:00</BookingChangeDate>
+    </Booking>"""
+    for i in range(bookings)
+  )
+  return envelope("RetrieveCancelledBookings", f"<Message>List of Cancelled Bookings</Message><Bookings>{body}</Bookings>")
@@ -1,5 +1,14 @@
 # Setup the SDK as a package
 from .client import DimsInventoryClient
+from .async_client import AsyncDimsInventoryClient
+from .booking_sync import BookingSyncEngine
+from .circuit import CircuitBreaker
+from .columnar import AvailabilityColumns, AvailabilityGrid
+from .disk_cache import DiskCache
+from .instrumentation import CallMetrics, CircuitStateChange, HistogramCollector, Instrumentation
+from .retry import RetryPolicy
+from .throttle import RateLimit
+from .xml_backend import LxmlBackend, XmlBackend
 
 
-__all__ = ["DimsInventoryClient"]
+__all__ = ["DimsInventoryClient", "AsyncDimsInventoryClient", "BookingSyncEngine", "AvailabilityColumns", "AvailabilityGrid", "CallMetrics", "CircuitBreaker", "CircuitStateChange", "DiskCache", "HistogramCollector", "Instrumentation", "LxmlBackend", "RateLimit", "RetryPolicy", "XmlBackend"]
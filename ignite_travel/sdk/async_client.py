@@ -0,0 +1,430 @@
+"""
+Asyncio client for interacting with the Ignite Travel API
+"""
+import asyncio
+from typing import AsyncIterator, Tuple, Union
+
+try:
+  import httpx
+except ImportError:  # httpx is an optional dependency
+  httpx = None
+
+from .base import BaseDimsClient, BookingEventReader, MassUpdateBody
+from .columnar import AvailabilityColumns, AvailabilityGrid, require_numpy
+from .entities import *
+from .exceptions import MassUpdateError
+from .instrumentation import Instrumentation, current_call, phase, record_coalesced
+from .circuit import CircuitBreaker
+from .disk_cache import DiskCache
+from .retry import RetryPolicy
+from .singleflight import AsyncSingleFlight
+from .throttle import RateLimit
+from .xml_backend import XmlBackend
+
+
+class AsyncDimsInventoryClient(BaseDimsClient):
+  _TRANSPORT_ERRORS_ = (httpx.TransportError,) if httpx is not None else ()
+
+  def __init__(
+    self,
+    pool_maxsize: int = 10,
+    keep_alive_timeout: float = 60.0,
+    max_concurrency: int = 10,
+    max_dates_per_request: Optional[int] = None,
+    instrumentation: Optional[Instrumentation] = None,
+    roomlist_cache_ttl: Optional[float] = None,
+    roomlist_cache_size: int = 128,
+    availability_cache_ttl: Optional[float] = None,
+    availability_cache_size: int = 1024,
+    validate_entities: bool = True,
+    xml_backend: Optional[Union[str, XmlBackend]] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    rate_limits: Optional[Dict[str, RateLimit]] = None,
+    circuit_breakers: Optional[Dict[str, CircuitBreaker]] = None,
+    coalesce_reads: bool = True,
+    disk_cache: Optional[DiskCache] = None
+  ):
+    """
+    pool_maxsize is the maximum number of open connections, keep_alive_timeout is the
+    number of seconds an idle connection is kept open and max_concurrency bounds the
+    number of in-flight requests per service URL.
+    max_dates_per_request splits larger inventory updates into concurrent chunks and
+    instrumentation receives the per-phase timings of every call.
+    roomlist_cache_ttl enables a cache of up to roomlist_cache_size room lists kept for that many seconds and
+    availability_cache_ttl a per-day availability cache of up to availability_cache_size rooms.
+    validate_entities=False builds the availability models without pydantic validation, trusting the types the parser produced.
+    xml_backend is "stdlib" (the default), "lxml" or an XmlBackend.
+    retry_policy decides how reads and idempotent writes are retried after a transient failure (3 attempts by default).
+    rate_limits maps a service type, inventory or rates, to the RateLimit its requests are throttled by
+    and circuit_breakers to the CircuitBreaker that fails its requests fast while it is degraded.
+    coalesce_reads lets identical reads made at the same time share one request and
+    disk_cache stores parsed room lists, availability and bookings in a DiskCache shared by the processes of the host
+    """
+    if httpx is None:
+      raise ImportError("httpx is required for AsyncDimsInventoryClient, install it with `pip install ignite-travel[async]`")
+    super().__init__(instrumentation, roomlist_cache_ttl, roomlist_cache_size, availability_cache_ttl, availability_cache_size, validate_entities, xml_backend, retry_policy, rate_limits, circuit_breakers, disk_cache)
+    self.max_dates_per_request = max_dates_per_request
+    self.coalesce_reads = coalesce_reads
+    self._flights = AsyncSingleFlight()
+
+    self.pool_maxsize = pool_maxsize
+    self.keep_alive_timeout = keep_alive_timeout
+    self.max_concurrency = max_concurrency
+    self.session = httpx.AsyncClient(
+      limits=httpx.Limits(
+        max_connections=pool_maxsize,
+        max_keepalive_connections=pool_maxsize,
+        keepalive_expiry=keep_alive_timeout
+      )
+    )
+    # one semaphore per service URL, created on first use
+    self._semaphores = {}
+
+  async def __aenter__(self):
+    return self
+
+  async def __aexit__(self, exc_type, exc_value, traceback):
+    await self.close()
+
+  async def close(self):
+    """
+    Close every pooled connection held by the client
+    """
+    await self.session.aclose()
+
+  def _semaphore(self, url: str) -> asyncio.Semaphore:
+    semaphore = self._semaphores.get(url)
+    if semaphore is None:
+      semaphore = self._semaphores.setdefault(url, asyncio.Semaphore(self.max_concurrency))
+    return semaphore
+
+  async def _request(self, call, method: str, url: str, headers: dict, data, stream: bool) -> "httpx.Response":
+    with call.phase("network"):
+      if stream:
+        return await self.session.send(self.session.build_request(method, url, headers=headers, content=data), stream=True)
+      return await self.session.request(method=method, url=url, headers=headers, content=data)
+
+  async def _send(self, call, method: str, service_type: str, headers: dict, data, request_bytes: int, action_header: str, idempotent: bool = False, stream: bool = False) -> "httpx.Response":
+    """
+    Send a request, transient failures of idempotent requests are retried following the retry policy.
+    The caller holds the semaphore of the service URL and closes a streamed response
+    """
+    url = self.service_url(service_type)
+    rate_limit = self.rate_limits.get(service_type)
+    attempt = 1
+    while True:
+      generation = self._before_request(service_type)
+      call.add_bytes(request_bytes=request_bytes)
+      try:
+        if rate_limit is None:
+          response = await self._request(call, method, url, headers, data, stream)
+        else:
+          async with rate_limit.acquire_async(call):
+            response = await self._request(call, method, url, headers, data, stream)
+      except Exception as e:
+        self._after_request(service_type, generation, error=e)
+        delay = self._retry_delay(action_header, attempt, idempotent, error=e)
+        if delay is None:
+          raise
+      except BaseException:
+        # a cancelled request has no outcome
+        self._after_request(service_type, generation, abandoned=True)
+        raise
+      else:
+        fault = None
+        if response.status_code >= 500:
+          # the body of a streamed response is only read for the fault of a server error
+          await response.aread()
+          fault = self._fault_code(response.content)
+        self._after_request(service_type, generation, status=response.status_code, fault=fault)
+        delay = self._retry_delay(action_header, attempt, idempotent, status=response.status_code, headers=response.headers, fault=fault)
+        if delay is None:
+          try:
+            response.raise_for_status()
+          except Exception:
+            await response.aclose()
+            raise
+          return response
+        await response.aclose()
+      call.add_retry()
+      with call.phase("backoff"):
+        await asyncio.sleep(delay)
+      attempt += 1
+
+  async def make_request(self, method:str, payload: Union[str, MassUpdateBody], action_header: str = "GetRoomList", service_type: str = "inventory", idempotent: bool = False):
+    """
+    Payload is the XML payload for the request, or a body streamed while it is sent.
+    Transient failures are only retried following the retry policy when idempotent is True, reads pass it themselves
+    """
+    headers = self.request_headers(action_header)
+    with phase("build"):
+      if isinstance(payload, MassUpdateBody):
+        # httpx streams async iterables, the length is known so the body is not sent chunked
+        data = payload.async_stream()
+        headers["Content-Length"] = str(len(payload))
+        request_bytes = len(payload)
+      else:
+        data = self.build_envelope(payload)
+        request_bytes = len(data)
+    url = self.service_url(service_type)
+    call = current_call()
+    async with self._semaphore(url):
+      response = await self._send(call, method, service_type, headers, data, request_bytes, action_header, idempotent)
+    call.add_bytes(response_bytes=len(response.content))
+    return response.text
+
+  async def _read(self, payload: str, action_header: str) -> str:
+    """
+    make_request for reads, a read of the same action and payload already in flight is shared instead of sent again
+    """
+    if not self.coalesce_reads:
+      return await self.make_request("POST", payload, action_header, idempotent=True)
+    key = (action_header, payload, self._write_generation)
+    response, shared = await self._flights.do(key, lambda: self.make_request("POST", payload, action_header, idempotent=True))
+    if shared:
+      record_coalesced()
+    return response
+
+  async def get_roomlist(self, resort_id: int, action_header: str = "GetRoomList") -> RoomList:
+    """
+    Get the room list for a given resort, served from the room list cache when it is enabled.
+    Cached room lists are shared between callers and should not be modified
+    """
+    if self._roomlist_cache is not None:
+      key = self._roomlist_cache_key(resort_id, action_header)
+      room_list = self._roomlist_cache.get(key)
+      if room_list is not None:
+        return room_list
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._build_roomlist_body(resort_id)
+      room_list = self._from_disk("roomlist", action_header, soap_body)
+      if room_list is None:
+        response = await self._read(soap_body, action_header)
+        room_list = self._parse_roomlist(response)
+        self._to_disk("roomlist", action_header, soap_body, room_list, resort_id)
+    if self._roomlist_cache is not None:
+      self._roomlist_cache.set(key, room_list)
+    return room_list
+
+  async def retrieve_availability(self, room_id:int, resort_id:int, start_date:str, end_date:str, action_header: str = "RetrieveAvailability") -> List[Availability]:
+    """
+    Get the availability for a given room and date range.
+    When the availability cache is enabled only the days missing from the cache, or stale, are fetched
+    """
+    if self._availability_cache is None:
+      return await self._fetch_availability(room_id, resort_id, start_date, end_date, action_header)
+    room_id, resort_id, start, end = self._availability_window(room_id, resort_id, start_date, end_date)
+    ranges = self._availability_cache.missing_ranges(resort_id, room_id, start, end)
+    with self._availability_cache.fetching() as started:
+      fetched = await asyncio.gather(*(
+        self._fetch_availability(room_id, resort_id, range_start.strftime("%Y-%m-%d"), range_end.strftime("%Y-%m-%d"), action_header)
+        for range_start, range_end in ranges
+      ))
+      for (range_start, range_end), availability in zip(ranges, fetched):
+        self._availability_cache.store(resort_id, room_id, range_start, range_end, availability, started)
+    return self._availability_cache.window(resort_id, room_id, start, end)
+
+  async def _fetch_availability(self, room_id:int, resort_id:int, start_date:str, end_date:str, action_header: str) -> List[Availability]:
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._build_availability_body(room_id, resort_id, start_date, end_date)
+      # a response sent before a write must not be stored after the write dropped the room from disk
+      generation = self._write_generation
+      result = self._from_disk("availability", action_header, soap_body)
+      if result is None:
+        response = await self._read(soap_body, action_header)
+        result = self._parse_availability(response)
+        self._to_disk("availability", action_header, soap_body, result, resort_id, room_id, generation)
+      return result
+
+  async def retrieve_availability_for_resort(self, resort_id:int, start_date:str, end_date:str, max_workers: Optional[int] = None) -> Dict[int, List[Availability]]:
+    """
+    Get the availability of every room of a resort for a date range, keyed by room_id.
+    The rooms are fetched concurrently with up to max_workers requests in flight (defaults to max_concurrency)
+    """
+    room_list = await self.get_roomlist(resort_id)
+    room_ids = [room.room_id for room in room_list.rooms]
+    workers = asyncio.Semaphore(max_workers or self.max_concurrency)
+
+    async def fetch(room_id: int) -> List[Availability]:
+      async with workers:
+        return await self.retrieve_availability(room_id, resort_id, start_date, end_date)
+
+    results = await asyncio.gather(*(fetch(room_id) for room_id in room_ids))
+    return dict(zip(room_ids, results))
+
+  async def retrieve_availability_columns(self, room_id:int, resort_id:int, start_date:str, end_date:str, action_header: str = "RetrieveAvailability") -> AvailabilityColumns:
+    """
+    Get the availability for a given room and date range as NumPy arrays, requires numpy.
+    No Availability model is built unless the availability cache is enabled
+    """
+    require_numpy()
+    if self._availability_cache is not None:
+      return AvailabilityColumns.from_availability(await self.retrieve_availability(room_id, resort_id, start_date, end_date, action_header))
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._build_availability_body(room_id, resort_id, start_date, end_date)
+      response = await self._read(soap_body, action_header)
+      return self._parse_availability_columns(response)
+
+  async def retrieve_availability_grid(self, resort_id:int, start_date:str, end_date:str, max_workers: Optional[int] = None) -> AvailabilityGrid:
+    """
+    Get the availability of every room of a resort for a date range as room x date matrices, requires numpy.
+    The rooms are fetched concurrently with up to max_workers requests in flight (defaults to max_concurrency)
+    """
+    require_numpy()
+    _, resort_id, start, end = self._availability_window(0, resort_id, start_date, end_date)
+    room_ids = [room.room_id for room in (await self.get_roomlist(resort_id)).rooms]
+    workers = asyncio.Semaphore(max_workers or self.max_concurrency)
+
+    async def fetch(room_id: int) -> AvailabilityColumns:
+      async with workers:
+        return await self.retrieve_availability_columns(room_id, resort_id, start_date, end_date)
+
+    columns = await asyncio.gather(*(fetch(room_id) for room_id in room_ids))
+    return AvailabilityGrid.from_columns(dict(zip(room_ids, columns)), start, end)
+
+  async def availability_mass_update(self, room_id:int, resort_id:int, dates:List[str], qty:int, action_header: str = "UpdateInventory", idempotent: bool = False) -> str:
+    """
+    Update the availability for a given room and date range.
+    Updates larger than max_dates_per_request are split into chunks, a MassUpdateError is raised if any chunk fails.
+    The update is only retried after a transient failure when it is marked idempotent
+    """
+    if self.max_dates_per_request and len(dates) > self.max_dates_per_request:
+      result = await self.chunked_availability_mass_update(room_id, resort_id, dates, qty, action_header=action_header, idempotent=idempotent)
+      if result.failed_chunks:
+        raise MassUpdateError(result)
+      return result.message
+    message, _ = await self._send_mass_update(room_id, resort_id, dates, qty, action_header, idempotent)
+    return message
+
+  async def _send_mass_update(self, room_id:int, resort_id:int, dates:List[str], qty:List[int], action_header: str, idempotent: bool = False) -> Tuple[str, bool]:
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._mass_update_payload(room_id, resort_id, dates, qty)
+      with self._inventory_write(room_id, resort_id, dates, qty) as write:
+        response = await self.make_request("POST", soap_body, action_header, idempotent=idempotent)
+        write.message, write.confirmed = self._parse_update(response)
+      return write.message, write.confirmed
+
+  async def chunked_availability_mass_update(self, room_id:int, resort_id:int, dates:List[str], qty:List[int], max_dates_per_request: Optional[int] = None, max_workers: Optional[int] = None, action_header: str = "UpdateInventory", idempotent: bool = False) -> MassUpdateResult:
+    """
+    Update the availability for a given room and date range in chunks of at most max_dates_per_request dates
+    (defaults to the client setting), sent concurrently with up to max_workers in flight (defaults to max_concurrency).
+    Chunks that raised or that DIMS did not confirm are reported as failed in the result instead of raising so they can be retried
+    """
+    chunks = self._split_mass_update(dates, qty, max_dates_per_request or self.max_dates_per_request or max(len(dates), 1))
+    # validate every chunk before anything is sent
+    for chunk in chunks:
+      self._mass_update_body(room_id, resort_id, chunk.dates, chunk.qty)
+    workers = asyncio.Semaphore(max_workers or self.max_concurrency)
+
+    async def send(chunk: MassUpdateChunk):
+      async with workers:
+        try:
+          chunk.message, confirmed = await self._send_mass_update(room_id, resort_id, chunk.dates, chunk.qty, action_header, idempotent)
+        except Exception as e:
+          chunk.error = f"{type(e).__name__}: {e}"
+        else:
+          if not confirmed:
+            # DIMS answered without applying the chunk
+            chunk.error = f"Update rejected: {chunk.message}"
+
+    await asyncio.gather(*(send(chunk) for chunk in chunks))
+    return MassUpdateResult(chunks=chunks)
+
+  async def reconcile_availability(self, room_id:int, resort_id:int, dates:List[str], qty:List[int], snapshot: Optional[List[Availability]] = None, action_header: str = "UpdateInventory", idempotent: bool = False) -> InventoryReconciliation:
+    """
+    Update the availability for a given room, sending only the dates whose literal inventory differs
+    from the desired quantity. snapshot is the current availability of the room, when it is not given
+    it is retrieved for the range covered by the dates
+    """
+    desired = self._desired_inventory(dates, qty)
+    if not desired:
+      return InventoryReconciliation()
+    if snapshot is None:
+      snapshot = await self.retrieve_availability(room_id, resort_id, min(desired).strftime("%Y-%m-%d"), max(desired).strftime("%Y-%m-%d"))
+    reconciliation = self._reconcile_inventory(desired, snapshot)
+    if reconciliation.written:
+      reconciliation.message = await self.availability_mass_update(
+        room_id,
+        resort_id,
+        [day.strftime("%d-%m-%Y") for day in reconciliation.written],
+        [desired[day] for day in reconciliation.written],
+        action_header,
+        idempotent
+      )
+    return reconciliation
+
+  async def update_availability(self, room_id:int, resort_id:int, date:str, qty:int, action_header: str = "UpdateInventory", idempotent: bool = False) -> str:
+    """
+    Update the availability for a given room and date, only retried after a transient failure when it is marked idempotent
+    """
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._build_update_body(room_id, resort_id, date, qty)
+      with self._inventory_write(room_id, resort_id, [date], [qty]) as write:
+        response = await self.make_request("POST", soap_body, action_header, idempotent=idempotent)
+        write.message, write.confirmed = self._parse_update(response)
+      return write.message
+
+  async def get_bookings(self, resort_id:int, start_date:str, end_date:str, action_header: str = "GetBookingsListWithRoomRateIds") -> List[BookingDetail]:
+    """
+    Get the bookings for a given resort and date range
+    """
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._build_bookings_body(resort_id, start_date, end_date)
+      result = self._from_disk("bookings", action_header, soap_body)
+      if result is None:
+        response = await self._read(soap_body, action_header)
+        result = self._parse_bookings(response)
+        self._to_disk("bookings", action_header, soap_body, result, resort_id)
+      return result
+
+  async def iter_bookings(self, resort_id:int, start_date:str, end_date:str, action_header: str = "GetBookingsListWithRoomRateIds") -> AsyncIterator[BookingDetail]:
+    """
+    Stream the bookings for a given resort and date range, parsing the response incrementally
+    and yielding one BookingDetail at a time so memory stays flat for large date windows
+    """
+    # the call is never bound to the task context, an async generator may be finalised from another task
+    with self._record_call(action_header, bind=False) as call:
+      with call.phase("build"):
+        soap_body = self._build_bookings_body(resort_id, start_date, end_date)
+        data = self.build_envelope(soap_body)
+      url = self.service_url("inventory")
+      # the slot is released once the headers arrived, the caller may make other calls while it consumes the stream
+      async with self._semaphore(url):
+        response = await self._send(call, "POST", "inventory", self.request_headers(action_header), data, len(data), action_header, idempotent=True, stream=True)
+      try:
+        parser = self.xml.pull_parser(events=("start", "end"))
+        reader = BookingEventReader(self._parse_booking)
+        async for chunk in response.aiter_bytes():
+          call.add_bytes(response_bytes=len(chunk))
+          with call.phase("parse"):
+            parser.feed(chunk)
+            bookings = list(reader.consume(parser.read_events()))
+          for booking in bookings:
+            yield booking
+        with call.phase("parse"):
+          parser.close()
+          bookings = list(reader.consume(parser.read_events()))
+        for booking in bookings:
+          yield booking
+      finally:
+        await response.aclose()
+
+  async def get_cancelled_bookings(self, resort_id:int, start_date:str, end_date:str, action_header: str = "RetrieveCancelledBookings") -> List[CancelledBooking]:
+    """
+    Get the cancelled bookings for a given resort and date range
+    """
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._build_cancelled_bookings_body(resort_id, start_date, end_date)
+      result = self._from_disk("cancelled_bookings", action_header, soap_body)
+      if result is None:
+        response = await self._read(soap_body, action_header)
+        result = self._parse_cancelled_bookings(response)
+        self._to_disk("cancelled_bookings", action_header, soap_body, result, resort_id)
+      return result
@@ -0,0 +1,799 @@
+"""
+Request building and response parsing shared by the sync and async Ignite Travel clients
+"""
+import xml.etree.ElementTree as ET
+import itertools
+import logging
+import os
+import sqlite3
+from contextlib import contextmanager
+from array import array
+from types import SimpleNamespace
+from xml.sax.saxutils import escape
+
+from pydantic import ValidationError
+
+from .entities import *
+from .cache import AvailabilityCache, CacheInfo, TTLCache
+from .columnar import AvailabilityColumns
+from .circuit import CircuitBreaker
+from .disk_cache import DiskCache
+from .instrumentation import Instrumentation, phase, publish_event, record_call
+from .retry import RetryPolicy
+from .throttle import RateLimit
+from .xml_backend import XmlBackend, get_backend
+
+from typing import AsyncIterator, Callable, Iterable, Iterator, Tuple, Union
+
+from datetime import date, datetime
+
+
+logger = logging.getLogger(__name__)
+
+# tag of each RoomDetails child -> RoomDetail field
+_ROOM_FIELDS = {
+  "BookingId": "booking_id",
+  "RoomId": "room_id",
+  "RoomDescription": "room_description",
+  "DateBooked": "date_booked",
+  "CheckIn": "check_in",
+  "Nights": "nights",
+  "Adults": "adults",
+  "Children": "children",
+  "Infants": "infants",
+  "SpecialRequests": "special_requests",
+  "GivenNames": "first_name",
+  "Surname": "surname",
+  "Address": "address",
+  "Suburb": "suburb",
+  "State": "state",
+  "Postcode": "postcode",
+  "EmailAddress": "email_address",
+  "PhoneNumber": "phone_number",
+}
+# RoomDetail fields that are None when their tag is missing
+_OPTIONAL_ROOM_FIELDS = ("special_requests", "first_name", "surname", "address", "suburb", "state", "postcode", "email_address", "phone_number")
+# children of a DateSet, in the order they are read
+_DATESET_TAGS = ("InventoryAvailable", "LiteralInventory", "Date")
+# tag of each cancelled Booking child -> CancelledBooking field
+_CANCELLED_BOOKING_FIELDS = {
+  "BookingId": "booking_id",
+  "BookingNumber": "booking_number",
+  "BookingStatusId": "booking_status_id",
+  "BookingStatusDescription": "booking_status_description",
+  "BookingChangeDate": "booking_change_date",
+}
+# tag of each BookingDetails child -> BookingDetail field
+_BOOKING_FIELDS = {
+  "BookingNumber": "booking_number",
+  "BookingStatusId": "booking_status_id",
+  "BookingStatusDescription": "booking_status_description",
+  "ResortId": "resort_id",
+  "ResortName": "resort_name",
+  "ResortCurrency": "resort_currency",
+}
+
+
+# every DatesSet of a mass update is this long plus the digits of its quantity
+_DATES_SET_LENGTH = len("<DatesSet><Date>YYYY-MM-DD</Date><InventoryAllocation></InventoryAllocation></DatesSet>")
+
+
+class MassUpdateBody:
+  """
+  The request body of an inventory mass update, produced in chunks while it is sent instead of held in memory.
+  It can be iterated again, e.g. to retry, and its length is known up front so it is sent with a Content-Length
+  """
+  # DatesSet elements encoded per chunk
+  chunk_dates = 512
+
+  def __init__(self, room_id: int, resort_id: int, days: array, qty: array, prefix: bytes = b"", suffix: bytes = b""):
+    self.days = days
+    self.qty = qty
+    self.head = prefix + f"""<UpdateInventory xmlns="https://dims.ignitetravel.com/IMSXML">
+            <Message>
+                <RewardsCorpIMS xmlns="">
+                    <Request>InventoryUpdate</Request>
+                    <RoomId>{room_id}</RoomId>
+                    <ResortId>{resort_id}</ResortId>
+                    <Dates>
+                        """.encode("utf-8")
+    self.tail = b"""
+                    </Dates>
+                </RewardsCorpIMS>
+            </Message>
+        </UpdateInventory>""" + suffix
+    # the DatesSet elements are separated by new lines
+    dates_length = sum(_DATES_SET_LENGTH + len(str(value)) for value in qty) + max(len(days) - 1, 0)
+    self._length = len(self.head) + dates_length + len(self.tail)
+
+  def __len__(self) -> int:
+    return self._length
+
+  def __iter__(self) -> Iterator[bytes]:
+    yield self.head
+    for start in range(0, len(self.days), self.chunk_dates):
+      end = start + self.chunk_dates
+      chunk = "\n".join(
+        f"<DatesSet><Date>{date.fromordinal(day)}</Date><InventoryAllocation>{qty}</InventoryAllocation></DatesSet>"
+        for day, qty in zip(self.days[start:end], self.qty[start:end])
+      )
+      yield (chunk if start == 0 else "\n" + chunk).encode("utf-8")
+    yield self.tail
+
+  def async_stream(self) -> "AsyncBody":
+    return AsyncBody(self)
+
+
+class AsyncBody:
+  """
+  Async iterable over a streamed request body, httpx only streams async iterables from an AsyncClient
+  """
+
+  def __init__(self, body: Iterable[bytes]):
+    self.body = body
+
+  async def __aiter__(self) -> AsyncIterator[bytes]:
+    for chunk in self.body:
+      yield chunk
+
+
+class BookingEventReader:
+  """
+  Turns incremental (event, element) pairs from the iterparse or pull parser of an XML backend into
+  BookingDetail objects, removing every parsed Booking from its parent so the tree never grows
+  """
+
+  def __init__(self, parse_booking: Callable[[ET.Element], BookingDetail]):
+    self.parse_booking = parse_booking
+    self.error = False
+    self._parents = []
+
+  def consume(self, events: Iterable) -> Iterator[BookingDetail]:
+    for event, element in events:
+      if event == "start":
+        self._parents.append(element)
+        continue
+      self._parents.pop()
+      if element.tag == "MessageType" and element.text == "Error":
+        self.error = True
+      elif element.tag == "Booking" and not self.error:
+        yield self.parse_booking(element)
+        # drop the consumed booking so peak memory does not depend on the number of bookings
+        if self._parents:
+          self._parents[-1].remove(element)
+        element.clear()
+
+
+class BaseDimsClient:
+  # URLs for the inventory and rates services
+  _INVENTORY_SERVICE_URL_ = "https://dims.ignitetravel.com/IMSXML/RewardsCorpIMS.asmx?wsdl"
+  _RATES_SERVICE_URL_ = "https://dims.ignitetravel.com/RMSXML/RateInterfaceService.asmx?wsdl"
+  # message DIMS returns when an inventory update was applied
+  _UPDATE_SUCCESSFUL_ = "Update Successful"
+  # mass updates with more dates than this are streamed instead of built in memory
+  _STREAM_MASS_UPDATE_DATES_ = 1000
+  # connection errors and timeouts of the HTTP library, always retryable
+  _TRANSPORT_ERRORS_: Tuple[type, ...] = ()
+
+  def __init__(
+    self,
+    instrumentation: Optional[Instrumentation] = None,
+    roomlist_cache_ttl: Optional[float] = None,
+    roomlist_cache_size: int = 128,
+    availability_cache_ttl: Optional[float] = None,
+    availability_cache_size: int = 1024,
+    validate_entities: bool = True,
+    xml_backend: Optional[Union[str, XmlBackend]] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    rate_limits: Optional[Dict[str, RateLimit]] = None,
+    circuit_breakers: Optional[Dict[str, CircuitBreaker]] = None,
+    disk_cache: Optional[DiskCache] = None
+  ):
+    self.instrumentation = instrumentation
+    # transient failures of idempotent requests are retried, NO_RETRY sends every request once
+    self.retry_policy = retry_policy or RetryPolicy()
+    # limits of the requests sent to each service, keyed by service type
+    self.rate_limits = dict(rate_limits or {})
+    # requests to a degraded service fail fast while its circuit is open
+    self.circuit_breakers = dict(circuit_breakers or {})
+    for option, limits in (("rate_limits", self.rate_limits), ("circuit_breakers", self.circuit_breakers)):
+      unknown = set(limits) - {"inventory", "rates"}
+      if unknown:
+        raise ValueError(f"{option} are keyed by service type, inventory or rates, got {', '.join(sorted(unknown))}")
+    # the standard library unless lxml or another backend is chosen
+    self.xml = get_backend(xml_backend)
+    # the parser already converts every availability value, its validation can be skipped when that is trusted.
+    # Other models are always validated, building them directly was not measurably faster
+    self.validate_entities = validate_entities
+    # room lists rarely change, they are cached per resort when a ttl is given
+    self._roomlist_cache = TTLCache(roomlist_cache_ttl, roomlist_cache_size) if roomlist_cache_ttl else None
+    # availability is cached per day so overlapping windows only fetch the days they are missing
+    self._availability_cache = AvailabilityCache(availability_cache_ttl, availability_cache_size) if availability_cache_ttl else None
+    # parsed reads shared with the other processes of the host, behind the in-memory caches
+    self.disk_cache = disk_cache
+    # bumped by every inventory write, reads started after a write never share a request sent before it
+    self._write_generations = itertools.count(1)
+    self._write_generation = 0
+    self.username = os.getenv("IGNITE_USERNAME", None)
+    self.password = os.getenv("IGNITE_PASSWORD", None)
+    self.token = os.getenv("IGNITE_TOKEN", None)
+
+    # check if the username, password and token are set
+    if not all([self.username, self.password, self.token]):
+      raise ValueError("Username, password and token must be set in the environment variables.")
+    # the credentials never change, the envelope around the payload is built once
+    self._envelope_prefix, self._envelope_suffix = self._compile_envelope()
+
+  def _compile_envelope(self) -> Tuple[bytes, bytes]:
+    """
+    The constant parts of every envelope around the payload, with the credentials XML-escaped
+    """
+    prefix = f"""<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+               xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+               xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Header>
+        <Authentication xmlns="https://dims.ignitetravel.com/IMSXML">
+            <UserName>{escape(self.username)}</UserName>
+            <PassWord>{escape(self.password)}</PassWord>
+            <Token>{escape(self.token)}</Token>
+        </Authentication>
+    </soap:Header>
+    <soap:Body>
+        """
+    suffix = """
+    </soap:Body>
+</soap:Envelope>"""
+    return prefix.encode("utf-8"), suffix.encode("utf-8")
+
+  def build_envelope(self, payload: str) -> bytes:
+    """
+    The request body sent for payload, encoded once and joined to the precompiled prefix and suffix
+    """
+    return b"".join((self._envelope_prefix, payload.encode("utf-8"), self._envelope_suffix))
+
+  def format_soap_envelope(self, payload: str) -> str:
+    return self.build_envelope(payload).decode("utf-8")
+
+  def _record_call(self, action_header: str, bind: bool = True):
+    """
+    Report the timings of the call made inside the block to the instrumentation hooks
+    """
+    return record_call(self.instrumentation, action_header, bind)
+
+  def _retry_delay(
+    self,
+    action_header: str,
+    attempt: int,
+    idempotent: bool,
+    error: Optional[BaseException] = None,
+    status: Optional[int] = None,
+    headers: Optional[dict] = None,
+    fault: Optional[str] = None
+  ) -> Optional[float]:
+    """
+    Seconds to wait before sending a failed request again, None when the failure must be raised.
+    Only idempotent requests are retried, after a transport error or a retryable status.
+    fault is the faultcode of a SOAP fault in the response, only Server faults are transient
+    """
+    policy = self.retry_policy
+    if not idempotent or attempt >= policy.max_attempts:
+      return None
+    if error is not None:
+      if not isinstance(error, self._TRANSPORT_ERRORS_ + policy.retry_exceptions):
+        return None
+      delay = policy.delay(attempt)
+      reason = f"{type(error).__name__}: {error}"
+    else:
+      if status not in policy.retry_statuses or fault not in (None, "Server"):
+        return None
+      delay = policy.delay(attempt, headers)
+      reason = f"HTTP {status}"
+    logger.warning("%s failed with %s, retrying in %.2fs (attempt %d of %d)", action_header, reason, delay, attempt + 1, policy.max_attempts)
+    return delay
+
+  def _fault_code(self, body: bytes) -> Optional[str]:
+    """
+    The faultcode of the SOAP fault in a response body without its prefix, e.g. Client or Server, None when it holds no fault.
+    ASMX services answer the requests they reject with HTTP 500 and a soap:Client fault
+    """
+    if b"Fault" not in body:
+      return None
+    try:
+      root = ET.fromstring(body)
+    except ET.ParseError:
+      return None
+    faultcode = next(root.iter("faultcode"), None)
+    if faultcode is None or not faultcode.text:
+      return None
+    return faultcode.text.strip().rpartition(":")[2]
+
+  def _publish_event(self, event: BaseModel):
+    publish_event(self.instrumentation, event)
+
+  def _before_request(self, service_type: str) -> Optional[int]:
+    """
+    Raise a CircuitOpenError while the circuit of service_type is open, the generation of the breaker is returned
+    """
+    breaker = self.circuit_breakers.get(service_type)
+    return breaker.before_request(service_type, self._publish_event) if breaker is not None else None
+
+  def _after_request(
+    self,
+    service_type: str,
+    generation: Optional[int],
+    error: Optional[BaseException] = None,
+    status: Optional[int] = None,
+    abandoned: bool = False,
+    fault: Optional[str] = None
+  ):
+    """
+    Record the outcome of a request with the circuit breaker of service_type. Transport errors, 429 and 5xx responses
+    are failures, except a SOAP Client fault: DIMS rejected the request itself and is answering normally
+    """
+    breaker = self.circuit_breakers.get(service_type)
+    if breaker is None:
+      return
+    if abandoned:
+      failed = None
+    elif error is not None:
+      failed = isinstance(error, self._TRANSPORT_ERRORS_)
+    else:
+      failed = status == 429 or (status >= 500 and fault != "Client")
+    breaker.after_request(service_type, generation, failed, self._publish_event)
+
+  def service_url(self, service_type: str = "inventory") -> str:
+    return self._INVENTORY_SERVICE_URL_ if service_type == 'inventory' else self._RATES_SERVICE_URL_
+
+  def request_headers(self, action_header: str) -> dict:
+    return {
+      "Content-Type": "text/xml; charset=utf-8",
+      "SOAPAction": f"https://dims.ignitetravel.com/IMSXML/{action_header}"
+    }
+
+  def _build_roomlist_body(self, resort_id: int) -> str:
+    try:
+      resort_id = int(resort_id)
+    except ValueError:
+      raise ValueError("Resort ID must be an integer")
+
+    return f"""<GetRoomList xmlns="https://dims.ignitetravel.com/IMSXML">
+            <Message>
+                <RewardsCorpIMS xmlns="">
+                    <Request>RoomsList</Request>
+                    <ResortId>{resort_id}</ResortId>
+                </RewardsCorpIMS>
+            </Message>
+        </GetRoomList>"""
+
+  def _roomlist_cache_key(self, resort_id: int, action_header: str) -> tuple:
+    try:
+      return (int(resort_id), action_header)
+    except ValueError:
+      raise ValueError("Resort ID must be an integer")
+
+  def invalidate_roomlist(self, resort_id: Optional[int] = None):
+    """
+    Drop the cached room list of a resort, or of every resort when resort_id is not given
+    """
+    self._invalidate_disk("roomlist", resort_id)
+    if self._roomlist_cache is None:
+      return
+    if resort_id is None:
+      self._roomlist_cache.clear()
+    else:
+      resort_id = int(resort_id)
+      self._roomlist_cache.invalidate_where(lambda key: key[0] == resort_id)
+
+  def _from_disk(self, kind: str, action_header: str, payload: str):
+    """
+    The parsed result of a read stored in the disk cache, keyed by its request, None on a miss or without a disk cache.
+    The disk cache fails open, an unreadable entry or database is logged and treated as a miss
+    """
+    if self.disk_cache is None:
+      return None
+    with phase("cache"):
+      try:
+        return self.disk_cache.get(kind, (action_header, payload))
+      except (sqlite3.Error, ValidationError) as e:
+        logger.warning("Disk cache lookup of %s failed, it is fetched instead: %s", action_header, e)
+        return None
+
+  def _to_disk(self, kind: str, action_header: str, payload: str, value, resort_id: int, room_id: Optional[int] = None, generation: Optional[int] = None):
+    """
+    Store the parsed result of a read in the disk cache. generation is the write generation the read started at,
+    the result is not stored when an inventory write was made since
+    """
+    if self.disk_cache is None or (generation is not None and generation != self._write_generation):
+      return
+    with phase("cache"):
+      try:
+        self.disk_cache.set(kind, (action_header, payload), value, resort_id, room_id)
+      except sqlite3.Error as e:
+        logger.warning("Disk cache store of %s failed: %s", action_header, e)
+
+  def _invalidate_disk(self, kind: str, resort_id: Optional[int], room_id: Optional[int] = None):
+    if self.disk_cache is None:
+      return
+    try:
+      if resort_id is None:
+        self.disk_cache.clear(kind)
+      else:
+        self.disk_cache.invalidate(kind, resort_id, room_id)
+    except sqlite3.Error as e:
+      # the entries stay until their ttl
+      logger.error("Disk cache invalidation of %s for resort %s failed: %s", kind, resort_id, e)
+
+  def roomlist_cache_info(self) -> Optional[CacheInfo]:
+    """
+    Hit and miss counters of the room list cache, None when the cache is disabled
+    """
+    return self._roomlist_cache.info() if self._roomlist_cache is not None else None
+
+  def _parse_roomlist(self, response: str) -> RoomList:
+    with phase("parse"):
+      # parse the xml response into a RoomList object
+      root = self.xml.fromstring(response)
+      # Extract the rooms from the response
+      room_rows = []
+      for room in self.xml.findall(root, ".//Room"):
+        room_id, room_name = self.xml.texts(room, ("RoomTypeId", "Description"))
+        room_rows.append({"room_id": int(room_id), "room_name": room_name})
+      # Extract linked rates
+      rate_rows = []
+      for linked_rate in self.xml.findall(root, ".//LinkedRate"):
+        rate_id, rate_description, room_id = self.xml.texts(linked_rate, ("RateId", "RateDescription", "RoomId"))
+        # handle the case where the linked rate is not present
+        if rate_id is None or room_id is None or rate_description is None:
+          continue
+        rate_rows.append({"rate_id": int(rate_id), "rate_description": rate_description, "room_id": int(room_id)})
+
+    with phase("validate"):
+      rooms = []
+      # index the rooms by room_id so each linked rate is attached in constant time
+      rooms_by_id = {}
+      for row in room_rows:
+        room_model = Room(**row)
+        rooms.append(room_model)
+        rooms_by_id.setdefault(room_model.room_id, room_model)
+      for row in rate_rows:
+        linked_rate_model = LinkedRate(**row)
+        # get the room model that matches the room_type_id
+        room_model = rooms_by_id.get(linked_rate_model.room_id)
+        if room_model:
+          room_model.linked_rates.append(linked_rate_model)
+          room_model.linked_rate = linked_rate_model
+      return RoomList(rooms=rooms)
+
+  def _availability_window(self, room_id: int, resort_id: int, start_date: str, end_date: str) -> Tuple[int, int, date, date]:
+    """
+    Validate the arguments of an availability request
+    """
+    # convert the start and end dates to the format YYYY-MM-DD
+    # check if resort id and room id can be converted to int
+    try:
+      resort_id = int(resort_id)
+      room_id = int(room_id)
+    except ValueError:
+      raise ValueError("Resort ID and Room ID must be integers")
+    # check if the start and end dates are valid
+    try:
+      start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+      end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+      raise ValueError("Invalid date format")
+    if start_date > end_date:
+      raise ValueError("Start date must be before end date")
+    if start_date < datetime.now().date():
+      raise ValueError("Start date must be in the future")
+    if end_date < datetime.now().date():
+      raise ValueError("End date must be in the future")
+    return room_id, resort_id, start_date, end_date
+
+  def invalidate_availability(self, resort_id: int, room_id: Optional[int] = None):
+    """
+    Drop the cached availability of a room, or of every room of the resort when room_id is not given
+    """
+    if self._availability_cache is not None:
+      self._availability_cache.invalidate(int(resort_id), int(room_id) if room_id is not None else None)
+    self._invalidate_disk("availability", resort_id, room_id)
+
+  def availability_cache_info(self) -> Optional[CacheInfo]:
+    """
+    Hit and miss counters of the availability cache in days, None when the cache is disabled
+    """
+    return self._availability_cache.info() if self._availability_cache is not None else None
+
+  def _build_availability_body(self, room_id: int, resort_id: int, start_date: str, end_date: str) -> str:
+    room_id, resort_id, start_date, end_date = self._availability_window(room_id, resort_id, start_date, end_date)
+    start_date = start_date.strftime("%Y-%m-%d")
+    end_date = end_date.strftime("%Y-%m-%d")
+    return f"""<RetrieveAvailability xmlns="https://dims.ignitetravel.com/IMSXML">
+            <Message>
+                <RewardsCorpIMS xmlns="">
+                    <Request>Availability</Request>
+                    <RoomId>{room_id}</RoomId>
+                    <ResortId>{resort_id}</ResortId>
+                    <Dates>
+                        <Date>{start_date}</Date>
+                        <Date>{end_date}</Date>
+                    </Dates>
+                </RewardsCorpIMS>
+            </Message>
+        </RetrieveAvailability>"""
+
+  def _parse_availability(self, response: str) -> List[Availability]:
+    with phase("parse"):
+      root = self.xml.fromstring(response)
+      rows = []
+      for dateset in self.xml.findall(root, ".//DateSet"):
+        inventory_available, literal_inventory, day = self.xml.texts(dateset, _DATESET_TAGS)
+        rows.append({
+          "inventory_available": int(inventory_available),
+          "literal_inventory": int(literal_inventory),
+          "dtm": parse_dims_date(day)
+        })
+    with phase("validate"):
+      if self.validate_entities:
+        availability = [Availability(**row) for row in rows]
+      else:
+        availability = [construct(Availability, row) for row in rows]
+    # ensure the availability is sorted by dtm
+    availability.sort(key=lambda x: x.dtm)  # sort the availability by dtm i,e current date to end date
+    return availability
+
+  def _parse_availability_columns(self, response: str) -> AvailabilityColumns:
+    with phase("parse"):
+      root = self.xml.fromstring(response)
+      dates, inventory_available, literal_inventory = [], [], []
+      for dateset in self.xml.findall(root, ".//DateSet"):
+        available, literal, day = self.xml.texts(dateset, _DATESET_TAGS)
+        inventory_available.append(int(available))
+        literal_inventory.append(int(literal))
+        dates.append(parse_dims_date(day).toordinal())
+    with phase("validate"):
+      return AvailabilityColumns.from_rows(dates, inventory_available, literal_inventory)
+
+  def _mass_update_body(self, room_id: int, resort_id: int, dates: List[str], qty: List[int], prefix: bytes = b"", suffix: bytes = b"") -> "MassUpdateBody":
+    try:
+      room_id = int(room_id)
+      resort_id = int(resort_id)
+    except ValueError:
+      raise ValueError("Room ID, Resort ID and Quantity must be integers")
+    # check if the dates are valid, they are kept as day ordinals until the body is produced
+    days = array("q")
+    quantities = array("q")
+    for date, qty in zip(dates, qty):
+      try:
+        days.append(datetime.strptime(date, "%d-%m-%Y").toordinal())
+        quantities.append(int(qty))
+      except ValueError:
+        raise ValueError("Invalid date format")
+    return MassUpdateBody(room_id, resort_id, days, quantities, prefix, suffix)
+
+  def _build_mass_update_body(self, room_id: int, resort_id: int, dates: List[str], qty: List[int]) -> str:
+    return b"".join(self._mass_update_body(room_id, resort_id, dates, qty)).decode("utf-8")
+
+  def _mass_update_payload(self, room_id: int, resort_id: int, dates: List[str], qty: List[int]) -> Union[str, "MassUpdateBody"]:
+    """
+    The payload of a mass update, the envelopes of updates of more than _STREAM_MASS_UPDATE_DATES_ dates are produced while they are sent
+    """
+    if len(dates) > self._STREAM_MASS_UPDATE_DATES_:
+      return self._mass_update_body(room_id, resort_id, dates, qty, self._envelope_prefix, self._envelope_suffix)
+    return self._build_mass_update_body(room_id, resort_id, dates, qty)
+
+  def _split_mass_update(self, dates: List[str], qty: List[int], max_dates_per_request: int) -> List[MassUpdateChunk]:
+    """
+    Split an inventory update into chunks of at most max_dates_per_request dates
+    """
+    if max_dates_per_request < 1:
+      raise ValueError("max_dates_per_request must be at least 1")
+    pairs = list(zip(dates, qty))
+    chunks = []
+    for index, start in enumerate(range(0, len(pairs), max_dates_per_request)):
+      chunk_pairs = pairs[start:start + max_dates_per_request]
+      try:
+        chunk_qty = [int(quantity) for _, quantity in chunk_pairs]
+      except ValueError:
+        raise ValueError("Room ID, Resort ID and Quantity must be integers")
+      chunks.append(MassUpdateChunk(index=index, dates=[day for day, _ in chunk_pairs], qty=chunk_qty))
+    return chunks
+
+  def _desired_inventory(self, dates: List[str], qty: List[int]) -> Dict[date, int]:
+    """
+    Validate the dates and quantities of an update and index them by date
+    """
+    desired = {}
+    for day, quantity in zip(dates, qty):
+      try:
+        desired[datetime.strptime(day, "%d-%m-%Y").date()] = int(quantity)
+      except ValueError:
+        raise ValueError("Invalid date format")
+    return desired
+
+  def _reconcile_inventory(self, desired: Dict[date, int], snapshot: List[Availability]) -> InventoryReconciliation:
+    """
+    Split the desired allocations into the dates that differ from the snapshot and the ones that can be skipped,
+    dates missing from the snapshot are always written
+    """
+    current = {availability.dtm: availability.literal_inventory for availability in snapshot}
+    reconciliation = InventoryReconciliation()
+    for day in sorted(desired):
+      if current.get(day) == desired[day]:
+        reconciliation.skipped.append(day)
+      else:
+        reconciliation.written.append(day)
+    return reconciliation
+
+  @contextmanager
+  def _inventory_write(self, room_id: int, resort_id: int, dates: List[str], qty: List[int]):
+    """
+    Keep the availability cache consistent with the inventory write made inside the block, the block sets
+    the message DIMS returned and whether it confirmed the write on the yielded object. Confirmed days are
+    updated in place, days of a write that failed or was not confirmed are dropped from the cache
+    """
+    write = SimpleNamespace(message=None, confirmed=False)
+    try:
+      yield write
+    except BaseException:
+      self._apply_inventory_write(room_id, resort_id, dates, qty, confirmed=False)
+      raise
+    self._apply_inventory_write(room_id, resort_id, dates, qty, confirmed=write.confirmed)
+
+  def _apply_inventory_write(self, room_id: int, resort_id: int, dates: List[str], qty: List[int], confirmed: bool):
+    self._write_generation = next(self._write_generations)
+    # windows on disk are not patched per day, the room is fetched again after any write
+    self._invalidate_disk("availability", resort_id, room_id)
+    if self._availability_cache is None:
+      return
+    allocations = self._desired_inventory(dates, qty)
+    self._availability_cache.write(int(resort_id), int(room_id), allocations, confirmed)
+
+  def _build_update_body(self, room_id: int, resort_id: int, date: str, qty: int) -> str:
+    try:
+      room_id = int(room_id)
+      resort_id = int(resort_id)
+      qty = int(qty)
+    except ValueError:
+      raise ValueError("Room ID, Resort ID and Quantity must be integers")
+    # check if the date is valid
+    try:
+      date = datetime.strptime(date, "%d-%m-%Y").date()
+    except ValueError:
+      raise ValueError("Invalid date format")
+    return f"""<UpdateInventory xmlns="https://dims.ignitetravel.com/IMSXML">
+            <Message>
+                <RewardsCorpIMS xmlns="">
+                    <Request>InventoryUpdate</Request>
+                    <RoomId>{room_id}</RoomId>
+                    <ResortId>{resort_id}</ResortId>
+                    <Dates>
+                        <DatesSet>
+                            <Date>{date}</Date>
+                            <InventoryAllocation>{qty}</InventoryAllocation>
+                        </DatesSet>
+                    </Dates>
+                </RewardsCorpIMS>
+            </Message>
+        </UpdateInventory>"""
+
+  def _parse_update(self, response: str) -> Tuple[str, bool]:
+    """
+    The message of an inventory update response and whether DIMS confirmed the update,
+    a MessageType of Error or any message other than _UPDATE_SUCCESSFUL_ means it was rejected
+    """
+    with phase("parse"):
+      root = self.xml.fromstring(response)
+      message = self.xml.find(root, ".//Message").text
+      message_type = self.xml.find(root, ".//MessageType")
+    rejected = message_type is not None and message_type.text == "Error"
+    return message, message == self._UPDATE_SUCCESSFUL_ and not rejected
+
+  def _build_bookings_body(self, resort_id: int, start_date: str, end_date: str) -> str:
+    try:
+      resort_id = int(resort_id)
+    except ValueError:
+      raise ValueError("Resort ID must be an integer")
+    try:
+      start_date = datetime.strptime(start_date, "%Y-%m-%d").date().strftime("%d-%b-%Y")  # 1st June 2025
+      end_date = datetime.strptime(end_date, "%Y-%m-%d").date().strftime("%d-%b-%Y")  # 30th June 2025
+    except ValueError:
+      raise ValueError("Invalid date format")
+    return f"""<GetBookingsListWithRoomRateIds xmlns="https://dims.ignitetravel.com/IMSXML">
+            <Message>
+                <RewardsCorpIMS xmlns="">
+                    <Request>GetBookingsListWithRoomRateIds</Request>
+                    <ResortId>{resort_id}</ResortId>
+                    <Dates>
+                        <Date>{start_date}</Date>
+                        <Date>{end_date}</Date>
+                    </Dates>
+                </RewardsCorpIMS>
+            </Message>
+        </GetBookingsListWithRoomRateIds>"""
+
+  def _parse_bookings(self, response: str) -> List[BookingDetail]:
+    with phase("parse"):
+      root = self.xml.fromstring(response)
+      # first check if there are any bookings before parsing each booking
+      message_type = self.xml.find(root, ".//MessageType")
+      if message_type is not None and message_type.text == "Error":
+          return []
+      # parse the bookings
+      rows = [self._extract_booking(booking) for booking in self.xml.findall(root, ".//Booking")]
+    with phase("validate"):
+      return [self._build_booking(row) for row in rows]
+
+  def _parse_booking(self, booking: ET.Element) -> BookingDetail:
+    return self._build_booking(self._extract_booking(booking))
+
+  def _extract_booking(self, booking: ET.Element) -> dict:
+    """
+    Read the text of a Booking element into a row of BookingDetail fields in one pass over each details element
+    """
+    booking_details = self.xml.find(booking, ".//BookingDetails")
+    rooms = []
+    for room in self.xml.findall(booking, ".//Rooms/Room"):
+      row = dict.fromkeys(_OPTIONAL_ROOM_FIELDS)
+      for child in self.xml.find(room, ".//RoomDetails"):
+        field = _ROOM_FIELDS.get(child.tag)
+        if field is not None:
+          row[field] = child.text
+      if "booking_id" not in row:
+        # the booking id may be a child of the room rather than of its details
+        row["booking_id"] = self.xml.find(room, ".//BookingId").text
+      rooms.append(row)
+    row = {"resort_currency": None}
+    for child in booking_details:
+      field = _BOOKING_FIELDS.get(child.tag)
+      if field is not None:
+        row[field] = child.text
+    if "booking_number" not in row:
+      row["booking_number"] = self.xml.find(booking, ".//BookingNumber").text
+    row["rooms"] = rooms
+    return row
+
+  def _build_booking(self, row: dict) -> BookingDetail:
+    return BookingDetail(**{**row, "rooms": [RoomDetail(**room) for room in row["rooms"]]})
+
+  def _build_cancelled_bookings_body(self, resort_id: int, start_date: str, end_date: str) -> str:
+    try:
+      resort_id = int(resort_id)
+    except ValueError:
+      raise ValueError("Resort ID must be an integer")
+    try:
+      start_date = datetime.strptime(start_date, "%Y-%m-%d").date().strftime("%d-%m-%Y")
+      end_date = datetime.strptime(end_date, "%Y-%m-%d").date().strftime("%d-%m-%Y")
+    except ValueError:
+      raise ValueError("Invalid date format")
+    return f"""<RetrieveCancelledBookings xmlns="https://dims.ignitetravel.com/IMSXML">
+            <Message>
+                <RewardsCorpIMS xmlns="">
+                    <Request>RetrieveCancelledBookings</Request>
+                    <ResortId>{resort_id}</ResortId>
+                    <Dates>
+                        <Date>{start_date}</Date>
+                        <Date>{end_date}</Date>
+                    </Dates>
+                </RewardsCorpIMS>
+            </Message>
+        </RetrieveCancelledBookings>"""
+
+  def _parse_cancelled_bookings(self, response: str) -> List[CancelledBooking]:
+    with phase("parse"):
+      root = self.xml.fromstring(response)
+      # first check if there are any bookings before parsing each booking
+      message_type = self.xml.find(root, ".//MessageType")
+      if message_type is not None and message_type.text == "Error":
+          return []
+      # parse the bookings
+      rows = []
+      for booking in self.xml.findall(root, ".//Booking"):
+        row = dict(zip(_CANCELLED_BOOKING_FIELDS.values(), self.xml.texts(booking, tuple(_CANCELLED_BOOKING_FIELDS))))
+        for tag, field in _CANCELLED_BOOKING_FIELDS.items():
+          if row[field] is None:
+            # the field may be nested deeper than a child of the booking
+            row[field] = self.xml.find(booking, f".//{tag}").text
+        rows.append(row)
+    with phase("validate"):
+      return [CancelledBooking(**row) for row in rows]
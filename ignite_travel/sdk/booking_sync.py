@@ -0,0 +1,165 @@
+"""
+Incremental booking sync on top of get_bookings and get_cancelled_bookings
+"""
+import hashlib
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .entities import BookingDetail, BookingEvent, BookingSyncState, CancelledBooking
+
+
+# windows of the bookings requested by each poll, see BookingSyncEngine
+STRATEGIES = ("stay", "booked")
+
+
+class BookingSyncEngine:
+  """
+  Keeps the bookings of each resort in sync with DIMS and reports what changed since the previous poll.
+
+  strategy decides which bookings every poll asks DIMS for:
+  - "stay" requests the forward window of stays, from today to forward_days ahead, on every poll and compares each
+    booking with the previous poll by fingerprint. Any booking of the window that was added or modified is reported,
+    whenever the change was made. Bookings whose stay ended before the window are dropped from the state silently.
+  - "booked" only requests the bookings made since the latest date_booked of the previous polls, minus overlap to
+    absorb clock skew and late writes, which assumes DIMS selects bookings by the date they were made. A poll then
+    costs only the new bookings, but a booking modified later than overlap after it was made is not fetched again,
+    so its change is not reported. The first poll of a resort starts at start_date (defaults to lookback_days ago).
+
+  With both strategies cancellations are requested from the latest booking_change_date seen, minus overlap.
+  Cancelled bookings are kept as tombstones by booking_number, and by the booking_id of their rooms, so a
+  cancelled booking is never reported as added again.
+
+  states can be given to resume from BookingSyncState saved with model_dump_json
+  """
+
+  def __init__(
+    self,
+    client,
+    start_date: Optional[date] = None,
+    lookback_days: int = 30,
+    overlap: timedelta = timedelta(days=1),
+    on_event: Optional[Callable[[BookingEvent], None]] = None,
+    states: Optional[Dict[int, BookingSyncState]] = None,
+    strategy: str = "stay",
+    forward_days: int = 365
+  ):
+    if strategy not in STRATEGIES:
+      raise ValueError(f"strategy must be one of {', '.join(STRATEGIES)}")
+    self.client = client
+    self.strategy = strategy
+    self.forward_days = forward_days
+    self.start_date = start_date
+    self.lookback_days = lookback_days
+    self.overlap = overlap
+    self.on_event = on_event
+    self.states = dict(states or {})
+    self._lock = threading.Lock()
+
+  def state(self, resort_id: int) -> BookingSyncState:
+    with self._lock:
+      return self.states.setdefault(int(resort_id), BookingSyncState())
+
+  def _window_start(self, high_water: Optional[datetime]) -> date:
+    if high_water is not None:
+      return (high_water - self.overlap).date()
+    return self.start_date or date.today() - timedelta(days=self.lookback_days)
+
+  def bookings_window(self, resort_id: int) -> tuple:
+    """
+    The (start_date, end_date) the next poll requests bookings for, as YYYY-MM-DD strings
+    """
+    if self.strategy == "stay":
+      today = date.today()
+      return today.strftime("%Y-%m-%d"), (today + timedelta(days=self.forward_days)).strftime("%Y-%m-%d")
+    start = self._window_start(self.state(resort_id).booked_high_water)
+    return start.strftime("%Y-%m-%d"), max(start, date.today()).strftime("%Y-%m-%d")
+
+  def cancellations_window(self, resort_id: int) -> tuple:
+    """
+    The (start_date, end_date) the next poll requests cancelled bookings for, as YYYY-MM-DD strings
+    """
+    start = self._window_start(self.state(resort_id).cancelled_high_water)
+    return start.strftime("%Y-%m-%d"), max(start, date.today()).strftime("%Y-%m-%d")
+
+  def poll(self, resort_id: int) -> List[BookingEvent]:
+    """
+    Fetch the bookings and cancellations since the previous poll and return the resulting events
+    """
+    resort_id = int(resort_id)
+    bookings = self.client.get_bookings(resort_id, *self.bookings_window(resort_id))
+    cancellations = self.client.get_cancelled_bookings(resort_id, *self.cancellations_window(resort_id))
+    return self.apply(resort_id, bookings, cancellations)
+
+  async def poll_async(self, resort_id: int) -> List[BookingEvent]:
+    """
+    poll for engines built on AsyncDimsInventoryClient
+    """
+    resort_id = int(resort_id)
+    bookings = await self.client.get_bookings(resort_id, *self.bookings_window(resort_id))
+    cancellations = await self.client.get_cancelled_bookings(resort_id, *self.cancellations_window(resort_id))
+    return self.apply(resort_id, bookings, cancellations)
+
+  def apply(self, resort_id: int, bookings: Iterable[BookingDetail], cancellations: Iterable[CancelledBooking]) -> List[BookingEvent]:
+    """
+    Merge fetched bookings and cancellations into the state of the resort and return the resulting events
+    """
+    resort_id = int(resort_id)
+    state = self.state(resort_id)
+    events = []
+    with self._lock:
+      if self.strategy == "stay":
+        window_start = date.today()
+        self._drop_past_stays(state, window_start)
+        # a stay that ended is not requested by the next poll, it would be added again and again
+        bookings = [booking for booking in bookings if not self._stay_ended(booking, window_start)]
+      # booking_id of every tombstone, cancellations may only carry the booking id of a room
+      cancelled_ids = {tombstone.booking_id: booking_number for booking_number, tombstone in state.tombstones.items()}
+      for booking in bookings:
+        if booking.booking_number in state.tombstones or any(room.booking_id in cancelled_ids for room in booking.rooms):
+          continue
+        fingerprint = self._fingerprint(booking)
+        previous = state.fingerprints.get(booking.booking_number)
+        if previous != fingerprint:
+          state.bookings[booking.booking_number] = booking
+          state.fingerprints[booking.booking_number] = fingerprint
+          events.append(BookingEvent(kind="added" if previous is None else "changed", resort_id=resort_id, booking_number=booking.booking_number, booking=booking))
+        for room in booking.rooms:
+          if state.booked_high_water is None or room.date_booked > state.booked_high_water:
+            state.booked_high_water = room.date_booked
+
+      booking_numbers = {room.booking_id: booking.booking_number for booking in state.bookings.values() for room in booking.rooms}
+      booking_numbers.update(cancelled_ids)
+      for cancellation in cancellations:
+        if state.cancelled_high_water is None or cancellation.booking_change_date > state.cancelled_high_water:
+          state.cancelled_high_water = cancellation.booking_change_date
+        if cancellation.booking_number in state.bookings:
+          booking_number = cancellation.booking_number
+        else:
+          booking_number = booking_numbers.get(cancellation.booking_id, cancellation.booking_number)
+        if booking_number in state.tombstones:
+          continue
+        state.tombstones[booking_number] = cancellation
+        booking = state.bookings.pop(booking_number, None)
+        state.fingerprints.pop(booking_number, None)
+        events.append(BookingEvent(kind="cancelled", resort_id=resort_id, booking_number=booking_number, booking=booking, cancellation=cancellation))
+
+    if self.on_event is not None:
+      for event in events:
+        self.on_event(event)
+    return events
+
+  def _drop_past_stays(self, state: BookingSyncState, window_start: date):
+    """
+    Forget the bookings whose every stay ended before the window, they are no longer requested
+    """
+    for booking_number, booking in list(state.bookings.items()):
+      if self._stay_ended(booking, window_start):
+        del state.bookings[booking_number]
+        state.fingerprints.pop(booking_number, None)
+
+  def _stay_ended(self, booking: BookingDetail, window_start: date) -> bool:
+    return bool(booking.rooms) and all(room.check_in + timedelta(days=room.nights) < window_start for room in booking.rooms)
+
+  def _fingerprint(self, booking: BookingDetail) -> str:
+    return hashlib.blake2b(booking.model_dump_json().encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,251 @@
+"""
+In-memory caches used by the Ignite Travel clients
+"""
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from .entities import Availability
+
+
+class CacheInfo(BaseModel):
+  hits: int = Field(default=0)
+  misses: int = Field(default=0)
+  size: int = Field(default=0)  # number of entries currently stored
+  maxsize: int = Field(default=0)
+  ttl: float = Field(default=0.0)  # seconds an entry stays fresh
+
+
+class TTLCache:
+  """
+  Thread-safe LRU cache whose entries expire ttl seconds after they were stored
+  """
+
+  def __init__(self, ttl: float, maxsize: int = 128, timer: Callable[[], float] = time.monotonic):
+    if maxsize < 1:
+      raise ValueError("maxsize must be at least 1")
+    self.ttl = ttl
+    self.maxsize = maxsize
+    self.timer = timer
+    self.hits = 0
+    self.misses = 0
+    self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+    self._lock = threading.Lock()
+
+  def get(self, key: Hashable, default: Any = None) -> Any:
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None and entry[0] > self.timer():
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+      if entry is not None:
+        # expired entries are dropped as soon as they are looked up
+        del self._entries[key]
+      self.misses += 1
+      return default
+
+  def set(self, key: Hashable, value: Any):
+    with self._lock:
+      self._entries[key] = (self.timer() + self.ttl, value)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.maxsize:
+        self._entries.popitem(last=False)
+
+  def invalidate(self, key: Hashable):
+    with self._lock:
+      self._entries.pop(key, None)
+
+  def invalidate_where(self, predicate: Callable[[Hashable], bool]):
+    with self._lock:
+      for key in [key for key in self._entries if predicate(key)]:
+        del self._entries[key]
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+
+  def info(self) -> CacheInfo:
+    with self._lock:
+      return CacheInfo(hits=self.hits, misses=self.misses, size=len(self._entries), maxsize=self.maxsize, ttl=self.ttl)
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+
+class AvailabilityCache:
+  """
+  Thread-safe cache of the per-day availability of each (resort_id, room_id), every day keeps the time it was fetched.
+  Days DIMS returned nothing for are stored as empty so they are not requested again until they go stale.
+  Days written while a fetch was in flight are not overwritten by its older response.
+  At most maxsize rooms are kept, least recently used first out
+  """
+
+  def __init__(self, ttl: float, maxsize: int = 1024, timer: Callable[[], float] = time.monotonic):
+    if maxsize < 1:
+      raise ValueError("maxsize must be at least 1")
+    self.ttl = ttl
+    self.maxsize = maxsize
+    self.timer = timer
+    self.hits = 0  # days served from the cache
+    self.misses = 0  # days that had to be fetched
+    self._rooms = OrderedDict()  # (resort_id, room_id) -> {date: (fetched_at, Optional[Availability])}
+    self._version = 0  # incremented by every fetch and write
+    self._fetches = set()  # versions of the fetches in flight
+    # (resort_id, room_id) -> {date: version of its last write}, only kept while an older fetch is in flight
+    self._written = {}
+    self._lock = threading.Lock()
+
+  def missing_ranges(self, resort_id: int, room_id: int, start: date, end: date) -> List[Tuple[date, date]]:
+    """
+    The contiguous (start, end) ranges of days in the window that are missing or stale, oldest first
+    """
+    with self._lock:
+      days = self._touch(resort_id, room_id)
+      stale_before = self.timer() - self.ttl
+      ranges = []
+      day = start
+      while day <= end:
+        entry = days.get(day)
+        if entry is not None and entry[0] > stale_before:
+          self.hits += 1
+        else:
+          self.misses += 1
+          if ranges and ranges[-1][1] == day - timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+          else:
+            ranges.append((day, day))
+        day += timedelta(days=1)
+      return ranges
+
+  @contextmanager
+  def fetching(self) -> Iterator[int]:
+    """
+    Wrap the fetches whose results are stored, the version it yields is passed to store
+    """
+    with self._lock:
+      self._version += 1
+      started = self._version
+      self._fetches.add(started)
+    try:
+      yield started
+    finally:
+      with self._lock:
+        self._fetches.discard(started)
+        oldest = min(self._fetches, default=None)
+        for key, written in list(self._written.items()):
+          for day in [day for day, version in written.items() if oldest is None or version < oldest]:
+            del written[day]
+          if not written:
+            del self._written[key]
+
+  def store(self, resort_id: int, room_id: int, start: date, end: date, availability: List[Availability], started: Optional[int] = None):
+    """
+    Store the availability fetched for a window, days of the window without availability are stored as empty.
+    Days written after the fetch started are skipped, started is the version yielded by fetching
+    """
+    with self._lock:
+      fetched_at = self.timer()
+      days = self._room(resort_id, room_id)
+      # past days are never requested and stale ones are fetched again, neither is worth keeping
+      stale_before = fetched_at - self.ttl
+      today = date.today()
+      for day in [day for day, entry in days.items() if day < today or entry[0] <= stale_before]:
+        del days[day]
+      written = self._written.get((resort_id, room_id), {}) if started is not None else {}
+      fetched = dict.fromkeys(_days(start, end))
+      for entry in availability:
+        fetched[entry.dtm] = entry
+      for day, entry in fetched.items():
+        if day not in written or written[day] < started:
+          days[day] = (fetched_at, entry)
+
+  def window(self, resort_id: int, room_id: int, start: date, end: date) -> List[Availability]:
+    """
+    The cached availability of every day of the window, sorted by date
+    """
+    with self._lock:
+      days = self._touch(resort_id, room_id)
+      availability = []
+      day = start
+      while day <= end:
+        entry = days.get(day)
+        if entry is not None and entry[1] is not None:
+          availability.append(entry[1])
+        day += timedelta(days=1)
+      return availability
+
+  def write(self, resort_id: int, room_id: int, allocations: Dict[date, int], confirmed: bool):
+    """
+    Apply an inventory write to the cached days. Confirmed writes update the literal inventory of days that are cached
+    and keep the number of booked rooms, every other written day is dropped so it is fetched again
+    """
+    with self._lock:
+      self._version += 1
+      if self._fetches:
+        # fetches in flight may have read these days before the write
+        written = self._written.setdefault((resort_id, room_id), {})
+        for day in allocations:
+          written[day] = self._version
+      days = self._rooms.get((resort_id, room_id))
+      if days is None:
+        return
+      written_at = self.timer()
+      stale_before = written_at - self.ttl
+      for day, qty in allocations.items():
+        entry = days.pop(day, None)
+        if not confirmed or entry is None or entry[1] is None or entry[0] <= stale_before:
+          continue
+        cached = entry[1]
+        booked = cached.literal_inventory - cached.inventory_available
+        days[day] = (written_at, Availability(inventory_available=qty - booked, literal_inventory=qty, dtm=day))
+
+  def invalidate(self, resort_id: int, room_id: Optional[int] = None):
+    """
+    Drop the cached availability of one room, or of every room of the resort when room_id is not given
+    """
+    with self._lock:
+      for key in [key for key in self._rooms if key[0] == resort_id and room_id in (None, key[1])]:
+        del self._rooms[key]
+
+  def clear(self):
+    with self._lock:
+      self._rooms.clear()
+
+  def info(self) -> CacheInfo:
+    with self._lock:
+      return CacheInfo(hits=self.hits, misses=self.misses, size=len(self._rooms), maxsize=self.maxsize, ttl=self.ttl)
+
+  def _touch(self, resort_id: int, room_id: int) -> dict:
+    """
+    The cached days of a room, marking it as the most recently used
+    """
+    key = (resort_id, room_id)
+    days = self._rooms.get(key)
+    if days is None:
+      return {}
+    self._rooms.move_to_end(key)
+    return days
+
+  def _room(self, resort_id: int, room_id: int) -> dict:
+    key = (resort_id, room_id)
+    days = self._rooms.get(key)
+    if days is None:
+      days = self._rooms[key] = {}
+      while len(self._rooms) > self.maxsize:
+        self._rooms.popitem(last=False)
+    else:
+      self._rooms.move_to_end(key)
+    return days
+
+
+def _days(start: date, end: date) -> Iterator[date]:
+  day = start
+  while day <= end:
+    yield day
+    day += timedelta(days=1)
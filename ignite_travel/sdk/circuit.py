@@ -0,0 +1,108 @@
+"""
+Circuit breaker failing the requests to a degraded DIMS service fast
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from .exceptions import CircuitOpenError
+from .instrumentation import CircuitStateChange
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+  """
+  Opens once failure_rate of the last window requests to a service failed, counted from minimum_calls requests.
+  While open every request fails fast with a CircuitOpenError. After cool_down seconds half_open_calls trial requests
+  are let through, the circuit closes when they all succeed and opens again on the first failure.
+  An instance is shared by every thread and task using the clients it is given to
+  """
+
+  def __init__(self, failure_rate: float = 0.5, window: int = 20, minimum_calls: int = 10, cool_down: float = 30.0, half_open_calls: int = 1):
+    if not 0 < failure_rate <= 1:
+      raise ValueError("failure_rate must be between 0 and 1")
+    if window < 1 or minimum_calls < 1 or half_open_calls < 1:
+      raise ValueError("window, minimum_calls and half_open_calls must be at least 1")
+    if minimum_calls > window:
+      raise ValueError("minimum_calls cannot be larger than window")
+    self.failure_rate = failure_rate
+    self.window = window
+    self.minimum_calls = minimum_calls
+    self.cool_down = cool_down
+    self.half_open_calls = half_open_calls
+    self._state = CLOSED
+    # outcomes of the last requests of the current generation, True for a failure
+    self._outcomes = deque(maxlen=window)
+    # bumped on every change of state, outcomes of requests sent before the change are ignored
+    self._generation = 0
+    self._opened_at = 0.0
+    self._trials = 0
+    self._successes = 0
+    self._lock = threading.Lock()
+
+  @property
+  def state(self) -> str:
+    return self._state
+
+  def before_request(self, service: str, publish: Callable[[CircuitStateChange], None]) -> int:
+    """
+    Let a request to service through or raise a CircuitOpenError, the returned generation is given back to after_request
+    """
+    change = None
+    with self._lock:
+      if self._state == OPEN:
+        remaining = self._opened_at + self.cool_down - time.monotonic()
+        if remaining > 0:
+          raise CircuitOpenError(service, remaining)
+        change = self._change(service, HALF_OPEN)
+      if self._state == HALF_OPEN:
+        if self._trials >= self.half_open_calls:
+          # the trial requests have not finished yet
+          raise CircuitOpenError(service, 0.0)
+        self._trials += 1
+      generation = self._generation
+    if change is not None:
+      publish(change)
+    return generation
+
+  def after_request(self, service: str, generation: int, failed: Optional[bool], publish: Callable[[CircuitStateChange], None]):
+    """
+    Record the outcome of a request, failed is None for a request abandoned before it had one
+    """
+    change = None
+    with self._lock:
+      if generation != self._generation:
+        return
+      if self._state == HALF_OPEN:
+        if failed is None:
+          self._trials -= 1
+        elif failed:
+          change = self._change(service, OPEN)
+        else:
+          self._successes += 1
+          if self._successes >= self.half_open_calls:
+            change = self._change(service, CLOSED)
+      elif failed is not None:
+        self._outcomes.append(failed)
+        if len(self._outcomes) >= self.minimum_calls:
+          rate = sum(self._outcomes) / len(self._outcomes)
+          if rate >= self.failure_rate:
+            change = self._change(service, OPEN, rate)
+    if change is not None:
+      publish(change)
+
+  def _change(self, service: str, state: str, failure_rate: Optional[float] = None) -> CircuitStateChange:
+    change = CircuitStateChange(service=service, previous=self._state, state=state, failure_rate=failure_rate)
+    self._state = state
+    self._generation += 1
+    self._outcomes.clear()
+    self._trials = 0
+    self._successes = 0
+    if state == OPEN:
+      self._opened_at = time.monotonic()
+    return change
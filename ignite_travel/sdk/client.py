@@ -1,12 +1,26 @@
 """
 Main client for interacting with the Ignite Travel API
 """
-import xml.etree.ElementTree as ET
-import os
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 
+from .base import BaseDimsClient, BookingEventReader, MassUpdateBody
+from .columnar import AvailabilityColumns, AvailabilityGrid, require_numpy
 from .entities import *
+from .exceptions import MassUpdateError
+from .instrumentation import Instrumentation, current_call, phase, record_bytes, record_coalesced, record_retry, timed_iter
+from .circuit import CircuitBreaker
+from .disk_cache import DiskCache
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+from .throttle import RateLimit
+from .xml_backend import XmlBackend
 
+from typing import Iterator, Tuple, Union
 from datetime import date, datetime
 
 import logging
@@ -14,370 +28,376 @@ import logging
 logging.basicConfig(level=logging.INFO)
 
 
-class DimsInventoryClient:
-  # URLs for the inventory and rates services
-  _INVENTORY_SERVICE_URL_ = "https://dims.ignitetravel.com/IMSXML/RewardsCorpIMS.asmx?wsdl"
-  _RATES_SERVICE_URL_ = "https://dims.ignitetravel.com/RMSXML/RateInterfaceService.asmx?wsdl"
-
-  def __init__(self):
-    self.username = os.getenv("IGNITE_USERNAME", None)
-    self.password = os.getenv("IGNITE_PASSWORD", None)
-    self.token = os.getenv("IGNITE_TOKEN", None)
-
-    # check if the username, password and token are set
-    if not all([self.username, self.password, self.token]):
-      raise ValueError("Username, password and token must be set in the environment variables.")
-
-  def format_soap_envelope(self, payload: str):
-    return f"""<?xml version="1.0" encoding="utf-8"?>
-<soap:Envelope xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
-               xmlns:xsd="http://www.w3.org/2001/XMLSchema"
-               xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
-    <soap:Header>
-        <Authentication xmlns="https://dims.ignitetravel.com/IMSXML">
-            <UserName>{self.username}</UserName>
-            <PassWord>{self.password}</PassWord>
-            <Token>{self.token}</Token>
-        </Authentication>
-    </soap:Header>
-    <soap:Body>
-        {payload}
-    </soap:Body>
-</soap:Envelope>"""
-  
-  def make_request(self, method:str, payload: str, action_header: str = "GetRoomList", service_type: str = "inventory"):
-    """Payload is the XML payload for the request"""
-    data = self.format_soap_envelope(payload)
-    response = requests.request(
-      method=method,
-      url=self._INVENTORY_SERVICE_URL_ if service_type == 'inventory' else self._RATES_SERVICE_URL_,
-      headers={
-        "Content-Type": "text/xml; charset=utf-8",
-        "SOAPAction": f"https://dims.ignitetravel.com/IMSXML/{action_header}"
-      },
-      data=data
-    )
-    response.raise_for_status()
+class DimsInventoryClient(BaseDimsClient):
+  _TRANSPORT_ERRORS_ = (requests.ConnectionError, requests.Timeout)
+
+  def __init__(
+    self,
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    keep_alive_timeout: float = 60.0,
+    max_dates_per_request: Optional[int] = None,
+    instrumentation: Optional[Instrumentation] = None,
+    roomlist_cache_ttl: Optional[float] = None,
+    roomlist_cache_size: int = 128,
+    availability_cache_ttl: Optional[float] = None,
+    availability_cache_size: int = 1024,
+    validate_entities: bool = True,
+    xml_backend: Optional[Union[str, XmlBackend]] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    rate_limits: Optional[Dict[str, RateLimit]] = None,
+    circuit_breakers: Optional[Dict[str, CircuitBreaker]] = None,
+    coalesce_reads: bool = True,
+    disk_cache: Optional[DiskCache] = None,
+    timeout: Union[float, Tuple[float, float]] = (10.0, 60.0)
+  ):
+    """
+    pool_connections is the number of per-host connection pools to keep,
+    pool_maxsize is the maximum number of connections kept per host and
+    keep_alive_timeout is the number of seconds an idle connection is kept open.
+    max_dates_per_request splits larger inventory updates into concurrent chunks and
+    instrumentation receives the per-phase timings of every call.
+    roomlist_cache_ttl enables a cache of up to roomlist_cache_size room lists kept for that many seconds and
+    availability_cache_ttl a per-day availability cache of up to availability_cache_size rooms.
+    validate_entities=False builds the availability models without pydantic validation, trusting the types the parser produced.
+    xml_backend is "stdlib" (the default), "lxml" or an XmlBackend.
+    retry_policy decides how reads and idempotent writes are retried after a transient failure (3 attempts by default).
+    rate_limits maps a service type, inventory or rates, to the RateLimit its requests are throttled by
+    and circuit_breakers to the CircuitBreaker that fails its requests fast while it is degraded.
+    coalesce_reads lets identical reads made at the same time share one request and
+    disk_cache stores parsed room lists, availability and bookings in a DiskCache shared by the processes of the host.
+    timeout is the seconds to wait for a connection and then for each read of the response, or a (connect, read) pair
+    """
+    super().__init__(instrumentation, roomlist_cache_ttl, roomlist_cache_size, availability_cache_ttl, availability_cache_size, validate_entities, xml_backend, retry_policy, rate_limits, circuit_breakers, disk_cache)
+    self.max_dates_per_request = max_dates_per_request
+    self.coalesce_reads = coalesce_reads
+    self._flights = SingleFlight()
+
+    # the session is shared by every call so connections are reused between requests
+    self.pool_connections = pool_connections
+    self.pool_maxsize = pool_maxsize
+    self.keep_alive_timeout = keep_alive_timeout
+    # a hung server raises requests.Timeout, which is retried and counted by the circuit breaker
+    self.timeout = timeout
+    self.session = self._create_session()
+    self._last_request_at = None
+    self._session_lock = threading.Lock()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  def close(self):
+    """
+    Close every pooled connection held by the client
+    """
+    self.session.close()
+
+  def _create_session(self) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+  def _expire_idle_connections(self):
+    """
+    Drop the pooled connections when they have been idle longer than keep_alive_timeout,
+    the server may already have closed them and the next request would fail on a stale socket
+    """
+    with self._session_lock:
+      now = time.monotonic()
+      if self._last_request_at is not None and now - self._last_request_at > self.keep_alive_timeout:
+        # closing the session only clears the pools, it can still be used afterwards
+        self.session.close()
+      self._last_request_at = now
+
+  def _send(self, method:str, payload: Union[str, MassUpdateBody], action_header: str, service_type: str, stream: bool = False, idempotent: bool = False) -> requests.Response:
+    with phase("build"):
+      # a streamed body already holds its envelope, requests sends it with its Content-Length as it is produced
+      data = payload if isinstance(payload, MassUpdateBody) else self.build_envelope(payload)
+    rate_limit = self.rate_limits.get(service_type)
+    attempt = 1
+    while True:
+      generation = self._before_request(service_type)
+      record_bytes(request_bytes=len(data))
+      self._expire_idle_connections()
+      try:
+        # a streamed response is read after its slot is released
+        with rate_limit.acquire(current_call()) if rate_limit else nullcontext(), phase("network"):
+          response = self.session.request(
+            method=method,
+            url=self.service_url(service_type),
+            headers=self.request_headers(action_header),
+            data=data,
+            stream=stream,
+            timeout=self.timeout
+          )
+      except Exception as e:
+        self._after_request(service_type, generation, error=e)
+        delay = self._retry_delay(action_header, attempt, idempotent, error=e)
+        if delay is None:
+          raise
+      except BaseException:
+        self._after_request(service_type, generation, abandoned=True)
+        raise
+      else:
+        # the body of a streamed response is only read for the fault of a server error
+        fault = self._fault_code(response.content) if response.status_code >= 500 else None
+        self._after_request(service_type, generation, status=response.status_code, fault=fault)
+        delay = self._retry_delay(action_header, attempt, idempotent, status=response.status_code, headers=response.headers, fault=fault)
+        if delay is None:
+          try:
+            response.raise_for_status()
+          except Exception:
+            # a streamed response holds its connection until it is closed
+            response.close()
+            raise
+          return response
+        # release the connection before waiting
+        response.close()
+      record_retry()
+      with phase("backoff"):
+        time.sleep(delay)
+      attempt += 1
+
+  def make_request(self, method:str, payload: Union[str, MassUpdateBody], action_header: str = "GetRoomList", service_type: str = "inventory", idempotent: bool = False):
+    """
+    Payload is the XML payload for the request, or a body streamed while it is sent.
+    Transient failures are only retried following the retry policy when idempotent is True, reads pass it themselves
+    """
+    response = self._send(method, payload, action_header, service_type, idempotent=idempotent)
+    record_bytes(response_bytes=len(response.content))
     return response.text
-  
+
+  def _read(self, payload: str, action_header: str) -> str:
+    """
+    make_request for reads, a read of the same action and payload already in flight is shared instead of sent again
+    """
+    if not self.coalesce_reads:
+      return self.make_request("POST", payload, action_header, idempotent=True)
+    key = (action_header, payload, self._write_generation)
+    response, shared = self._flights.do(key, lambda: self.make_request("POST", payload, action_header, idempotent=True))
+    if shared:
+      record_coalesced()
+    return response
+
   def get_roomlist(self, resort_id: int, action_header: str = "GetRoomList") -> RoomList:
     """
-    Get the room list for a given resort
-    """
-    try:
-      resort_id = int(resort_id)
-    except ValueError:
-      raise ValueError("Resort ID must be an integer")
-    
-    soap_body = f"""<GetRoomList xmlns="https://dims.ignitetravel.com/IMSXML">
-            <Message>
-                <RewardsCorpIMS xmlns="">
-                    <Request>RoomsList</Request>
-                    <ResortId>{resort_id}</ResortId>
-                </RewardsCorpIMS>
-            </Message>
-        </GetRoomList>"""
-    response = self.make_request("POST", soap_body, action_header)
-    # parse the xml response into a RoomList object
-    root = ET.fromstring(response)
-    rooms = []
-    # Extract the rooms from the response
-    for room in root.findall(".//Room"):
-      room_id = room.find("RoomTypeId").text
-      description = room.find("Description").text
-      room_model = Room(room_id=int(room_id), room_name=description)
-      rooms.append(room_model)
-    # Extract linked rates
-    for linked_rate in root.findall(".//LinkedRate"):
-      # handle the case where the linked rate is not present
-      if linked_rate.find("RateId") is None or linked_rate.find("RoomId") is None or linked_rate.find("RateDescription") is None:
-        continue
-      rate_id = linked_rate.find("RateId").text
-      rate_description = linked_rate.find("RateDescription").text
-      room_id = linked_rate.find("RoomId").text
-      linked_rate_model = LinkedRate(rate_id=int(rate_id), rate_description=rate_description, room_id=int(room_id))
-      # get the room model that matches the room_type_id
-      room_model = next((r for r in rooms if r.room_id == int(room_id)), None)
-      if room_model:
-        room_model.linked_rate = linked_rate_model
-    
-    return RoomList(rooms=rooms)
-  
+    Get the room list for a given resort, served from the room list cache when it is enabled.
+    Cached room lists are shared between callers and should not be modified
+    """
+    if self._roomlist_cache is not None:
+      key = self._roomlist_cache_key(resort_id, action_header)
+      room_list = self._roomlist_cache.get(key)
+      if room_list is not None:
+        return room_list
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._build_roomlist_body(resort_id)
+      room_list = self._from_disk("roomlist", action_header, soap_body)
+      if room_list is None:
+        response = self._read(soap_body, action_header)
+        room_list = self._parse_roomlist(response)
+        self._to_disk("roomlist", action_header, soap_body, room_list, resort_id)
+    if self._roomlist_cache is not None:
+      self._roomlist_cache.set(key, room_list)
+    return room_list
+
   def retrieve_availability(self, room_id:int, resort_id:int, start_date:str, end_date:str, action_header: str = "RetrieveAvailability") -> List[Availability]:
     """
-    Get the availability for a given room and date range
-    """
-    # convert the start and end dates to the format YYYY-MM-DD
-    # check if resort id and room id can be converted to int
-    try:
-      resort_id = int(resort_id)
-      room_id = int(room_id)
-    except ValueError:
-      raise ValueError("Resort ID and Room ID must be integers")
-    # check if the start and end dates are valid
-    try:
-      start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-      end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-    except ValueError:
-      raise ValueError("Invalid date format")
-    if start_date > end_date:
-      raise ValueError("Start date must be before end date")
-    if start_date < datetime.now().date():
-      raise ValueError("Start date must be in the future")
-    if end_date < datetime.now().date():
-      raise ValueError("End date must be in the future")
-    start_date = start_date.strftime("%Y-%m-%d")
-    end_date = end_date.strftime("%Y-%m-%d")
-    soap_body = f"""<RetrieveAvailability xmlns="https://dims.ignitetravel.com/IMSXML">
-            <Message>
-                <RewardsCorpIMS xmlns="">
-                    <Request>Availability</Request>
-                    <RoomId>{room_id}</RoomId>
-                    <ResortId>{resort_id}</ResortId>
-                    <Dates>
-                        <Date>{start_date}</Date>
-                        <Date>{end_date}</Date>
-                    </Dates>
-                </RewardsCorpIMS>
-            </Message>
-        </RetrieveAvailability>"""
-    response = self.make_request("POST", soap_body, action_header)
-    root = ET.fromstring(response)
-    availability = []
-    for dateset in root.findall(".//DateSet"):
-      inventory_available = dateset.find("InventoryAvailable").text
-      literal_inventory = dateset.find("LiteralInventory").text
-      dtm = datetime.strptime(dateset.find("Date").text, "%d-%m-%Y").date()
-      availability.append(Availability(inventory_available=int(inventory_available), literal_inventory=int(literal_inventory), dtm=dtm))
-    # ensure the availability is sorted by dtm
-    availability.sort(key=lambda x: x.dtm)  # sort the availability by dtm i,e current date to end date
-    return availability
-  
-  def availability_mass_update(self, room_id:int, resort_id:int, dates:List[str], qty:int, action_header: str = "UpdateInventory") -> str:
-    """
-    Update the availability for a given room and date range
-    """
-    try:
-      room_id = int(room_id)
-      resort_id = int(resort_id)
-    except ValueError:
-      raise ValueError("Room ID, Resort ID and Quantity must be integers")
-    # check if the dates are valid
-    dates_list = []
-    qty_list = []
-    for date, qty in zip(dates, qty):
-      try:
-        date = datetime.strptime(date, "%d-%m-%Y").date()
-        qty = int(qty)
-      except ValueError:
-        raise ValueError("Invalid date format")
-      dates_list.append(date)
-      qty_list.append(qty)
-    
-    # create the dates set
-    dates_set = []
-    for date, qty in zip(dates_list, qty_list):
-      dates_set.append(f"<DatesSet><Date>{date}</Date><InventoryAllocation>{qty}</InventoryAllocation></DatesSet>")
-    
-    dates_set = "\n".join(dates_set)
-
-    # create the soap body
-    soap_body = f"""<UpdateInventory xmlns="https://dims.ignitetravel.com/IMSXML">
-            <Message>
-                <RewardsCorpIMS xmlns="">
-                    <Request>InventoryUpdate</Request>
-                    <RoomId>{room_id}</RoomId>
-                    <ResortId>{resort_id}</ResortId>
-                    <Dates>
-                        {dates_set}
-                    </Dates>
-                </RewardsCorpIMS>
-            </Message>
-        </UpdateInventory>"""
-    response = self.make_request("POST", soap_body, action_header)
-    root = ET.fromstring(response)
-    message = root.find(".//Message").text
-    return message
+    Get the availability for a given room and date range.
+    When the availability cache is enabled only the days missing from the cache, or stale, are fetched
+    """
+    if self._availability_cache is None:
+      return self._fetch_availability(room_id, resort_id, start_date, end_date, action_header)
+    room_id, resort_id, start, end = self._availability_window(room_id, resort_id, start_date, end_date)
+    for range_start, range_end in self._availability_cache.missing_ranges(resort_id, room_id, start, end):
+      with self._availability_cache.fetching() as started:
+        availability = self._fetch_availability(room_id, resort_id, range_start.strftime("%Y-%m-%d"), range_end.strftime("%Y-%m-%d"), action_header)
+        self._availability_cache.store(resort_id, room_id, range_start, range_end, availability, started)
+    return self._availability_cache.window(resort_id, room_id, start, end)
 
-  
-  def update_availability(self, room_id:int, resort_id:int, date:str, qty:int, action_header: str = "UpdateInventory") -> str:
-    """
-    Update the availability for a given room and date
-    """
-    try:
-      room_id = int(room_id)
-      resort_id = int(resort_id)
-      qty = int(qty)
-    except ValueError:
-      raise ValueError("Room ID, Resort ID and Quantity must be integers")
-    # check if the date is valid
-    try:
-      date = datetime.strptime(date, "%d-%m-%Y").date()
-    except ValueError:
-      raise ValueError("Invalid date format")
-    soap_body = f"""<UpdateInventory xmlns="https://dims.ignitetravel.com/IMSXML">
-            <Message>
-                <RewardsCorpIMS xmlns="">
-                    <Request>InventoryUpdate</Request>
-                    <RoomId>{room_id}</RoomId>
-                    <ResortId>{resort_id}</ResortId>
-                    <Dates>
-                        <DatesSet>
-                            <Date>{date}</Date>
-                            <InventoryAllocation>{qty}</InventoryAllocation>
-                        </DatesSet>
-                    </Dates>
-                </RewardsCorpIMS>
-            </Message>
-        </UpdateInventory>"""
-    response = self.make_request("POST", soap_body, action_header)
-    root = ET.fromstring(response)
-    message = root.find(".//Message").text
+  def _fetch_availability(self, room_id:int, resort_id:int, start_date:str, end_date:str, action_header: str) -> List[Availability]:
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._build_availability_body(room_id, resort_id, start_date, end_date)
+      # a response sent before a write must not be stored after the write dropped the room from disk
+      generation = self._write_generation
+      result = self._from_disk("availability", action_header, soap_body)
+      if result is None:
+        response = self._read(soap_body, action_header)
+        result = self._parse_availability(response)
+        self._to_disk("availability", action_header, soap_body, result, resort_id, room_id, generation)
+      return result
+
+  def retrieve_availability_for_resort(self, resort_id:int, start_date:str, end_date:str, max_workers: Optional[int] = None) -> Dict[int, List[Availability]]:
+    """
+    Get the availability of every room of a resort for a date range, keyed by room_id.
+    The rooms are fetched concurrently with up to max_workers requests in flight (defaults to pool_maxsize)
+    """
+    room_list = self.get_roomlist(resort_id)
+    room_ids = [room.room_id for room in room_list.rooms]
+    if not room_ids:
+      return {}
+    with ThreadPoolExecutor(max_workers=max_workers or self.pool_maxsize) as executor:
+      results = executor.map(lambda room_id: self.retrieve_availability(room_id, resort_id, start_date, end_date), room_ids)
+      return dict(zip(room_ids, results))
+
+  def retrieve_availability_columns(self, room_id:int, resort_id:int, start_date:str, end_date:str, action_header: str = "RetrieveAvailability") -> AvailabilityColumns:
+    """
+    Get the availability for a given room and date range as NumPy arrays, requires numpy.
+    No Availability model is built unless the availability cache is enabled
+    """
+    require_numpy()
+    if self._availability_cache is not None:
+      return AvailabilityColumns.from_availability(self.retrieve_availability(room_id, resort_id, start_date, end_date, action_header))
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._build_availability_body(room_id, resort_id, start_date, end_date)
+      response = self._read(soap_body, action_header)
+      return self._parse_availability_columns(response)
+
+  def retrieve_availability_grid(self, resort_id:int, start_date:str, end_date:str, max_workers: Optional[int] = None) -> AvailabilityGrid:
+    """
+    Get the availability of every room of a resort for a date range as room x date matrices, requires numpy.
+    The rooms are fetched concurrently with up to max_workers requests in flight (defaults to pool_maxsize)
+    """
+    require_numpy()
+    _, resort_id, start, end = self._availability_window(0, resort_id, start_date, end_date)
+    room_ids = [room.room_id for room in self.get_roomlist(resort_id).rooms]
+    with ThreadPoolExecutor(max_workers=max_workers or self.pool_maxsize) as executor:
+      columns = executor.map(lambda room_id: self.retrieve_availability_columns(room_id, resort_id, start_date, end_date), room_ids)
+      return AvailabilityGrid.from_columns(dict(zip(room_ids, columns)), start, end)
+
+  def availability_mass_update(self, room_id:int, resort_id:int, dates:List[str], qty:int, action_header: str = "UpdateInventory", idempotent: bool = False) -> str:
+    """
+    Update the availability for a given room and date range.
+    Updates larger than max_dates_per_request are split into chunks, a MassUpdateError is raised if any chunk fails.
+    The update is only retried after a transient failure when it is marked idempotent
+    """
+    if self.max_dates_per_request and len(dates) > self.max_dates_per_request:
+      result = self.chunked_availability_mass_update(room_id, resort_id, dates, qty, action_header=action_header, idempotent=idempotent)
+      if result.failed_chunks:
+        raise MassUpdateError(result)
+      return result.message
+    message, _ = self._send_mass_update(room_id, resort_id, dates, qty, action_header, idempotent)
     return message
-  
+
+  def _send_mass_update(self, room_id:int, resort_id:int, dates:List[str], qty:List[int], action_header: str, idempotent: bool = False) -> Tuple[str, bool]:
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._mass_update_payload(room_id, resort_id, dates, qty)
+      with self._inventory_write(room_id, resort_id, dates, qty) as write:
+        response = self.make_request("POST", soap_body, action_header, idempotent=idempotent)
+        write.message, write.confirmed = self._parse_update(response)
+      return write.message, write.confirmed
+
+  def chunked_availability_mass_update(self, room_id:int, resort_id:int, dates:List[str], qty:List[int], max_dates_per_request: Optional[int] = None, max_workers: Optional[int] = None, action_header: str = "UpdateInventory", idempotent: bool = False) -> MassUpdateResult:
+    """
+    Update the availability for a given room and date range in chunks of at most max_dates_per_request dates
+    (defaults to the client setting), sent concurrently by up to max_workers threads (defaults to pool_maxsize).
+    Chunks that raised or that DIMS did not confirm are reported as failed in the result instead of raising so they can be retried
+    """
+    chunks = self._split_mass_update(dates, qty, max_dates_per_request or self.max_dates_per_request or max(len(dates), 1))
+    # validate every chunk before anything is sent
+    for chunk in chunks:
+      self._mass_update_body(room_id, resort_id, chunk.dates, chunk.qty)
+
+    def send(chunk: MassUpdateChunk):
+      try:
+        chunk.message, confirmed = self._send_mass_update(room_id, resort_id, chunk.dates, chunk.qty, action_header, idempotent)
+      except Exception as e:
+        chunk.error = f"{type(e).__name__}: {e}"
+      else:
+        if not confirmed:
+          # DIMS answered without applying the chunk
+          chunk.error = f"Update rejected: {chunk.message}"
+
+    if chunks:
+      with ThreadPoolExecutor(max_workers=max_workers or self.pool_maxsize) as executor:
+        list(executor.map(send, chunks))
+    return MassUpdateResult(chunks=chunks)
+
+  def reconcile_availability(self, room_id:int, resort_id:int, dates:List[str], qty:List[int], snapshot: Optional[List[Availability]] = None, action_header: str = "UpdateInventory", idempotent: bool = False) -> InventoryReconciliation:
+    """
+    Update the availability for a given room, sending only the dates whose literal inventory differs
+    from the desired quantity. snapshot is the current availability of the room, when it is not given
+    it is retrieved for the range covered by the dates
+    """
+    desired = self._desired_inventory(dates, qty)
+    if not desired:
+      return InventoryReconciliation()
+    if snapshot is None:
+      snapshot = self.retrieve_availability(room_id, resort_id, min(desired).strftime("%Y-%m-%d"), max(desired).strftime("%Y-%m-%d"))
+    reconciliation = self._reconcile_inventory(desired, snapshot)
+    if reconciliation.written:
+      reconciliation.message = self.availability_mass_update(
+        room_id,
+        resort_id,
+        [day.strftime("%d-%m-%Y") for day in reconciliation.written],
+        [desired[day] for day in reconciliation.written],
+        action_header,
+        idempotent
+      )
+    return reconciliation
+
+  def update_availability(self, room_id:int, resort_id:int, date:str, qty:int, action_header: str = "UpdateInventory", idempotent: bool = False) -> str:
+    """
+    Update the availability for a given room and date, only retried after a transient failure when it is marked idempotent
+    """
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._build_update_body(room_id, resort_id, date, qty)
+      with self._inventory_write(room_id, resort_id, [date], [qty]) as write:
+        response = self.make_request("POST", soap_body, action_header, idempotent=idempotent)
+        write.message, write.confirmed = self._parse_update(response)
+      return write.message
+
   def get_bookings(self, resort_id:int, start_date:str, end_date:str, action_header: str = "GetBookingsListWithRoomRateIds") -> List[BookingDetail]:
     """
     Get the bookings for a given resort and date range
     """
-    try:
-      resort_id = int(resort_id)
-    except ValueError:
-      raise ValueError("Resort ID must be an integer")
-    try:
-      start_date = datetime.strptime(start_date, "%Y-%m-%d").date().strftime("%d-%b-%Y")  # 1st June 2025
-      end_date = datetime.strptime(end_date, "%Y-%m-%d").date().strftime("%d-%b-%Y")  # 30th June 2025
-    except ValueError:
-      raise ValueError("Invalid date format")
-    soap_body = f"""<GetBookingsListWithRoomRateIds xmlns="https://dims.ignitetravel.com/IMSXML">
-            <Message>
-                <RewardsCorpIMS xmlns="">
-                    <Request>GetBookingsListWithRoomRateIds</Request>
-                    <ResortId>{resort_id}</ResortId>
-                    <Dates>
-                        <Date>{start_date}</Date>
-                        <Date>{end_date}</Date>
-                    </Dates>
-                </RewardsCorpIMS>
-            </Message>
-        </GetBookingsListWithRoomRateIds>"""
-    response = self.make_request("POST", soap_body, action_header)
-    root = ET.fromstring(response)
-    # first check if there are any bookings before parsing each booking
-    message_type = root.find(".//MessageType")
-    message = root.find(".//Message")
-    if message_type and message_type.text == "Error":
-        return []
-    # parse the bookings
-    bookings = []
-    for booking in root.findall(".//Booking"):
-      booking_number = booking.find(".//BookingNumber").text
-      booking_details = booking.find(".//BookingDetails")
-      booking_status_id = booking_details.find(".//BookingStatusId").text
-      booking_status_description = booking_details.find(".//BookingStatusDescription").text
-      resort_id = booking_details.find(".//ResortId").text
-      resort_name = booking_details.find(".//ResortName").text
-      resort_currency = booking_details.find(".//ResortCurrency").text
-      rooms = []
-      for room in booking.findall(".//Rooms/Room"):
-        booking_id = room.find(".//BookingId").text
-        room_details = room.find(".//RoomDetails")
-        room_id = room_details.find(".//RoomId").text
-        room_description = room_details.find(".//RoomDescription").text
-        date_booked = room_details.find(".//DateBooked").text
-        check_in = room_details.find(".//CheckIn").text
-        nights = room_details.find(".//Nights").text
-        adults = room_details.find(".//Adults").text
-        children = room_details.find(".//Children").text
-        infants = room_details.find(".//Infants").text
-        special_requests = room_details.find(".//SpecialRequests").text if room_details.find(".//SpecialRequests") is not None else None
-        first_name = room_details.find(".//GivenNames").text if room_details.find(".//GivenNames") is not None else None
-        surname = room_details.find(".//Surname").text if room_details.find(".//Surname") is not None else None
-        address = room_details.find(".//Address").text if room_details.find(".//Address") is not None else None
-        suburb = room_details.find(".//Suburb").text if room_details.find(".//Suburb") is not None else None
-        state = room_details.find(".//State").text if room_details.find(".//State") is not None else None
-        postcode = room_details.find(".//Postcode").text if room_details.find(".//Postcode") is not None else None
-        email_address = room_details.find(".//EmailAddress").text if room_details.find(".//EmailAddress") is not None else None
-        phone_number = room_details.find(".//PhoneNumber").text if room_details.find(".//PhoneNumber") is not None else None
-        room_detail = RoomDetail(
-          booking_id=booking_id,
-          room_id=room_id,
-          room_description=room_description,
-          date_booked=date_booked,
-          check_in=check_in,
-          nights=nights,
-          adults=adults,
-          children=children,
-          infants=infants,
-          special_requests=special_requests,
-          first_name=first_name,
-          surname=surname,
-          address=address,
-          suburb=suburb,
-          state=state,
-          postcode=postcode,
-          email_address=email_address,
-          phone_number=phone_number
-        )
-        rooms.append(room_detail)
-      booking_detail = BookingDetail(
-        booking_number=booking_number,
-        booking_status_id=booking_status_id,
-        booking_status_description=booking_status_description,
-        rooms=rooms,
-        resort_id=resort_id,
-        resort_name=resort_name,
-        resort_currency=resort_currency
-      )
-      bookings.append(booking_detail)
-    return bookings
-  
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._build_bookings_body(resort_id, start_date, end_date)
+      result = self._from_disk("bookings", action_header, soap_body)
+      if result is None:
+        response = self._read(soap_body, action_header)
+        result = self._parse_bookings(response)
+        self._to_disk("bookings", action_header, soap_body, result, resort_id)
+      return result
+
+  def iter_bookings(self, resort_id:int, start_date:str, end_date:str, action_header: str = "GetBookingsListWithRoomRateIds") -> Iterator[BookingDetail]:
+    """
+    Stream the bookings for a given resort and date range, parsing the response incrementally
+    and yielding one BookingDetail at a time so memory stays flat for large date windows
+    """
+    # the call is only bound while no booking is pending, reads from the stream are reported under parse
+    with self._record_call(action_header, bind=False) as call:
+      with call.bind():
+        with phase("build"):
+          soap_body = self._build_bookings_body(resort_id, start_date, end_date)
+        response = self._send("POST", soap_body, action_header, "inventory", stream=True, idempotent=True)
+      with response:
+        # let urllib3 undo any content encoding while iterparse reads from the socket
+        response.raw.decode_content = True
+        reader = BookingEventReader(self._parse_booking)
+        yield from timed_iter(call, "parse", reader.consume(self.xml.iterparse(response.raw, events=("start", "end"))))
+        call.add_bytes(response_bytes=response.raw.tell())
 
   def get_cancelled_bookings(self, resort_id:int, start_date:str, end_date:str, action_header: str = "RetrieveCancelledBookings"):
     """
     Get the cancelled bookings for a given resort and date range
     """
-    try:
-      resort_id = int(resort_id)
-    except ValueError:
-      raise ValueError("Resort ID must be an integer")
-    try:
-      start_date = datetime.strptime(start_date, "%Y-%m-%d").date().strftime("%d-%m-%Y")
-      end_date = datetime.strptime(end_date, "%Y-%m-%d").date().strftime("%d-%m-%Y")
-    except ValueError:
-      raise ValueError("Invalid date format")
-    soap_body = f"""<RetrieveCancelledBookings xmlns="https://dims.ignitetravel.com/IMSXML">
-            <Message>
-                <RewardsCorpIMS xmlns="">
-                    <Request>RetrieveCancelledBookings</Request>
-                    <ResortId>{resort_id}</ResortId>
-                    <Dates>
-                        <Date>{start_date}</Date>
-                        <Date>{end_date}</Date>
-                    </Dates>
-                </RewardsCorpIMS>
-            </Message>
-        </RetrieveCancelledBookings>"""
-    response = self.make_request("POST", soap_body, action_header)
-    root = ET.fromstring(response)
-    # first check if there are any bookings before parsing each booking
-    message_type = root.find(".//MessageType")
-    message = root.find(".//Message")
-    if message_type and message_type.text == "Error":
-        return []
-    # parse the bookings
-    bookings = []
-    for booking in root.findall(".//Booking"):
-      booking_id = booking.find(".//BookingId").text
-      booking_number = booking.find(".//BookingNumber").text
-      booking_status_id = booking.find(".//BookingStatusId").text
-      booking_status_description = booking.find(".//BookingStatusDescription").text
-      booking_change_date = booking.find(".//BookingChangeDate").text
-      cancelled_booking = CancelledBooking(
-        booking_id=booking_id,
-        booking_number=booking_number,
-        booking_status_id=booking_status_id,
-        booking_status_description=booking_status_description,
-        booking_change_date=booking_change_date
-      )
-      bookings.append(cancelled_booking)
-    return bookings
\ No newline at end of file
+    with self._record_call(action_header):
+      with phase("build"):
+        soap_body = self._build_cancelled_bookings_body(resort_id, start_date, end_date)
+      result = self._from_disk("cancelled_bookings", action_header, soap_body)
+      if result is None:
+        response = self._read(soap_body, action_header)
+        result = self._parse_cancelled_bookings(response)
+        self._to_disk("cancelled_bookings", action_header, soap_body, result, resort_id)
+      return result
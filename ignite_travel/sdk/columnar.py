@@ -0,0 +1,143 @@
+"""
+Columnar availability backed by NumPy arrays, for windows and resorts too large to hold as one model per day
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterable, List
+
+try:
+  import numpy as np
+except ImportError:  # numpy is an optional dependency
+  np = None
+
+from .entities import Availability, construct
+
+
+# value of the days DIMS did not return for a room of an AvailabilityGrid
+MISSING = -1
+
+
+def require_numpy():
+  if np is None:
+    raise ImportError("numpy is required for columnar availability, install it with `pip install ignite-travel[columnar]`")
+
+
+class AvailabilityColumns:
+  """
+  Availability of one room as contiguous arrays sorted by date, dates are day ordinals (date.toordinal())
+  """
+
+  def __init__(self, dates, inventory_available, literal_inventory):
+    require_numpy()
+    self.dates = np.asarray(dates, dtype=np.int64)
+    self.inventory_available = np.asarray(inventory_available, dtype=np.int64)
+    self.literal_inventory = np.asarray(literal_inventory, dtype=np.int64)
+
+  @classmethod
+  def from_rows(cls, dates: Iterable[int], inventory_available: Iterable[int], literal_inventory: Iterable[int]) -> "AvailabilityColumns":
+    """
+    Build the columns from parallel sequences in any order, they are sorted by date
+    """
+    columns = cls(dates, inventory_available, literal_inventory)
+    order = np.argsort(columns.dates, kind="stable")
+    columns.dates = columns.dates[order]
+    columns.inventory_available = columns.inventory_available[order]
+    columns.literal_inventory = columns.literal_inventory[order]
+    return columns
+
+  @classmethod
+  def from_availability(cls, availability: List[Availability]) -> "AvailabilityColumns":
+    return cls.from_rows(
+      [day.dtm.toordinal() for day in availability],
+      [day.inventory_available for day in availability],
+      [day.literal_inventory for day in availability]
+    )
+
+  def __len__(self) -> int:
+    return len(self.dates)
+
+  @property
+  def booked(self):
+    """
+    Rooms booked on each day, literal_inventory - inventory_available
+    """
+    return self.literal_inventory - self.inventory_available
+
+  def day(self, index: int) -> date:
+    return date.fromordinal(int(self.dates[index]))
+
+  def to_availability(self) -> List[Availability]:
+    return [
+      construct(Availability, {"inventory_available": available, "literal_inventory": literal, "dtm": date.fromordinal(ordinal)})
+      for ordinal, available, literal in zip(self.dates.tolist(), self.inventory_available.tolist(), self.literal_inventory.tolist())
+    ]
+
+
+class AvailabilityGrid:
+  """
+  Availability of several rooms over one window as room x date matrices.
+  Row i holds room_ids[i], column j the day start + j, days DIMS did not return hold MISSING
+  """
+
+  def __init__(self, room_ids, start: date, inventory_available, literal_inventory):
+    require_numpy()
+    self.room_ids = np.asarray(room_ids, dtype=np.int64)
+    self.start = start
+    self.inventory_available = inventory_available
+    self.literal_inventory = literal_inventory
+
+  @classmethod
+  def from_columns(cls, columns: Dict[int, AvailabilityColumns], start: date, end: date) -> "AvailabilityGrid":
+    """
+    Lay the columns of each room out on the days from start to end, days outside the window are dropped
+    """
+    require_numpy()
+    shape = (len(columns), (end - start).days + 1)
+    inventory_available = np.full(shape, MISSING, dtype=np.int64)
+    literal_inventory = np.full(shape, MISSING, dtype=np.int64)
+    first = start.toordinal()
+    for row, room in enumerate(columns.values()):
+      offsets = room.dates - first
+      inside = (offsets >= 0) & (offsets < shape[1])
+      inventory_available[row, offsets[inside]] = room.inventory_available[inside]
+      literal_inventory[row, offsets[inside]] = room.literal_inventory[inside]
+    return cls(list(columns), start, inventory_available, literal_inventory)
+
+  @property
+  def shape(self):
+    return self.inventory_available.shape
+
+  @property
+  def dates(self):
+    """
+    Day ordinals of the columns
+    """
+    return np.arange(self.start.toordinal(), self.start.toordinal() + self.shape[1], dtype=np.int64)
+
+  @property
+  def end(self) -> date:
+    return self.start + timedelta(days=self.shape[1] - 1)
+
+  @property
+  def missing(self):
+    """
+    Boolean matrix of the days DIMS did not return
+    """
+    return self.literal_inventory == MISSING
+
+  @property
+  def booked(self):
+    """
+    Rooms booked on each day of each room, MISSING where the day was not returned
+    """
+    return np.where(self.missing, MISSING, self.literal_inventory - self.inventory_available)
+
+  def room(self, room_id: int) -> AvailabilityColumns:
+    """
+    The days returned for one room
+    """
+    rows = np.flatnonzero(self.room_ids == int(room_id))
+    if not len(rows):
+      raise KeyError(room_id)
+    row = rows[0]
+    present = ~self.missing[row]
+    return AvailabilityColumns(self.dates[present], self.inventory_available[row, present], self.literal_inventory[row, present])
@@ -0,0 +1,168 @@
+"""
+On-disk cache of parsed responses, shared by the processes of a host through a SQLite database
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from pydantic import TypeAdapter
+
+from .cache import CacheInfo
+from .entities import *
+
+
+# kinds of cached results and how they are stored
+ADAPTERS = {
+  "roomlist": TypeAdapter(RoomList),
+  "availability": TypeAdapter(List[Availability]),
+  "bookings": TypeAdapter(List[BookingDetail]),
+  "cancelled_bookings": TypeAdapter(List[CancelledBooking]),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+  key TEXT PRIMARY KEY,
+  kind TEXT NOT NULL,
+  resort_id INTEGER NOT NULL,
+  room_id INTEGER,
+  value BLOB NOT NULL,
+  expires_at REAL NOT NULL,
+  used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at);
+CREATE INDEX IF NOT EXISTS entries_resort ON entries (resort_id, kind);
+"""
+
+# a hit only records its use when the last one is older than this, so most hits do not write
+_TOUCH_INTERVAL = 1.0
+
+
+class DiskCache:
+  """
+  Cache of parsed room lists, availability windows and bookings in a SQLite database in WAL mode.
+  Every process on the host that opens the same path shares its hits. Entries expire ttl seconds after
+  they were stored, ttls overrides it per kind (roomlist, availability, bookings, cancelled_bookings),
+  and beyond maxsize entries the least recently used are evicted. timeout is the seconds to wait for a lock
+  held by another process before the operation fails, the clients then fall back to DIMS
+  """
+
+  def __init__(self, path: str, ttl: float = 300.0, maxsize: int = 10000, ttls: Optional[Dict[str, float]] = None, timeout: float = 1.0, timer: Callable[[], float] = time.time):
+    if maxsize < 1:
+      raise ValueError("maxsize must be at least 1")
+    unknown = set(ttls or {}) - set(ADAPTERS)
+    if unknown:
+      raise ValueError(f"Unknown cache kinds {', '.join(sorted(unknown))}, expected {', '.join(ADAPTERS)}")
+    self.path = path
+    self.ttl = ttl
+    self.ttls = dict(ttls or {})
+    self.maxsize = maxsize
+    self.timeout = timeout
+    # wall clock time, it is compared between processes
+    self.timer = timer
+    self.hits = 0
+    self.misses = 0
+    self._local = threading.local()
+    self._lock = threading.Lock()
+    with self._connection() as connection:
+      connection.executescript(_SCHEMA)
+
+  def _connection(self) -> sqlite3.Connection:
+    """
+    The connection of the current thread, connections are not shared between threads or inherited across a fork
+    """
+    connection = getattr(self._local, "connection", None)
+    if connection is None or self._local.pid != os.getpid():
+      connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+      connection.execute("PRAGMA journal_mode=WAL")
+      # WAL keeps the database consistent with NORMAL, a crash can only lose the last writes
+      connection.execute("PRAGMA synchronous=NORMAL")
+      self._local.connection = connection
+      self._local.pid = os.getpid()
+    return connection
+
+  def _key(self, kind: str, arguments: tuple) -> str:
+    return json.dumps([kind, *arguments], default=str)
+
+  def get(self, kind: str, arguments: tuple) -> Any:
+    """
+    The fresh result stored for kind and arguments, None on a miss
+    """
+    key = self._key(kind, arguments)
+    now = self.timer()
+    connection = self._connection()
+    row = connection.execute("SELECT value, used_at FROM entries WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+    if row is None:
+      with self._lock:
+        self.misses += 1
+      return None
+    value = ADAPTERS[kind].validate_json(row[0])
+    with self._lock:
+      self.hits += 1
+    if now - row[1] > _TOUCH_INTERVAL:
+      try:
+        connection.execute("UPDATE entries SET used_at = ? WHERE key = ?", (now, key))
+      except sqlite3.OperationalError:
+        # recording the use is best effort, the entry is served while another process holds the write lock
+        pass
+    return value
+
+  def set(self, kind: str, arguments: tuple, value: Any, resort_id: int, room_id: Optional[int] = None):
+    """
+    Store the result of kind for arguments, resort_id and room_id scope it for invalidation
+    """
+    now = self.timer()
+    ttl = self.ttls.get(kind, self.ttl)
+    connection = self._connection()
+    connection.execute(
+      "INSERT OR REPLACE INTO entries (key, kind, resort_id, room_id, value, expires_at, used_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+      (self._key(kind, arguments), kind, int(resort_id), room_id, ADAPTERS[kind].dump_json(value), now + ttl, now)
+    )
+    self._evict(connection, now)
+
+  def _evict(self, connection: sqlite3.Connection, now: float):
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+      connection.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+      # used_at of the entry after the maxsize most recently used ones, walked on the index
+      cutoff = connection.execute("SELECT used_at FROM entries ORDER BY used_at DESC LIMIT 1 OFFSET ?", (self.maxsize,)).fetchone()
+      if cutoff is not None:
+        connection.execute("DELETE FROM entries WHERE used_at <= ?", cutoff)
+      connection.execute("COMMIT")
+    except BaseException:
+      connection.execute("ROLLBACK")
+      raise
+
+  def invalidate(self, kind: str, resort_id: int, room_id: Optional[int] = None):
+    """
+    Drop the entries of kind for a resort, or only those of one of its rooms
+    """
+    if room_id is None:
+      self._connection().execute("DELETE FROM entries WHERE kind = ? AND resort_id = ?", (kind, int(resort_id)))
+    else:
+      self._connection().execute("DELETE FROM entries WHERE kind = ? AND resort_id = ? AND room_id = ?", (kind, int(resort_id), int(room_id)))
+
+  def clear(self, kind: Optional[str] = None):
+    if kind is None:
+      self._connection().execute("DELETE FROM entries")
+    else:
+      self._connection().execute("DELETE FROM entries WHERE kind = ?", (kind,))
+
+  def info(self) -> CacheInfo:
+    """
+    Hits and misses of this instance, size counts the entries stored by every process
+    """
+    size = self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    with self._lock:
+      return CacheInfo(hits=self.hits, misses=self.misses, size=size, maxsize=self.maxsize, ttl=self.ttl)
+
+  def close(self):
+    """
+    Close the connection of the current thread
+    """
+    connection = getattr(self._local, "connection", None)
+    if connection is not None:
+      connection.close()
+      self._local.connection = None
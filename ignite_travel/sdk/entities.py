@@ -1,8 +1,93 @@
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import date, datetime
 from dateutil.parser import parse
+from functools import lru_cache
+from typing import Type, TypeVar
+
+
+@lru_cache(maxsize=4096)
+def parse_dims_datetime(value: str) -> datetime:
+  """
+  Parse the dd-mm-YYYY HH:MM:SS timestamps DIMS returns by position, falling back to ISO and then dateutil, day first.
+  Recently seen strings are memoised, a response repeats the same timestamps many times
+  """
+  if len(value) == 19 and value[2] == "-" and value[5] == "-" and value[10] == " " and value[13] == ":" and value[16] == ":":
+    try:
+      return datetime(int(value[6:10]), int(value[3:5]), int(value[0:2]), int(value[11:13]), int(value[14:16]), int(value[17:19]))
+    except ValueError:
+      pass
+  try:
+    return datetime.fromisoformat(value)
+  except ValueError:
+    return parse(value, dayfirst=True)
+
+
+@lru_cache(maxsize=4096)
+def parse_dims_date(value: str) -> date:
+  """
+  Parse the dd-mm-YYYY dates DIMS returns by position, falling back to strptime for days and months
+  without a leading zero and then to ISO dates
+  """
+  if len(value) == 10 and value[2] == "-" and value[5] == "-":
+    try:
+      return date(int(value[6:10]), int(value[3:5]), int(value[0:2]))
+    except ValueError:
+      pass
+  try:
+    return datetime.strptime(value, "%d-%m-%Y").date()
+  except ValueError:
+    pass
+  try:
+    return date.fromisoformat(value)
+  except ValueError:
+    raise ValueError(f"time data '{value}' does not match format '%d-%m-%Y'")
+
+
+M = TypeVar("M", bound=BaseModel)
+
+# (name, required, default, default_factory) of the fields of each model built by construct
+_DEFAULTS: Dict[type, list] = {}
+# setters of the slots every pydantic model has besides __dict__, faster than object.__setattr__
+_set_fields_set = BaseModel.__dict__["__pydantic_fields_set__"].__set__
+_set_extra = BaseModel.__dict__["__pydantic_extra__"].__set__
+_set_private = BaseModel.__dict__["__pydantic_private__"].__set__
+
+
+def _defaults(model: type) -> list:
+  defaults = _DEFAULTS.get(model)
+  if defaults is None:
+    defaults = _DEFAULTS[model] = [
+      (name, field.is_required(), field.default, field.default_factory) for name, field in model.__pydantic_fields__.items()
+    ]
+  return defaults
+
+
+def construct(model: Type[M], values: dict) -> M:
+  """
+  Build model from values without any validation, the values must already have the types of the fields.
+  Cheaper than model_construct, fields missing from values get their default and values is used as the model's __dict__.
+  A missing required field raises the ValidationError the validating path would
+  """
+  fields_set = set(values)
+  if len(values) != len(model.__pydantic_fields__):
+    missing = []
+    for name, required, default, default_factory in _defaults(model):
+      if name in values:
+        continue
+      if required:
+        missing.append({"type": "missing", "loc": (name,), "input": values})
+      else:
+        values[name] = default_factory() if default_factory is not None else default
+    if missing:
+      raise ValidationError.from_exception_data(model.__name__, missing)
+  instance = object.__new__(model)
+  object.__setattr__(instance, "__dict__", values)
+  _set_fields_set(instance, fields_set)
+  _set_extra(instance, None)
+  _set_private(instance, None)
+  return instance
 
 
 class LinkedRate(BaseModel):
@@ -14,7 +99,8 @@ class LinkedRate(BaseModel):
 class Room(BaseModel):
   room_id: int = Field()
   room_name: str = Field()
-  linked_rate: Optional[LinkedRate] = Field(default=None)
+  linked_rate: Optional[LinkedRate] = Field(default=None)  # last linked rate of the room, kept for backwards compatibility
+  linked_rates: List[LinkedRate] = Field(default_factory=list)  # every rate plan linked to the room
 
 
 class RoomList(BaseModel):
@@ -27,6 +113,34 @@ class Availability(BaseModel):
   dtm: date = Field()  # date of the availability
 
 
+class InventoryReconciliation(BaseModel):
+  written: List[date] = Field(default_factory=list)  # dates sent to DIMS because their allocation changed
+  skipped: List[date] = Field(default_factory=list)  # dates already at the desired allocation
+  message: Optional[str] = Field(default=None)  # message of the update, None when nothing had to be sent
+
+
+class MassUpdateChunk(BaseModel):
+  index: int = Field()  # position of the chunk in the original update
+  dates: List[str] = Field()  # dates of the chunk in the dd-mm-YYYY format of the update
+  qty: List[int] = Field()  # quantities of the chunk
+  message: Optional[str] = Field(default=None)  # message returned by DIMS for the chunk
+  error: Optional[str] = Field(default=None)  # error raised while sending the chunk, or the message of an update DIMS rejected
+
+
+class MassUpdateResult(BaseModel):
+  chunks: List[MassUpdateChunk] = Field(default_factory=list)
+
+  @property
+  def failed_chunks(self) -> List[MassUpdateChunk]:
+    return [chunk for chunk in self.chunks if chunk.error is not None]
+
+  @property
+  def message(self) -> Optional[str]:
+    # the distinct messages of the successful chunks, in chunk order
+    messages = dict.fromkeys(chunk.message for chunk in self.chunks if chunk.error is None and chunk.message is not None)
+    return "\n".join(messages) if messages else None
+
+
 class RoomDetail(BaseModel):
   booking_id: int = Field()  # The IMS booking id
   room_description: str = Field()
@@ -50,13 +164,14 @@ class RoomDetail(BaseModel):
   @field_validator("date_booked", mode="before")
   def parse_date_booked(cls, value):
     if isinstance(value, str):
-      return parse(value)
+      return parse_dims_datetime(value)
     return value
   
   @field_validator("check_in", mode="before")
   def parse_check_in(cls, value):
     if isinstance(value, str):
-      return datetime.strptime(value, "%d-%m-%Y").date()
+      # ISO dates written by model_dump_json are accepted too
+      return parse_dims_date(value)
     return value
 
 
@@ -80,5 +195,21 @@ class CancelledBooking(BaseModel):
   @field_validator("booking_change_date", mode="before")
   def parse_booking_change_date(cls, value):
     if isinstance(value, str):
-      return parse(value)
+      return parse_dims_datetime(value)
     return value
+
+
+class BookingEvent(BaseModel):
+  kind: str = Field()  # "added", "changed" or "cancelled"
+  resort_id: int = Field()
+  booking_number: str = Field()
+  booking: Optional[BookingDetail] = Field(default=None)  # the booking as last seen, None for unknown cancelled bookings
+  cancellation: Optional[CancelledBooking] = Field(default=None)  # set for cancelled events
+
+
+class BookingSyncState(BaseModel):
+  bookings: Dict[str, BookingDetail] = Field(default_factory=dict)  # live bookings by booking_number
+  fingerprints: Dict[str, str] = Field(default_factory=dict)  # digest of each live booking, by booking_number
+  tombstones: Dict[str, CancelledBooking] = Field(default_factory=dict)  # cancelled bookings by booking_number
+  booked_high_water: Optional[datetime] = Field(default=None)  # latest date_booked seen
+  cancelled_high_water: Optional[datetime] = Field(default=None)  # latest booking_change_date seen
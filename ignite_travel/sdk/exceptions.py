@@ -0,0 +1,27 @@
+"""
+Exceptions raised by the Ignite Travel clients
+"""
+
+
+class MassUpdateError(Exception):
+  """
+  Raised when one or more chunks of a split availability_mass_update fail,
+  result holds every chunk so the failed ones can be retried
+  """
+
+  def __init__(self, result):
+    self.result = result
+    failed = len(result.failed_chunks)
+    super().__init__(f"{failed} of {len(result.chunks)} inventory update chunks failed")
+
+
+class CircuitOpenError(Exception):
+  """
+  Raised instead of sending a request while the circuit breaker of its service is open,
+  retry_after is the number of seconds until a trial request is let through
+  """
+
+  def __init__(self, service: str, retry_after: float):
+    self.service = service
+    self.retry_after = retry_after
+    super().__init__(f"Circuit of the {service} service is open, retry in {retry_after:.1f}s")
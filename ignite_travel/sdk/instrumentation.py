@@ -0,0 +1,318 @@
+"""
+Per-call latency instrumentation for the Ignite Travel clients
+"""
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, Iterator, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+
+logger = logging.getLogger(__name__)
+
+# phases reported for every call, in the order they happen
+PHASES = ("build", "network", "parse", "validate")
+
+
+class CallMetrics(BaseModel):
+  operation: str = Field()  # the SOAP action header of the call
+  phases: Dict[str, float] = Field(default_factory=dict)  # seconds spent in each phase
+  total: float = Field(default=0.0)  # seconds spent in the whole call
+  request_bytes: int = Field(default=0)  # size of the request envelope
+  response_bytes: int = Field(default=0)  # size of the response body
+  retries: int = Field(default=0)  # requests sent again after a transient failure
+  coalesced: bool = Field(default=False)  # the response of an identical call in flight was shared instead of sending a request
+  error: Optional[str] = Field(default=None)  # exception raised by the call, if any
+
+
+class CircuitStateChange(BaseModel):
+  service: str = Field()  # the service type whose circuit changed, inventory or rates
+  previous: str = Field()  # closed, open or half_open
+  state: str = Field()
+  failure_rate: Optional[float] = Field(default=None)  # failure rate of the window that opened the circuit
+
+
+class Instrumentation:
+  """
+  Base class for instrumentation hooks, subclass it and override the methods you need
+  """
+
+  def on_call(self, metrics: CallMetrics):
+    """
+    Called once every client call has finished, whether it succeeded or not
+    """
+
+  def on_event(self, event: BaseModel):
+    """
+    Called for what happens outside of a single call, such as a CircuitStateChange
+    """
+
+
+class CallRecorder:
+  """
+  Collects the metrics of a single call
+  """
+
+  def __init__(self, operation: str):
+    self.metrics = CallMetrics(operation=operation)
+    self._started = time.perf_counter()
+
+  @contextmanager
+  def phase(self, name: str):
+    started = time.perf_counter()
+    try:
+      yield
+    finally:
+      phases = self.metrics.phases
+      phases[name] = phases.get(name, 0.0) + time.perf_counter() - started
+
+  def add_bytes(self, request_bytes: int = 0, response_bytes: int = 0):
+    self.metrics.request_bytes += request_bytes
+    self.metrics.response_bytes += response_bytes
+
+  def add_retry(self):
+    self.metrics.retries += 1
+
+  def mark_coalesced(self):
+    self.metrics.coalesced = True
+
+  @contextmanager
+  def bind(self):
+    """
+    Make this the current call inside the block, for calls that cannot stay bound across yields
+    """
+    token = _current_call.set(self)
+    try:
+      yield self
+    finally:
+      _current_call.reset(token)
+
+  def finish(self, error: Optional[BaseException] = None) -> CallMetrics:
+    self.metrics.total = time.perf_counter() - self._started
+    if error is not None:
+      self.metrics.error = f"{type(error).__name__}: {error}"
+    return self.metrics
+
+
+class NullRecorder:
+  """
+  Stands in for CallRecorder when a call is not instrumented, every method is a no-op
+  """
+
+  def phase(self, name: str):
+    return nullcontext()
+
+  def add_bytes(self, request_bytes: int = 0, response_bytes: int = 0):
+    pass
+
+  def add_retry(self):
+    pass
+
+  def mark_coalesced(self):
+    pass
+
+  def bind(self):
+    return nullcontext(self)
+
+
+NULL_RECORDER = NullRecorder()
+
+# the recorder of the call running in the current thread or task
+_current_call: contextvars.ContextVar = contextvars.ContextVar("ignite_travel_current_call", default=NULL_RECORDER)
+
+
+def current_call():
+  return _current_call.get()
+
+
+def phase(name: str):
+  """
+  Time a phase of the current call, a no-op when the call is not instrumented
+  """
+  return _current_call.get().phase(name)
+
+
+def record_bytes(request_bytes: int = 0, response_bytes: int = 0):
+  _current_call.get().add_bytes(request_bytes, response_bytes)
+
+
+def record_retry():
+  _current_call.get().add_retry()
+
+
+def record_coalesced():
+  _current_call.get().mark_coalesced()
+
+
+T = TypeVar("T")
+
+
+def timed_iter(recorder, name: str, iterable: Iterable[T]) -> Iterator[T]:
+  """
+  Attribute the time spent producing each item of iterable to a phase of recorder
+  """
+  iterator = iter(iterable)
+  while True:
+    with recorder.phase(name):
+      try:
+        item = next(iterator)
+      except StopIteration:
+        return
+    yield item
+
+
+def publish(instrumentation: Instrumentation, metrics: CallMetrics):
+  # a failing hook must never fail the call it is reporting on
+  try:
+    instrumentation.on_call(metrics)
+  except Exception:
+    logger.exception("Instrumentation hook failed for %s", metrics.operation)
+
+
+def publish_event(instrumentation: Optional[Instrumentation], event: BaseModel):
+  if instrumentation is None:
+    return
+  try:
+    instrumentation.on_event(event)
+  except Exception:
+    logger.exception("Instrumentation hook failed for %s", type(event).__name__)
+
+
+@contextmanager
+def record_call(instrumentation: Optional[Instrumentation], operation: str, bind: bool = True):
+  """
+  Record the call made inside the block and report it to instrumentation.
+  With bind=False the recorder is not made current, generators use it to avoid leaking it across yields
+  """
+  if instrumentation is None:
+    yield NULL_RECORDER
+    return
+  recorder = CallRecorder(operation)
+  with recorder.bind() if bind else nullcontext():
+    try:
+      yield recorder
+    except GeneratorExit:
+      # a stream closed early by its consumer is not a failure
+      publish(instrumentation, recorder.finish())
+      raise
+    except BaseException as e:
+      publish(instrumentation, recorder.finish(e))
+      raise
+  publish(instrumentation, recorder.finish())
+
+
+class LatencyHistogram:
+  """
+  Log-bucketed histogram of durations in seconds, percentiles are accurate to within the growth factor
+  """
+
+  def __init__(self, growth: float = 1.05, minimum: float = 1e-6):
+    self.growth = growth
+    self.minimum = minimum
+    self.buckets = defaultdict(int)
+    self.count = 0
+    self.total = 0.0
+    self.max = 0.0
+
+  def _bucket(self, seconds: float) -> int:
+    if seconds <= self.minimum:
+      return 0
+    return math.ceil(math.log(seconds / self.minimum, self.growth))
+
+  def record(self, seconds: float):
+    self.buckets[self._bucket(seconds)] += 1
+    self.count += 1
+    self.total += seconds
+    self.max = max(self.max, seconds)
+
+  def percentile(self, q: float) -> float:
+    """
+    Upper bound of the bucket holding the q-th percentile (0-100)
+    """
+    if not self.count:
+      return 0.0
+    rank = max(1, math.ceil(self.count * q / 100))
+    seen = 0
+    for bucket in sorted(self.buckets):
+      seen += self.buckets[bucket]
+      if seen >= rank:
+        return min(self.minimum * self.growth ** bucket, self.max)
+    return self.max
+
+
+class HistogramCollector(Instrumentation):
+  """
+  Keeps an in-memory latency histogram per operation and phase, plus byte counters per operation
+  """
+
+  def __init__(self, growth: float = 1.05):
+    self.growth = growth
+    self._histograms = {}
+    self._bytes = defaultdict(lambda: {"request_bytes": 0, "response_bytes": 0})
+    self._errors = defaultdict(int)
+    self._retries = defaultdict(int)
+    self._coalesced = defaultdict(int)
+    self._lock = threading.Lock()
+
+  def _histogram(self, operation: str, phase: str) -> LatencyHistogram:
+    key = (operation, phase)
+    histogram = self._histograms.get(key)
+    if histogram is None:
+      histogram = self._histograms[key] = LatencyHistogram(growth=self.growth)
+    return histogram
+
+  def on_call(self, metrics: CallMetrics):
+    with self._lock:
+      self._histogram(metrics.operation, "total").record(metrics.total)
+      for name, seconds in metrics.phases.items():
+        self._histogram(metrics.operation, name).record(seconds)
+      counters = self._bytes[metrics.operation]
+      counters["request_bytes"] += metrics.request_bytes
+      counters["response_bytes"] += metrics.response_bytes
+      if metrics.error is not None:
+        self._errors[metrics.operation] += 1
+      self._retries[metrics.operation] += metrics.retries
+      self._coalesced[metrics.operation] += metrics.coalesced
+
+  def percentiles(self, operation: str, phase: str = "total", quantiles: Iterable[float] = (50, 95, 99)) -> Dict[str, float]:
+    """
+    Latency percentiles in seconds of a phase of an operation, e.g. {"p50": 0.12, "p95": 0.4, "p99": 0.9}
+    """
+    with self._lock:
+      histogram = self._histograms.get((operation, phase))
+      return {f"p{q:g}": histogram.percentile(q) if histogram else 0.0 for q in quantiles}
+
+  def summary(self) -> Dict[str, dict]:
+    """
+    Count, percentiles and byte counters of every recorded operation
+    """
+    with self._lock:
+      operations = sorted({operation for operation, _ in self._histograms})
+      summary = {}
+      for operation in operations:
+        total = self._histograms[(operation, "total")]
+        summary[operation] = {
+          "count": total.count,
+          "errors": self._errors[operation],
+          "retries": self._retries[operation],
+          "coalesced": self._coalesced[operation],
+          **self._bytes[operation],
+          "phases": {
+            name: {f"p{q}": histogram.percentile(q) for q in (50, 95, 99)}
+            for (op, name), histogram in self._histograms.items() if op == operation
+          }
+        }
+      return summary
+
+  def reset(self):
+    with self._lock:
+      self._histograms.clear()
+      self._bytes.clear()
+      self._errors.clear()
+      self._retries.clear()
+      self._coalesced.clear()
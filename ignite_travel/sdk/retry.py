@@ -0,0 +1,58 @@
+"""
+Retry policy for the requests sent to DIMS
+"""
+import random
+from typing import Iterable, Mapping, Optional, Tuple, Type
+
+
+class RetryPolicy:
+  """
+  When and how long to wait before a failed request is sent again.
+  Attempt n waits a random delay of up to backoff * 2 ** (n - 1) seconds (full jitter, or exactly that without jitter),
+  capped at max_backoff. A Retry-After header sent with a retryable status is honoured up to max_backoff.
+  A retryable status carrying a SOAP fault is only retried for a Server fault, a Client fault is raised at once.
+  retry_exceptions are retried on top of the transport errors of the client, which are always retryable
+  """
+
+  def __init__(
+    self,
+    max_attempts: int = 3,
+    backoff: float = 0.5,
+    max_backoff: float = 10.0,
+    jitter: bool = True,
+    retry_statuses: Iterable[int] = (429, 500, 502, 503, 504),
+    retry_exceptions: Tuple[Type[BaseException], ...] = ()
+  ):
+    if max_attempts < 1:
+      raise ValueError("max_attempts must be at least 1")
+    if backoff < 0 or max_backoff < 0:
+      raise ValueError("backoff and max_backoff must not be negative")
+    self.max_attempts = max_attempts
+    self.backoff = backoff
+    self.max_backoff = max_backoff
+    self.jitter = jitter
+    self.retry_statuses = frozenset(retry_statuses)
+    self.retry_exceptions = tuple(retry_exceptions)
+
+  def delay(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> float:
+    """
+    Seconds to wait after the failed attempt (counted from 1)
+    """
+    retry_after = _retry_after(headers)
+    if retry_after is not None:
+      return min(retry_after, self.max_backoff)
+    delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+    return random.uniform(0, delay) if self.jitter else delay
+
+
+def _retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+  # only the delay-seconds form is used, DIMS never sends an HTTP date
+  value = headers.get("Retry-After") if headers is not None else None
+  try:
+    return max(float(value), 0.0) if value is not None else None
+  except ValueError:
+    return None
+
+
+# a policy that sends every request once
+NO_RETRY = RetryPolicy(max_attempts=1)
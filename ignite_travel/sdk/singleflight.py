@@ -0,0 +1,79 @@
+"""
+Coalescing of identical concurrent requests, the first caller sends the request and the others share its result
+"""
+import asyncio
+import threading
+from functools import partial
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+class _Flight:
+
+  def __init__(self):
+    self.done = threading.Event()
+    self.result = None
+    self.error = None
+
+
+class SingleFlight:
+  """
+  Runs one call per key at a time across threads, callers arriving while it runs wait for it and share its outcome
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._flights: Dict[Hashable, _Flight] = {}
+
+  def do(self, key: Hashable, function: Callable[[], T]) -> Tuple[T, bool]:
+    """
+    The result of function, or of the call of the same key in flight. The flag is True when the result was shared
+    """
+    with self._lock:
+      flight = self._flights.get(key)
+      leader = flight is None
+      if leader:
+        flight = self._flights[key] = _Flight()
+    if not leader:
+      flight.done.wait()
+      if flight.error is not None:
+        raise flight.error
+      return flight.result, True
+    try:
+      flight.result = function()
+    except BaseException as e:
+      flight.error = e
+      raise
+    finally:
+      # later callers send their own request
+      with self._lock:
+        del self._flights[key]
+      flight.done.set()
+    return flight.result, False
+
+
+class AsyncSingleFlight:
+  """
+  SingleFlight for coroutines of one event loop. The call runs as a task so it completes for the others
+  when the caller that started it is cancelled
+  """
+
+  def __init__(self):
+    self._flights: Dict[Hashable, asyncio.Future] = {}
+
+  async def do(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+    task = self._flights.get(key)
+    shared = task is not None
+    if not shared:
+      task = self._flights[key] = asyncio.ensure_future(function())
+      task.add_done_callback(partial(self._finished, key))
+    return await asyncio.shield(task), shared
+
+  def _finished(self, key: Hashable, task: asyncio.Future):
+    if self._flights.get(key) is task:
+      del self._flights[key]
+    # retrieve the error so it is not logged when every caller was cancelled
+    if not task.cancelled():
+      task.exception()
@@ -0,0 +1,283 @@
+"""
+Client-side rate limits of the requests sent to each DIMS service
+"""
+import asyncio
+import os
+import struct
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Optional, Union
+
+try:
+  import fcntl
+except ImportError:  # only available on POSIX, shared limits need it
+  fcntl = None
+
+from .instrumentation import NULL_RECORDER
+
+
+# seconds between two attempts to take a slot held by another process, file locks cannot notify the waiters
+_POLL_INTERVAL = 0.005
+# state of a shared token bucket: tokens left and the time.time() they were counted at
+_BUCKET_STATE = struct.Struct("dd")
+
+
+class TokenBucket:
+  """
+  Refills rate tokens per second up to burst, every request takes one.
+  Tokens are reserved ahead so concurrent callers wait their turn instead of racing for the next token
+  """
+
+  def __init__(self, rate: float, burst: int):
+    self.rate = rate
+    self.burst = burst
+    self._tokens = float(burst)
+    self._updated = time.monotonic()
+    self._lock = threading.Lock()
+
+  def reserve(self) -> float:
+    """
+    Take a token, the seconds to wait before it is available are returned
+    """
+    with self._lock:
+      now = time.monotonic()
+      self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate) - 1
+      self._updated = now
+      return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class FileTokenBucket(TokenBucket):
+  """
+  A TokenBucket kept in a file, shared by every process on the host that uses the same path
+  """
+
+  def __init__(self, path: str, rate: float, burst: int):
+    super().__init__(rate, burst)
+    self.path = path
+
+  def reserve(self) -> float:
+    # the lock serialises the threads of this process, flock the processes
+    with self._lock:
+      fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+      try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        state = os.pread(fd, _BUCKET_STATE.size, 0)
+        now = time.time()
+        tokens, updated = _BUCKET_STATE.unpack(state) if len(state) == _BUCKET_STATE.size else (float(self.burst), now)
+        tokens = min(self.burst, tokens + max(now - updated, 0.0) * self.rate) - 1
+        os.pwrite(fd, _BUCKET_STATE.pack(tokens, now), 0)
+      finally:
+        # closing the file releases the lock
+        os.close(fd)
+      return -tokens / self.rate if tokens < 0 else 0.0
+
+
+class _Waiter:
+  """
+  A thread or a coroutine waiting for a slot, granted is set under the lock of the Slots when a slot is handed to it
+  """
+
+  def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+    self.loop = loop
+    self.granted = False
+    if loop is None:
+      self.event = threading.Event()
+    else:
+      self.future = loop.create_future()
+
+  def grant(self) -> bool:
+    """
+    Hand a slot to the waiter, False when its event loop is closed and the slot has to go to the next waiter
+    """
+    if self.loop is None:
+      self.granted = True
+      self.event.set()
+      return True
+    try:
+      self.loop.call_soon_threadsafe(self._wake)
+    except RuntimeError:
+      return False
+    self.granted = True
+    return True
+
+  def _wake(self):
+    # the waiting coroutine may have been cancelled since, it then passes the slot on
+    if not self.future.done():
+      self.future.set_result(None)
+
+
+class Slots:
+  """
+  count slots shared by the threads and every event loop of the process. A released slot is handed to the waiter
+  that has waited longest, threads are woken through an event and coroutines on their own loop with call_soon_threadsafe
+  """
+
+  def __init__(self, count: int):
+    self._free = count
+    self._waiters = deque()
+    self._lock = threading.Lock()
+
+  def acquire(self):
+    with self._lock:
+      if self._free and not self._waiters:
+        self._free -= 1
+        return
+      waiter = _Waiter()
+      self._waiters.append(waiter)
+    try:
+      waiter.event.wait()
+    except BaseException:
+      self._abandon(waiter)
+      raise
+
+  async def acquire_async(self):
+    with self._lock:
+      if self._free and not self._waiters:
+        self._free -= 1
+        return
+      waiter = _Waiter(asyncio.get_running_loop())
+      self._waiters.append(waiter)
+    try:
+      await waiter.future
+    except BaseException:
+      self._abandon(waiter)
+      raise
+
+  def release(self):
+    with self._lock:
+      while self._waiters:
+        if self._waiters.popleft().grant():
+          return
+      self._free += 1
+
+  def _abandon(self, waiter: _Waiter):
+    """
+    Stop waiting, a slot already handed to the waiter goes to the next one
+    """
+    with self._lock:
+      if not waiter.granted:
+        self._waiters.remove(waiter)
+        return
+    self.release()
+
+
+class FileSlots:
+  """
+  count slots held as exclusive locks on count files, shared by every process on the host that uses the same path
+  """
+
+  def __init__(self, path: str, count: int):
+    self.paths = [f"{path}.slot{i}" for i in range(count)]
+
+  def try_acquire(self) -> Optional[int]:
+    """
+    The file descriptor of a free slot, None when every slot is taken
+    """
+    for path in self.paths:
+      fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+      try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return fd
+      except BlockingIOError:
+        os.close(fd)
+    return None
+
+  def release(self, fd: int):
+    os.close(fd)
+
+
+class RateLimit:
+  """
+  At most rate requests per second, in bursts of up to burst, and max_in_flight concurrent requests against one DIMS service.
+  An instance is shared by every thread using the clients it is given to. With shared_path the limits are kept in
+  files starting with that path and shared by every process on the host using the same path (POSIX only)
+  """
+
+  def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None, max_in_flight: Optional[int] = None, shared_path: Optional[str] = None):
+    if rate is not None and rate <= 0:
+      raise ValueError("rate must be positive")
+    if burst is not None and burst < 1:
+      raise ValueError("burst must be at least 1")
+    if max_in_flight is not None and max_in_flight < 1:
+      raise ValueError("max_in_flight must be at least 1")
+    if shared_path is not None and fcntl is None:
+      raise ValueError("shared_path requires file locks, which are only available on POSIX")
+    self.rate = rate
+    # one second worth of requests can be sent at once by default
+    self.burst = (burst or max(int(rate), 1)) if rate else None
+    self.max_in_flight = max_in_flight
+    self.shared_path = shared_path
+    self._bucket = None
+    if rate:
+      self._bucket = FileTokenBucket(f"{shared_path}.bucket", rate, self.burst) if shared_path else TokenBucket(rate, self.burst)
+    self._slots = None
+    if max_in_flight and shared_path:
+      self._slots = FileSlots(shared_path, max_in_flight)
+    elif max_in_flight:
+      # the same slots for threads and every event loop, in the order they started waiting
+      self._slots = Slots(max_in_flight)
+
+  @contextmanager
+  def acquire(self, recorder=NULL_RECORDER) -> Iterator[None]:
+    """
+    Wait for a slot and a token, the slot is held inside the block. The wait is reported as the throttle phase of recorder
+    """
+    slot = None
+    with recorder.phase("throttle"):
+      if isinstance(self._slots, Slots):
+        self._slots.acquire()
+        slot = True
+      elif self._slots is not None:
+        slot = self._slots.try_acquire()
+        while slot is None:
+          time.sleep(_POLL_INTERVAL)
+          slot = self._slots.try_acquire()
+      try:
+        delay = self._bucket.reserve() if self._bucket is not None else 0.0
+        if delay:
+          time.sleep(delay)
+      except BaseException:
+        self._release(slot)
+        raise
+    try:
+      yield
+    finally:
+      self._release(slot)
+
+  @asynccontextmanager
+  async def acquire_async(self, recorder=NULL_RECORDER) -> AsyncIterator[None]:
+    """
+    acquire() for coroutines, the slots are shared with the threads and event loops using the same instance
+    """
+    slot = None
+    with recorder.phase("throttle"):
+      if isinstance(self._slots, Slots):
+        await self._slots.acquire_async()
+        slot = True
+      elif self._slots is not None:
+        slot = self._slots.try_acquire()
+        while slot is None:
+          await asyncio.sleep(_POLL_INTERVAL)
+          slot = self._slots.try_acquire()
+      try:
+        delay = self._bucket.reserve() if self._bucket is not None else 0.0
+        if delay:
+          await asyncio.sleep(delay)
+      except BaseException:
+        self._release(slot)
+        raise
+    try:
+      yield
+    finally:
+      self._release(slot)
+
+  def _release(self, slot: Optional[Union[bool, int]]):
+    """
+    Give back a slot, True for an in-process slot or the file descriptor of a shared one
+    """
+    if slot is True:
+      self._slots.release()
+    elif slot is not None:
+      self._slots.release(slot)
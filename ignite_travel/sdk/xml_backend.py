@@ -0,0 +1,146 @@
+"""
+XML parsing backends, the standard library's ElementTree by default or lxml when it is chosen
+"""
+import threading
+import xml.etree.ElementTree as ET
+from typing import Iterator, Optional, Tuple, Union
+
+try:
+  from lxml import etree
+except ImportError:  # lxml is an optional dependency
+  etree = None
+
+
+def _is_tag(path: str) -> bool:
+  return not any(character in path for character in "/[]@*.{")
+
+
+def _descendants(element, tag: str) -> Iterator:
+  # iter() includes the element itself, ElementPath descendant searches do not
+  descendants = element.iter(tag)
+  if element.tag == tag:
+    next(descendants)
+  return descendants
+
+
+class XmlBackend:
+  """
+  Parses responses into elements with the ElementTree API using the standard library,
+  subclass it to plug in another parser. Paths are ElementPath expressions such as ".//Rooms/Room"
+  """
+  name = "stdlib"
+
+  def fromstring(self, data: Union[str, bytes]):
+    return ET.fromstring(data)
+
+  def find(self, element, path: str):
+    """
+    The first element matching path, None when there is none
+    """
+    if path.startswith(".//") and _is_tag(path[3:]):
+      # ElementPath resolves descendant searches in Python, iter() walks the tree in C
+      return next(_descendants(element, path[3:]), None)
+    return element.find(path)
+
+  def findall(self, element, path: str) -> list:
+    """
+    Every element matching path, in document order
+    """
+    if path.startswith(".//") and _is_tag(path[3:]):
+      return list(_descendants(element, path[3:]))
+    return element.findall(path)
+
+  def texts(self, element, tags: Tuple[str, ...]) -> list:
+    """
+    The text of the first child of element with each tag, None for missing children
+    """
+    texts = []
+    for tag in tags:
+      child = element.find(tag)
+      texts.append(child.text if child is not None else None)
+    return texts
+
+  def iterparse(self, source, events: Tuple[str, ...]) -> Iterator[tuple]:
+    """
+    (event, element) pairs read incrementally from a file-like source
+    """
+    return ET.iterparse(source, events=events)
+
+  def pull_parser(self, events: Tuple[str, ...]):
+    """
+    A parser fed with chunks of bytes whose read_events() returns (event, element) pairs
+    """
+    return ET.XMLPullParser(events=events)
+
+
+class LxmlBackend(XmlBackend):
+  """
+  Parses with lxml, paths are evaluated as compiled XPath expressions.
+  Parsers and compiled expressions are kept per thread, lxml does not allow sharing them between threads
+  """
+  name = "lxml"
+
+  def __init__(self):
+    if etree is None:
+      raise ImportError("lxml is required for the lxml backend, install it with `pip install ignite-travel[lxml]`")
+    self._local = threading.local()
+
+  def _parser(self):
+    parser = getattr(self._local, "parser", None)
+    if parser is None:
+      # responses never need entities or network access resolved
+      parser = self._local.parser = etree.XMLParser(resolve_entities=False, no_network=True)
+    return parser
+
+  def _xpath(self, path: str):
+    xpaths = getattr(self._local, "xpaths", None)
+    if xpaths is None:
+      xpaths = self._local.xpaths = {}
+    xpath = xpaths.get(path)
+    if xpath is None:
+      xpath = xpaths[path] = etree.XPath(path)
+    return xpath
+
+  def fromstring(self, data: Union[str, bytes]):
+    # lxml refuses text that carries an encoding declaration, the responses are utf-8
+    if isinstance(data, str):
+      data = data.encode("utf-8")
+    return etree.fromstring(data, self._parser())
+
+  def find(self, element, path: str):
+    # XPath positions apply per parent, the parentheses select the first match of the whole document
+    matches = self._xpath(f"({path})[1]")(element)
+    return matches[0] if matches else None
+
+  def findall(self, element, path: str) -> list:
+    return self._xpath(path)(element)
+
+  def texts(self, element, tags: Tuple[str, ...]) -> list:
+    # lxml resolves find() in Python, a single pass over the children is much cheaper
+    by_tag = {}
+    for child in element:
+      by_tag.setdefault(child.tag, child.text)
+    return [by_tag.get(tag) for tag in tags]
+
+  def iterparse(self, source, events: Tuple[str, ...]) -> Iterator[tuple]:
+    return etree.iterparse(source, events=events, resolve_entities=False, no_network=True)
+
+  def pull_parser(self, events: Tuple[str, ...]):
+    return etree.XMLPullParser(events=events, resolve_entities=False, no_network=True)
+
+
+BACKENDS = {"stdlib": XmlBackend, "lxml": LxmlBackend}
+
+
+def get_backend(backend: Optional[Union[str, XmlBackend]] = None) -> XmlBackend:
+  """
+  The backend named by backend ("stdlib" or "lxml"), a backend instance is returned as is.
+  Without a backend the standard library is used, lxml is only faster on some responses so it has to be chosen
+  """
+  if isinstance(backend, XmlBackend):
+    return backend
+  if backend is None:
+    return XmlBackend()
+  if backend not in BACKENDS:
+    raise ValueError(f"Unknown XML backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+  return BACKENDS[backend]()
@@ -0,0 +1,180 @@
+import asyncio
+import unittest
+from unittest.mock import patch, AsyncMock, MagicMock
+from datetime import datetime, timedelta
+
+from ignite_travel.sdk import async_client
+from ignite_travel.sdk import AsyncDimsInventoryClient
+from ignite_travel.sdk.retry import RetryPolicy
+
+
+ROOMLIST_RESPONSE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        <GetRoomListResponse xmlns="https://dims.ignitetravel.com/IMSXML">
+            <GetRoomListResult>
+                <RewardsCorpIMS xmlns="">
+                    <Rooms>
+                        <Room>
+                            <RoomTypeId>18178</RoomTypeId>
+                            <Description>Prestige Water Villa</Description>
+                        </Room>
+                    </Rooms>
+                    <LinkedRates>
+                        <LinkedRate>
+                            <RateId>1</RateId>
+                            <RateDescription>Best Available Rate</RateDescription>
+                            <RoomId>18178</RoomId>
+                        </LinkedRate>
+                    </LinkedRates>
+                </RewardsCorpIMS>
+            </GetRoomListResult>
+        </GetRoomListResponse>
+    </soap:Body>
+</soap:Envelope>"""
+
+
+@unittest.skipIf(async_client.httpx is None, "httpx is not installed")
+class TestAsyncDimsInventoryClient(unittest.IsolatedAsyncioTestCase):
+    """
+    Test the asyncio client
+    """
+
+    async def asyncSetUp(self):
+        self.client = AsyncDimsInventoryClient(max_concurrency=2)
+        self.resort_id = 1056
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_get_roomlist(self):
+        """
+        Test that get_roomlist shares the parsing of the sync client
+        """
+        with patch.object(AsyncDimsInventoryClient, "make_request", new=AsyncMock(return_value=ROOMLIST_RESPONSE)):
+            room_list = await self.client.get_roomlist(self.resort_id)
+        self.assertEqual(len(room_list.rooms), 1)
+        self.assertEqual(room_list.rooms[0].room_id, 18178)
+        self.assertEqual(room_list.rooms[0].linked_rate.rate_id, 1)
+
+    async def test_get_cancelled_bookings(self):
+        """
+        Test the get_cancelled_bookings method
+        """
+        response = """<RewardsCorpIMS>
+            <Bookings>
+                <Booking>
+                    <BookingId>1644663</BookingId>
+                    <BookingNumber>E-IG1237837MG</BookingNumber>
+                    <BookingStatusId>5</BookingStatusId>
+                    <BookingStatusDescription>Cancelled booking</BookingStatusDescription>
+                    <BookingChangeDate>26-05-2025 09:48:00</BookingChangeDate>
+                </Booking>
+            </Bookings>
+        </RewardsCorpIMS>"""
+        with patch.object(AsyncDimsInventoryClient, "make_request", new=AsyncMock(return_value=response)):
+            bookings = await self.client.get_cancelled_bookings(self.resort_id, "2025-05-25", "2025-05-31")
+        self.assertEqual(bookings[0].booking_number, "E-IG1237837MG")
+        self.assertEqual(bookings[0].booking_change_date, datetime(2025, 5, 26, 9, 48, 0))
+
+    async def test_invalid_resort_id(self):
+        """
+        Test that invalid arguments are rejected before any request is sent
+        """
+        with self.assertRaises(ValueError):
+            await self.client.get_roomlist("#&**")
+
+    async def test_concurrency_is_bounded_per_service(self):
+        """
+        Test that no more than max_concurrency requests are in flight for one service URL
+        """
+        in_flight = 0
+        peak = 0
+
+        async def fake_request(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return MagicMock(status_code=200, text=ROOMLIST_RESPONSE)
+
+        with patch.object(self.client.session, "request", side_effect=fake_request):
+            await asyncio.gather(*(self.client.get_roomlist(self.resort_id + i) for i in range(6)))
+        self.assertEqual(peak, 2)
+
+
+    async def test_large_mass_update_is_streamed(self):
+        """
+        Test that mass updates with many dates are streamed with their Content-Length
+        """
+        start = datetime.now() + timedelta(days=1)
+        dates = [(start + timedelta(days=i)).strftime("%d-%m-%Y") for i in range(1500)]
+        sent = {}
+
+        async def fake_request(**kwargs):
+            sent["data"] = b"".join([chunk async for chunk in kwargs["content"]])
+            sent["length"] = int(kwargs["headers"]["Content-Length"])
+            return MagicMock(status_code=200, text="<RewardsCorpIMS><Message>Update Successful</Message></RewardsCorpIMS>")
+
+        with patch.object(self.client.session, "request", side_effect=fake_request):
+            message = await self.client.availability_mass_update(1, self.resort_id, dates, [5] * 1500)
+        self.assertEqual(message, "Update Successful")
+        self.assertEqual(len(sent["data"]), sent["length"])
+        self.assertEqual(sent["data"].count(b"<DatesSet>"), 1500)
+
+    async def test_streamed_mass_update_is_resent(self):
+        """
+        Test that an idempotent streamed mass update is sent again in full after a connection error
+        """
+        client = AsyncDimsInventoryClient(retry_policy=RetryPolicy(backoff=0))
+        start = datetime.now() + timedelta(days=1)
+        dates = [(start + timedelta(days=i)).strftime("%d-%m-%Y") for i in range(1500)]
+        sent = []
+
+        async def fake_request(**kwargs):
+            sent.append(b"".join([chunk async for chunk in kwargs["content"]]))
+            if len(sent) == 1:
+                raise async_client.httpx.ConnectError("connection reset")
+            return MagicMock(status_code=200, text="<RewardsCorpIMS><Message>Update Successful</Message></RewardsCorpIMS>")
+
+        with patch.object(client.session, "request", side_effect=fake_request):
+            message = await client.availability_mass_update(1, self.resort_id, dates, [5] * 1500, idempotent=True)
+        await client.close()
+        self.assertEqual(message, "Update Successful")
+        self.assertEqual(len(sent), 2)
+        self.assertEqual(sent[0], sent[1])
+
+    async def test_streamed_bookings_release_their_slot(self):
+        """
+        Test that iter_bookings releases its concurrency slot once the headers arrived,
+        so the caller can make other calls while it consumes the bookings
+        """
+        httpx = async_client.httpx
+        booking = "<Booking><BookingDetails><BookingNumber>E-IG{0}RT</BookingNumber><Rooms><Room><RoomDetails>" \
+            "<BookingId>{0}</BookingId><RoomDescription>Villa</RoomDescription><RoomId>18178</RoomId>" \
+            "<DateBooked>01-06-2025 00:00:00</DateBooked><CheckIn>01-06-2025</CheckIn><Nights>1</Nights>" \
+            "<Adults>2</Adults><Children>0</Children><Infants>0</Infants></RoomDetails></Room></Rooms>" \
+            "<ResortId>1056</ResortId><ResortName>Best In Town</ResortName><ResortCurrency>USD</ResortCurrency>" \
+            "<BookingStatusId>2</BookingStatusId><BookingStatusDescription>Booking Confirmed</BookingStatusDescription>" \
+            "</BookingDetails></Booking>"
+        bookings_response = "<RewardsCorpIMS><Bookings>" + "".join(booking.format(i) for i in range(3)) + "</Bookings></RewardsCorpIMS>"
+
+        def handler(request):
+            if request.headers["SOAPAction"].endswith("GetRoomList"):
+                return httpx.Response(200, text=ROOMLIST_RESPONSE)
+            return httpx.Response(200, text=bookings_response)
+
+        client = AsyncDimsInventoryClient(max_concurrency=1)
+        await client.session.aclose()
+        client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        room_ids = []
+        async for booking in client.iter_bookings(self.resort_id, "2025-06-01", "2025-06-30"):
+            room_list = await asyncio.wait_for(client.get_roomlist(self.resort_id), 2)
+            room_ids.append((booking.rooms[0].booking_id, room_list.rooms[0].room_id))
+        await client.close()
+        self.assertEqual(room_ids, [(0, 18178), (1, 18178), (2, 18178)])
+
+
+if __name__ == '__main__':
+    unittest.main()
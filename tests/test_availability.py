@@ -3,6 +3,9 @@ from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
 
 from ignite_travel.sdk import DimsInventoryClient
+from ignite_travel.sdk.entities import RoomList, Room, Availability
+from ignite_travel.sdk.base import MassUpdateBody
+from ignite_travel.sdk.exceptions import MassUpdateError
 
 
 class TestGetAvailability(unittest.TestCase):
@@ -52,6 +55,151 @@ class TestGetAvailability(unittest.TestCase):
         message = self.client.availability_mass_update(room.room_id, self.resort_id, [date.strftime("%d-%m-%Y") for date in dates], qty)
         self.assertEqual(message, "Update Successful")
 
+    @patch.object(DimsInventoryClient, 'retrieve_availability')
+    @patch.object(DimsInventoryClient, 'get_roomlist')
+    def test_resort_availability_fan_out(self, mock_get_roomlist, mock_retrieve_availability):
+        """
+        Test the retrieve_availability_for_resort method
+        """
+        mock_get_roomlist.return_value = RoomList(rooms=[Room(room_id=1, room_name="Single Room"), Room(room_id=2, room_name="Double Room")])
+        mock_retrieve_availability.side_effect = lambda room_id, *args: [
+            Availability(inventory_available=room_id, literal_inventory=room_id, dtm=self.start_date.date())
+        ]
+        start_date = self.start_date.strftime("%Y-%m-%d")
+        end_date = self.end_date.strftime("%Y-%m-%d")
+        availability = self.client.retrieve_availability_for_resort(self.resort_id, start_date, end_date, max_workers=2)
+        self.assertEqual(sorted(availability.keys()), [1, 2])
+        self.assertEqual(availability[2][0].inventory_available, 2)
+        mock_retrieve_availability.assert_any_call(1, self.resort_id, start_date, end_date)
+
+    @patch.object(DimsInventoryClient, 'availability_mass_update')
+    @patch.object(DimsInventoryClient, 'retrieve_availability')
+    def test_reconcile_availability(self, mock_retrieve_availability, mock_mass_update):
+        """
+        Test that reconcile_availability only sends the dates whose allocation changed
+        """
+        days = [(self.start_date + timedelta(days=i)).date() for i in range(3)]
+        mock_retrieve_availability.return_value = [
+            Availability(inventory_available=8, literal_inventory=10, dtm=days[0]),
+            Availability(inventory_available=5, literal_inventory=5, dtm=days[1]),
+        ]
+        mock_mass_update.return_value = "Update Successful"
+        dates = [day.strftime("%d-%m-%Y") for day in days]
+        reconciliation = self.client.reconcile_availability(1, self.resort_id, dates, [10, 6, 4])
+        self.assertEqual(reconciliation.skipped, [days[0]])
+        self.assertEqual(reconciliation.written, [days[1], days[2]])
+        self.assertEqual(reconciliation.message, "Update Successful")
+        mock_retrieve_availability.assert_called_once_with(1, self.resort_id, days[0].strftime("%Y-%m-%d"), days[2].strftime("%Y-%m-%d"))
+        mock_mass_update.assert_called_once_with(1, self.resort_id, dates[1:], [6, 4], "UpdateInventory", False)
+
+    @patch.object(DimsInventoryClient, 'availability_mass_update')
+    def test_reconcile_availability_unchanged_snapshot(self, mock_mass_update):
+        """
+        Test that nothing is sent when the snapshot already matches
+        """
+        day = self.start_date.date()
+        snapshot = [Availability(inventory_available=10, literal_inventory=10, dtm=day)]
+        reconciliation = self.client.reconcile_availability(1, self.resort_id, [day.strftime("%d-%m-%Y")], [10], snapshot=snapshot)
+        self.assertEqual(reconciliation.skipped, [day])
+        self.assertIsNone(reconciliation.message)
+        mock_mass_update.assert_not_called()
+
+    def test_availability_without_validation(self):
+        """
+        Test that validate_entities=False builds the same availability as the validated path from the same rows
+        """
+        days = [self.end_date + timedelta(days=i) for i in range(3)]
+        response = "<RewardsCorpIMS>" + "".join(
+            f"<DateSet><Date>{day.strftime('%d-%m-%Y')}</Date><InventoryAvailable>{i}</InventoryAvailable><LiteralInventory>5</LiteralInventory></DateSet>"
+            for i, day in enumerate(days)
+        ) + "</RewardsCorpIMS>"
+        trusted_client = DimsInventoryClient(validate_entities=False)
+        validated = self.client._parse_availability(response)
+        trusted = trusted_client._parse_availability(response)
+        trusted_client.close()
+        self.assertEqual(trusted, validated)
+        self.assertEqual([day.model_dump() for day in trusted], [day.model_dump() for day in validated])
+        self.assertEqual([day.model_fields_set for day in trusted], [day.model_fields_set for day in validated])
+        self.assertEqual([day.dtm for day in trusted], [day.date() for day in days])
+
+    def test_mass_update_is_split_into_chunks(self):
+        """
+        Test that updates larger than max_dates_per_request are sent in chunks
+        """
+        client = DimsInventoryClient(max_dates_per_request=2)
+        dates = [(self.end_date + timedelta(days=i)).strftime("%d-%m-%Y") for i in range(5)]
+        with patch.object(client, 'make_request', return_value="<RewardsCorpIMS><Message>Update Successful</Message></RewardsCorpIMS>") as mock_make_request:
+            message = client.availability_mass_update(1, self.resort_id, dates, [10, 11, 12, 13, 14])
+        self.assertEqual(message, "Update Successful")
+        self.assertEqual(mock_make_request.call_count, 3)
+        payloads = sorted(call.args[1] for call in mock_make_request.call_args_list)
+        self.assertTrue(all(payload.count("<DatesSet>") <= 2 for payload in payloads))
+
+    def test_large_mass_update_is_streamed(self):
+        """
+        Test that mass updates with many dates are sent as a body produced while it is sent
+        """
+        dates = [(self.end_date + timedelta(days=i)).strftime("%d-%m-%Y") for i in range(1500)]
+        response = MagicMock(status_code=200, text="<RewardsCorpIMS><Message>Update Successful</Message></RewardsCorpIMS>")
+        with patch.object(self.client.session, "request", return_value=response) as mock_request:
+            message = self.client.availability_mass_update(1, self.resort_id, dates, [i % 10 for i in range(1500)])
+        self.assertEqual(message, "Update Successful")
+        body = mock_request.call_args.kwargs["data"]
+        self.assertIsInstance(body, MassUpdateBody)
+        data = b"".join(body)
+        self.assertEqual(len(data), len(body))
+        # iterating again produces the same body
+        self.assertEqual(b"".join(body), data)
+        self.assertEqual(data.count(b"<DatesSet>"), 1500)
+        self.assertIn(f"<Date>{(self.end_date + timedelta(days=1499)).date()}</Date><InventoryAllocation>9</InventoryAllocation>".encode(), data)
+
+    def test_chunked_mass_update_reports_failed_chunks(self):
+        """
+        Test that failed chunks are listed in the result and raised from availability_mass_update
+        """
+        client = DimsInventoryClient(max_dates_per_request=2)
+        dates = [(self.end_date + timedelta(days=i)).strftime("%d-%m-%Y") for i in range(4)]
+
+        def make_request(method, payload, action_header, idempotent=False):
+            if "<InventoryAllocation>12</InventoryAllocation>" in payload:
+                raise ConnectionError("connection reset")
+            return "<RewardsCorpIMS><Message>Update Successful</Message></RewardsCorpIMS>"
+
+        with patch.object(client, 'make_request', side_effect=make_request):
+            result = client.chunked_availability_mass_update(1, self.resort_id, dates, [10, 11, 12, 13], max_workers=2)
+            self.assertEqual(len(result.chunks), 2)
+            self.assertEqual(len(result.failed_chunks), 1)
+            failed = result.failed_chunks[0]
+            self.assertEqual(failed.index, 1)
+            self.assertEqual(failed.dates, dates[2:])
+            self.assertEqual(failed.qty, [12, 13])
+            self.assertIn("connection reset", failed.error)
+            with self.assertRaises(MassUpdateError) as context:
+                client.availability_mass_update(1, self.resort_id, dates, [10, 11, 12, 13])
+        self.assertEqual(len(context.exception.result.failed_chunks), 1)
+
+    def test_rejected_chunks_are_failed(self):
+        """
+        Test that a chunk DIMS answered with an error message is reported as failed and raised, not merged into the message
+        """
+        client = DimsInventoryClient(max_dates_per_request=2)
+        dates = [(self.end_date + timedelta(days=i)).strftime("%d-%m-%Y") for i in range(4)]
+
+        def make_request(method, payload, action_header, idempotent=False):
+            if "<InventoryAllocation>12</InventoryAllocation>" in payload:
+                return "<RewardsCorpIMS><MessageType>Error</MessageType><Message>Invalid allocation</Message></RewardsCorpIMS>"
+            return "<RewardsCorpIMS><Message>Update Successful</Message></RewardsCorpIMS>"
+
+        with patch.object(client, 'make_request', side_effect=make_request):
+            result = client.chunked_availability_mass_update(1, self.resort_id, dates, [10, 11, 12, 13], max_workers=2)
+            self.assertEqual([chunk.index for chunk in result.failed_chunks], [1])
+            self.assertEqual(result.failed_chunks[0].message, "Invalid allocation")
+            self.assertIn("Invalid allocation", result.failed_chunks[0].error)
+            self.assertEqual(result.message, "Update Successful")
+            with self.assertRaises(MassUpdateError) as context:
+                client.availability_mass_update(1, self.resort_id, dates, [10, 11, 12, 13])
+        self.assertEqual(context.exception.result.failed_chunks[0].dates, dates[2:])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,163 @@
+import unittest
+from unittest.mock import MagicMock
+from datetime import date, datetime, timedelta
+
+from ignite_travel.sdk import BookingSyncEngine
+from ignite_travel.sdk.entities import BookingDetail, RoomDetail, CancelledBooking, BookingSyncState
+
+
+def make_booking(booking_number, booking_id, date_booked, adults=2, check_in=date(2025, 6, 1)):
+    return BookingDetail(
+        booking_number=booking_number,
+        resort_id=1056,
+        resort_name="Best In Town",
+        booking_status_id=2,
+        booking_status_description="Booking Confirmed",
+        rooms=[RoomDetail(
+            booking_id=booking_id,
+            room_description="Prestige Water Villa",
+            room_id=18178,
+            date_booked=date_booked,
+            check_in=check_in,
+            nights=1,
+            adults=adults,
+        )]
+    )
+
+
+def make_cancellation(booking_number, booking_id, change_date):
+    return CancelledBooking(
+        booking_id=booking_id,
+        booking_number=booking_number,
+        booking_status_id=5,
+        booking_status_description="Cancelled booking",
+        booking_change_date=change_date
+    )
+
+
+class TestBookingSyncEngine(unittest.TestCase):
+    """
+    Test the incremental booking sync engine
+    """
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.get_cancelled_bookings.return_value = []
+        self.resort_id = 1056
+        self.events = []
+        self.engine = BookingSyncEngine(self.client, start_date=date(2025, 5, 1), on_event=self.events.append, strategy="booked")
+
+    def test_added_changed_and_unchanged_bookings(self):
+        """
+        Test that only new or changed bookings produce events
+        """
+        first = make_booking("E-IG1RT", 1, datetime(2025, 5, 20, 10, 0))
+        second = make_booking("E-IG2RT", 2, datetime(2025, 5, 21, 10, 0))
+        self.client.get_bookings.return_value = [first, second]
+        events = self.engine.poll(self.resort_id)
+        self.assertEqual([(event.kind, event.booking_number) for event in events], [("added", "E-IG1RT"), ("added", "E-IG2RT")])
+
+        self.client.get_bookings.return_value = [second, make_booking("E-IG1RT", 1, datetime(2025, 5, 20, 10, 0), adults=3)]
+        events = self.engine.poll(self.resort_id)
+        self.assertEqual([(event.kind, event.booking_number) for event in events], [("changed", "E-IG1RT")])
+        self.assertEqual(self.engine.state(self.resort_id).bookings["E-IG1RT"].rooms[0].adults, 3)
+        self.assertEqual(len(self.events), 3)
+
+    def test_windows_start_at_high_water_marks(self):
+        """
+        Test that polls after the first only request the window since the high-water marks
+        """
+        self.client.get_bookings.return_value = [make_booking("E-IG1RT", 1, datetime(2025, 5, 20, 10, 0))]
+        self.client.get_cancelled_bookings.return_value = [make_cancellation("E-IG9MG", 9, datetime(2025, 5, 26, 9, 48))]
+        self.engine.poll(self.resort_id)
+        self.assertEqual(self.client.get_bookings.call_args.args[1], "2025-05-01")
+        self.engine.poll(self.resort_id)
+        self.assertEqual(self.client.get_bookings.call_args.args[1], "2025-05-19")
+        self.assertEqual(self.client.get_cancelled_bookings.call_args.args[1], "2025-05-25")
+        self.assertEqual(self.client.get_bookings.call_args.args[2], max(date(2025, 5, 19), date.today()).strftime("%Y-%m-%d"))
+
+    def test_cancellations_are_tombstoned(self):
+        """
+        Test that a cancellation removes the booking once and keeps it from being added again
+        """
+        booking = make_booking("E-IG1RT", 1, datetime(2025, 5, 20, 10, 0))
+        self.client.get_bookings.return_value = [booking]
+        self.engine.poll(self.resort_id)
+
+        # the cancellation only carries the booking id of the room
+        self.client.get_cancelled_bookings.return_value = [make_cancellation("UNKNOWN", 1, datetime(2025, 5, 26, 9, 48))]
+        events = self.engine.poll(self.resort_id)
+        self.assertEqual([(event.kind, event.booking_number) for event in events], [("cancelled", "E-IG1RT")])
+        self.assertEqual(events[0].booking, booking)
+        self.assertNotIn("E-IG1RT", self.engine.state(self.resort_id).bookings)
+
+        # the cancelled booking is still listed by get_bookings and the cancellation is fetched again in the overlap
+        self.assertEqual(self.engine.poll(self.resort_id), [])
+
+    def test_resume_from_saved_state(self):
+        """
+        Test that the state can be saved and restored
+        """
+        self.client.get_bookings.return_value = [make_booking("E-IG1RT", 1, datetime(2025, 5, 20, 10, 0))]
+        self.engine.poll(self.resort_id)
+        saved = self.engine.state(self.resort_id).model_dump_json()
+
+        engine = BookingSyncEngine(self.client, states={self.resort_id: BookingSyncState.model_validate_json(saved)}, strategy="booked")
+        self.assertEqual(engine.poll(self.resort_id), [])
+        self.assertEqual(engine.bookings_window(self.resort_id)[0], "2025-05-19")
+
+
+class TestBookingSyncWindows(unittest.TestCase):
+    """
+    Test what each strategy detects against a client that only returns the bookings of the requested window
+    """
+
+    def setUp(self):
+        self.today = date.today()
+        self.dims = {}
+        self.client = MagicMock()
+        self.client.get_cancelled_bookings.return_value = []
+
+    def get_bookings(self, resort_id, start_date, end_date, by):
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        return [booking for booking in self.dims.values() if start <= by(booking) <= end]
+
+    def book(self, booking_number, booked_days_ago, check_in_in_days, adults=2):
+        date_booked = datetime.combine(self.today - timedelta(days=booked_days_ago), datetime.min.time())
+        self.dims[booking_number] = make_booking(booking_number, len(self.dims) + 1, date_booked, adults, self.today + timedelta(days=check_in_in_days))
+
+    def test_stay_window_reports_late_changes(self):
+        """
+        Test that the stay strategy reports future stays booked long ago and bookings modified long after they were made
+        """
+        self.client.get_bookings.side_effect = lambda *args: self.get_bookings(*args, by=lambda booking: booking.rooms[0].check_in)
+        engine = BookingSyncEngine(self.client, strategy="stay", forward_days=365)
+        self.book("E-IG1RT", booked_days_ago=200, check_in_in_days=30)
+        self.book("E-IG2RT", booked_days_ago=1, check_in_in_days=-10)
+        self.assertEqual([(event.kind, event.booking_number) for event in engine.poll(1056)], [("added", "E-IG1RT")])
+        self.book("E-IG1RT", booked_days_ago=200, check_in_in_days=30, adults=3)
+        self.book("E-IG3RT", booked_days_ago=0, check_in_in_days=300)
+        events = engine.poll(1056)
+        self.assertEqual([(event.kind, event.booking_number) for event in events], [("changed", "E-IG1RT"), ("added", "E-IG3RT")])
+        self.assertEqual(engine.bookings_window(1056), (self.today.isoformat(), (self.today + timedelta(days=365)).isoformat()))
+
+    def test_booked_window_only_fetches_new_bookings(self):
+        """
+        Test that the booked strategy reports new bookings but not changes made after the overlap
+        """
+        self.client.get_bookings.side_effect = lambda *args: self.get_bookings(*args, by=lambda booking: booking.rooms[0].date_booked.date())
+        engine = BookingSyncEngine(self.client, strategy="booked", lookback_days=300)
+        self.book("E-IG1RT", booked_days_ago=200, check_in_in_days=30)
+        self.book("E-IG2RT", booked_days_ago=5, check_in_in_days=60)
+        self.assertEqual(len(engine.poll(1056)), 2)
+        self.book("E-IG1RT", booked_days_ago=200, check_in_in_days=30, adults=3)
+        self.book("E-IG3RT", booked_days_ago=0, check_in_in_days=90)
+        self.assertEqual([(event.kind, event.booking_number) for event in engine.poll(1056)], [("added", "E-IG3RT")])
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            BookingSyncEngine(self.client, strategy="checkin")
+
+
+if __name__ == '__main__':
+    unittest.main()
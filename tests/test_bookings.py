@@ -1,8 +1,11 @@
 import unittest
+import requests
 from ignite_travel.sdk import DimsInventoryClient
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
+from io import BytesIO
 
 from ignite_travel.sdk.entities import *
+from pydantic import ValidationError
 from datetime import datetime, timedelta
 
 
@@ -120,6 +123,168 @@ class TestBookings(unittest.TestCase):
         self.assertEqual(booking.booking_status_description, "Cancelled booking")
         self.assertEqual(booking.booking_change_date, datetime(2025, 5, 26, 9, 48, 0))
 
+    @patch('ignite_travel.sdk.client.DimsInventoryClient._send')
+    def test_iter_bookings(self, mock_send):
+        """
+        Test that iter_bookings streams every booking from the response
+        """
+        booking = """<Booking>
+                            <BookingDetails>
+                                <BookingNumber>E-IG{0}RT</BookingNumber>
+                                <Rooms>
+                                    <Room>
+                                        <RoomDetails>
+                                            <BookingId>{0}</BookingId>
+                                            <RoomDescription>Prestige Water Villa</RoomDescription>
+                                            <RoomId>18178</RoomId>
+                                            <DateBooked>01-06-2025 00:00:00</DateBooked>
+                                            <CheckIn>01-06-2025</CheckIn>
+                                            <Nights>1</Nights>
+                                            <Adults>2</Adults>
+                                            <Children>0</Children>
+                                            <Infants>0</Infants>
+                                        </RoomDetails>
+                                    </Room>
+                                </Rooms>
+                                <ResortId>1056</ResortId>
+                                <ResortName>Best In Town</ResortName>
+                                <ResortCurrency>USD</ResortCurrency>
+                                <BookingStatusId>2</BookingStatusId>
+                                <BookingStatusDescription>Booking Confirmed</BookingStatusDescription>
+                            </BookingDetails>
+                        </Booking>"""
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.raw = BytesIO(
+            ("<RewardsCorpIMS><Bookings>" + "".join(booking.format(i) for i in range(50)) + "</Bookings></RewardsCorpIMS>").encode()
+        )
+        mock_send.return_value = response
+        bookings = self.client.iter_bookings(self.resort_id, self.start_date.strftime("%Y-%m-%d"), self.end_date.strftime("%Y-%m-%d"))
+        first = next(bookings)
+        self.assertEqual(first.booking_number, "E-IG0RT")
+        self.assertEqual(first.rooms[0].booking_id, 0)
+        self.assertEqual(len(list(bookings)), 49)
+
+    @patch('ignite_travel.sdk.client.DimsInventoryClient._send')
+    def test_iter_bookings_error_response(self, mock_send):
+        """
+        Test that iter_bookings yields nothing when DIMS returns an error message
+        """
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.raw = BytesIO(b"<RewardsCorpIMS><MessageType>Error</MessageType><Message>No bookings</Message></RewardsCorpIMS>")
+        mock_send.return_value = response
+        bookings = list(self.client.iter_bookings(self.resort_id, self.start_date.strftime("%Y-%m-%d"), self.end_date.strftime("%Y-%m-%d")))
+        self.assertEqual(bookings, [])
+
+    def test_iter_bookings_closes_failed_response(self):
+        """
+        Test that a streamed response with an error status is closed so its connection goes back to the pool
+        """
+        response = MagicMock(status_code=404)
+        response.raise_for_status.side_effect = requests.HTTPError("404 Client Error")
+        with patch.object(self.client.session, "request", return_value=response):
+            with self.assertRaises(requests.HTTPError):
+                list(self.client.iter_bookings(self.resort_id, self.start_date.strftime("%Y-%m-%d"), self.end_date.strftime("%Y-%m-%d")))
+        response.close.assert_called_once()
+
+    @patch('ignite_travel.sdk.client.DimsInventoryClient.make_request')
+    def test_bookings_without_validation(self, mock_make_request):
+        """
+        Test that validate_entities=False builds the same bookings as the validated path
+        """
+        mock_make_request.return_value = """<RewardsCorpIMS><Bookings><Booking>
+                <BookingNumber>E-IG1RT</BookingNumber>
+                <BookingDetails>
+                    <BookingStatusId>2</BookingStatusId>
+                    <BookingStatusDescription>Booking Confirmed</BookingStatusDescription>
+                    <ResortId>1056</ResortId>
+                    <ResortName>Best In Town</ResortName>
+                    <ResortCurrency>USD</ResortCurrency>
+                </BookingDetails>
+                <Rooms><Room><RoomDetails>
+                    <BookingId>7</BookingId>
+                    <RoomDescription>Prestige Water Villa</RoomDescription>
+                    <RoomId>18178</RoomId>
+                    <DateBooked>01-06-2025 10:30:00</DateBooked>
+                    <CheckIn>03-06-2025</CheckIn>
+                    <Nights>2</Nights>
+                    <Adults>2</Adults>
+                    <Children>1</Children>
+                    <Infants>0</Infants>
+                    <Surname>Smith</Surname>
+                </RoomDetails></Room></Rooms>
+            </Booking></Bookings></RewardsCorpIMS>"""
+        validated = self.client.get_bookings(self.resort_id, "2025-06-01", "2025-06-30")
+        trusted_client = DimsInventoryClient(validate_entities=False)
+        trusted = trusted_client.get_bookings(self.resort_id, "2025-06-01", "2025-06-30")
+        trusted_client.close()
+        self.assertEqual(trusted[0].model_dump(), validated[0].model_dump())
+        self.assertEqual(trusted[0].rooms[0].check_in, datetime(2025, 6, 3).date())
+        self.assertIsInstance(trusted[0].resort_id, int)
+        self.assertEqual(validated[0].rooms[0].surname, "Smith")
+        self.assertIsNone(validated[0].rooms[0].first_name)
+
+    @patch('ignite_travel.sdk.client.DimsInventoryClient.make_request')
+    def test_missing_required_fields_without_validation(self, mock_make_request):
+        """
+        Test that validate_entities=False still refuses bookings missing a required field, as the validated path does
+        """
+        mock_make_request.return_value = """<RewardsCorpIMS><Bookings><Booking>
+                <BookingNumber>E-IG1RT</BookingNumber>
+                <BookingDetails>
+                    <BookingStatusId>2</BookingStatusId>
+                    <BookingStatusDescription>Booking Confirmed</BookingStatusDescription>
+                    <ResortId>1056</ResortId>
+                </BookingDetails>
+                <Rooms><Room><RoomDetails>
+                    <BookingId>7</BookingId>
+                    <RoomId>18178</RoomId>
+                    <DateBooked>01-06-2025 10:30:00</DateBooked>
+                    <CheckIn>03-06-2025</CheckIn>
+                    <Nights>2</Nights>
+                    <Adults>2</Adults>
+                </RoomDetails></Room></Rooms>
+            </Booking></Bookings></RewardsCorpIMS>"""
+        trusted_client = DimsInventoryClient(validate_entities=False)
+        for client in (self.client, trusted_client):
+            with self.subTest(validate_entities=client.validate_entities):
+                with self.assertRaises(ValidationError) as context:
+                    client.get_bookings(self.resort_id, "2025-06-01", "2025-06-30")
+                self.assertEqual(context.exception.errors()[0]["loc"][-1], "room_description")
+        trusted_client.close()
+
+    def test_construct_matches_validated_models(self):
+        """
+        Test that construct builds models pydantic treats as validated ones, this relies on the pydantic internals it sets
+        """
+        values = {"booking_id": 7, "room_description": "Villa", "room_id": 18178, "date_booked": datetime(2025, 6, 1), "check_in": date(2025, 6, 3), "nights": 2, "adults": 2}
+        constructed = construct(RoomDetail, dict(values))
+        validated = RoomDetail(**values)
+        self.assertEqual(constructed, validated)
+        self.assertEqual(constructed.model_fields_set, validated.model_fields_set)
+        self.assertEqual(constructed.model_dump_json(), validated.model_dump_json())
+        self.assertEqual(constructed.model_copy(update={"adults": 3}).adults, 3)
+        self.assertEqual(RoomDetail.model_validate(constructed.model_dump()), validated)
+
+    def test_parse_dims_datetime(self):
+        """
+        Test that DIMS timestamps are read day first and other formats fall back to ISO and dateutil
+        """
+        self.assertEqual(parse_dims_datetime("01-06-2025 08:05:09"), datetime(2025, 6, 1, 8, 5, 9))
+        self.assertEqual(parse_dims_datetime("2025-05-06T10:00:00"), datetime(2025, 5, 6, 10, 0, 0))
+        self.assertEqual(parse_dims_datetime("May 26 2025 9:48AM"), datetime(2025, 5, 26, 9, 48, 0))
+        # the dateutil fallback reads the day first too
+        self.assertEqual(parse_dims_datetime("1-06-2025 10:30:00"), datetime(2025, 6, 1, 10, 30, 0))
+        self.assertEqual(parse_dims_datetime("1-6-2025 10:30"), datetime(2025, 6, 1, 10, 30, 0))
+        self.assertEqual(parse_dims_date("01-06-2025"), parse_dims_date("2025-06-01"))
+        # days and months without a leading zero
+        self.assertEqual(parse_dims_date("1-6-2025"), date(2025, 6, 1))
+        self.assertEqual(parse_dims_date("3-12-2025"), date(2025, 12, 3))
+        self.assertEqual(parse_dims_date("13-6-2025"), date(2025, 6, 13))
+        with self.assertRaises(ValueError):
+            parse_dims_date("32-01-2025")
+
 
     def test_get_actual_bookings(self):
         """
@@ -0,0 +1,264 @@
+import re
+import threading
+import unittest
+from unittest.mock import patch
+from datetime import date, datetime, timedelta
+
+from ignite_travel.sdk import DimsInventoryClient
+from ignite_travel.sdk.entities import Availability
+from ignite_travel.sdk.cache import AvailabilityCache, TTLCache
+
+
+ROOMLIST_RESPONSE = """<RewardsCorpIMS>
+    <Rooms>
+        <Room><RoomTypeId>1</RoomTypeId><Description>Single Room</Description></Room>
+    </Rooms>
+</RewardsCorpIMS>"""
+
+
+def availability_response(method, payload, action_header, idempotent=False):
+    """
+    Answer a RetrieveAvailability request with one DateSet per requested day
+    """
+    start, end = [datetime.strptime(day, "%Y-%m-%d").date() for day in re.findall(r"<Date>(.*?)</Date>", payload)]
+    datesets = []
+    while start <= end:
+        datesets.append(f"<DateSet><Date>{start.strftime('%d-%m-%Y')}</Date><InventoryAvailable>{start.day}</InventoryAvailable><LiteralInventory>{start.day}</LiteralInventory></DateSet>")
+        start += timedelta(days=1)
+    return f"<RewardsCorpIMS><Dates>{''.join(datesets)}</Dates></RewardsCorpIMS>"
+
+
+class FakeTimer:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    """
+    Test the TTL cache
+    """
+
+    def setUp(self):
+        self.timer = FakeTimer()
+        self.cache = TTLCache(ttl=10, maxsize=2, timer=self.timer)
+
+    def test_entries_expire(self):
+        self.cache.set("a", 1)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.timer.now = 11
+        self.assertIsNone(self.cache.get("a"))
+        info = self.cache.info()
+        self.assertEqual((info.hits, info.misses, info.size), (1, 1, 0))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("c"), 3)
+
+
+class TestRoomListCache(unittest.TestCase):
+    """
+    Test the room list cache of the client
+    """
+
+    def setUp(self):
+        self.client = DimsInventoryClient(roomlist_cache_ttl=3600, roomlist_cache_size=8)
+
+    @patch.object(DimsInventoryClient, 'make_request', return_value=ROOMLIST_RESPONSE)
+    def test_roomlist_is_cached_per_resort(self, mock_make_request):
+        """
+        Test that repeated calls for a resort are served from the cache
+        """
+        first = self.client.get_roomlist(1056)
+        second = self.client.get_roomlist("1056")
+        self.client.get_roomlist(1057)
+        self.assertIs(first, second)
+        self.assertEqual(mock_make_request.call_count, 2)
+        info = self.client.roomlist_cache_info()
+        self.assertEqual((info.hits, info.misses, info.size), (1, 2, 2))
+
+    @patch.object(DimsInventoryClient, 'make_request', return_value=ROOMLIST_RESPONSE)
+    def test_invalidate_roomlist(self, mock_make_request):
+        """
+        Test that invalidating a resort forces the next call to fetch it again
+        """
+        self.client.get_roomlist(1056)
+        self.client.get_roomlist(1057)
+        self.client.invalidate_roomlist(1056)
+        self.client.get_roomlist(1056)
+        self.client.get_roomlist(1057)
+        self.assertEqual(mock_make_request.call_count, 3)
+
+    def test_cache_disabled_by_default(self):
+        """
+        Test that the cache is only enabled when a ttl is given
+        """
+        self.assertIsNone(DimsInventoryClient().roomlist_cache_info())
+
+
+class TestAvailabilityCacheStore(unittest.TestCase):
+    """
+    Test the bounds of the per-day availability cache
+    """
+
+    def setUp(self):
+        self.timer = FakeTimer()
+        self.cache = AvailabilityCache(ttl=10, maxsize=2, timer=self.timer)
+        self.start = date.today() + timedelta(days=1)
+
+    def test_reads_refresh_recency(self):
+        """
+        Test that the room read most recently is kept and the least recently used one is evicted
+        """
+        self.cache.store(1, 1, self.start, self.start, [])
+        self.cache.store(1, 2, self.start, self.start, [])
+        self.assertEqual(self.cache.missing_ranges(1, 1, self.start, self.start), [])
+        self.cache.store(1, 3, self.start, self.start, [])
+        self.assertEqual(self.cache.missing_ranges(1, 1, self.start, self.start), [])
+        self.assertEqual(self.cache.missing_ranges(1, 2, self.start, self.start), [(self.start, self.start)])
+
+    def test_past_and_stale_days_are_pruned(self):
+        """
+        Test that storing a window drops the days of the room that are in the past or stale
+        """
+        yesterday = date.today() - timedelta(days=1)
+        self.cache.store(1, 1, yesterday, yesterday, [Availability(inventory_available=1, literal_inventory=1, dtm=yesterday)])
+        self.cache.store(1, 1, self.start, self.start, [])
+        self.timer.now = 11
+        self.cache.store(1, 1, self.start + timedelta(days=1), self.start + timedelta(days=1), [])
+        self.assertEqual(list(self.cache._rooms[(1, 1)]), [self.start + timedelta(days=1)])
+
+
+class TestAvailabilityCache(unittest.TestCase):
+    """
+    Test the per-day availability cache of the client
+    """
+
+    def setUp(self):
+        self.client = DimsInventoryClient(availability_cache_ttl=3600)
+        self.resort_id = 1056
+        self.room_id = 18178
+        self.start = date.today() + timedelta(days=1)
+
+    def window(self, first_day, last_day):
+        return (self.start + timedelta(days=first_day)).strftime("%Y-%m-%d"), (self.start + timedelta(days=last_day)).strftime("%Y-%m-%d")
+
+    def requested_windows(self, mock_make_request):
+        return [tuple(re.findall(r"<Date>(.*?)</Date>", call.args[1])) for call in mock_make_request.call_args_list]
+
+    @patch.object(DimsInventoryClient, 'make_request', side_effect=availability_response)
+    def test_overlapping_window_fetches_only_missing_days(self, mock_make_request):
+        """
+        Test that an overlapping window only requests the days that are not cached
+        """
+        self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(0, 9))
+        availability = self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(5, 14))
+        self.assertEqual(self.requested_windows(mock_make_request), [self.window(0, 9), self.window(10, 14)])
+        self.assertEqual([entry.dtm for entry in availability], [self.start + timedelta(days=i) for i in range(5, 15)])
+
+    @patch.object(DimsInventoryClient, 'make_request', side_effect=availability_response)
+    def test_gaps_are_fetched_as_separate_ranges(self, mock_make_request):
+        """
+        Test that a window spanning two cached ranges only fetches the gap between them
+        """
+        self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(0, 2))
+        self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(6, 8))
+        availability = self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(0, 8))
+        self.assertEqual(self.requested_windows(mock_make_request)[-1], self.window(3, 5))
+        self.assertEqual(len(availability), 9)
+        info = self.client.availability_cache_info()
+        self.assertEqual((info.hits, info.misses), (6, 9))
+
+    @patch.object(DimsInventoryClient, 'make_request', side_effect=availability_response)
+    def test_stale_days_are_fetched_again(self, mock_make_request):
+        """
+        Test that days older than the ttl are fetched again
+        """
+        timer = FakeTimer()
+        self.client._availability_cache.timer = timer
+        self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(0, 4))
+        timer.now = 3601
+        self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(0, 4))
+        self.client.invalidate_availability(self.resort_id, self.room_id)
+        self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(0, 4))
+        self.assertEqual(mock_make_request.call_count, 3)
+
+    def test_confirmed_update_is_written_through(self):
+        """
+        Test that a confirmed update changes the cached day without a refetch
+        """
+        day = self.start + timedelta(days=2)
+        with patch.object(DimsInventoryClient, 'make_request', side_effect=availability_response):
+            before = {entry.dtm: entry for entry in self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(0, 4))}
+        with patch.object(DimsInventoryClient, 'make_request', return_value="<RewardsCorpIMS><Message>Update Successful</Message></RewardsCorpIMS>"):
+            self.client.update_availability(self.room_id, self.resort_id, day.strftime("%d-%m-%Y"), 40)
+        with patch.object(DimsInventoryClient, 'make_request', side_effect=availability_response) as mock_make_request:
+            availability = {entry.dtm: entry for entry in self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(0, 4))}
+        mock_make_request.assert_not_called()
+        self.assertEqual(availability[day].literal_inventory, 40)
+        self.assertEqual(availability[day].inventory_available, 40)
+        self.assertEqual(before[day].literal_inventory, day.day)
+
+    def test_unconfirmed_update_invalidates_written_days(self):
+        """
+        Test that the days of a failed or unconfirmed update are fetched again, and only those
+        """
+        days = [self.start + timedelta(days=1), self.start + timedelta(days=3)]
+        dates = [day.strftime("%d-%m-%Y") for day in days]
+        with patch.object(DimsInventoryClient, 'make_request', side_effect=availability_response):
+            self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(0, 4))
+        with patch.object(DimsInventoryClient, 'make_request', side_effect=ConnectionError("connection reset")):
+            with self.assertRaises(ConnectionError):
+                self.client.availability_mass_update(self.room_id, self.resort_id, dates, [1, 2])
+        with patch.object(DimsInventoryClient, 'make_request', side_effect=availability_response) as mock_make_request:
+            self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(0, 4))
+        self.assertEqual(self.requested_windows(mock_make_request), [self.window(1, 1), self.window(3, 3)])
+
+    def test_read_in_flight_does_not_overwrite_a_write(self):
+        """
+        Test that a read sent before a write and answered after it does not store its older days over the written ones,
+        and that a read started after the write sends its own request instead of sharing the older one
+        """
+        sent = threading.Event()
+        release = threading.Event()
+        windows = []
+
+        def fake_request(method, payload, action_header="GetRoomList", service_type="inventory", idempotent=False):
+            if action_header != "RetrieveAvailability":
+                return "<RewardsCorpIMS><Message>Update Successful</Message></RewardsCorpIMS>"
+            windows.append(tuple(re.findall(r"<Date>(.*?)</Date>", payload)))
+            if len(windows) == 2:
+                sent.set()
+                release.wait(5)
+                # the allocation before the write
+                return re.sub(r"Inventory(Available)?>\d+<", r"Inventory\1>5<", availability_response(method, payload, action_header))
+            return availability_response(method, payload, action_header)
+
+        written = [self.start, self.start + timedelta(days=3)]
+        with patch.object(DimsInventoryClient, 'make_request', side_effect=fake_request):
+            self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(0, 1))
+            reader = threading.Thread(target=self.client.retrieve_availability, args=(self.room_id, self.resort_id, *self.window(0, 4)))
+            reader.start()
+            sent.wait(5)
+            self.client.availability_mass_update(self.room_id, self.resort_id, [day.strftime("%d-%m-%Y") for day in written], [40, 40])
+            after_write = self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(2, 4))
+            release.set()
+            reader.join()
+            availability = {entry.dtm: entry for entry in self.client.retrieve_availability(self.room_id, self.resort_id, *self.window(0, 4))}
+        self.assertEqual(windows, [self.window(0, 1), self.window(2, 4), self.window(2, 4)])
+        self.assertEqual(len(after_write), 3)
+        self.assertEqual(availability[written[0]].literal_inventory, 40)
+        self.assertEqual(availability[written[1]].literal_inventory, written[1].day)
+        self.assertEqual(availability[self.start + timedelta(days=2)].literal_inventory, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
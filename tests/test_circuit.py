@@ -0,0 +1,175 @@
+import socket
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+import requests
+
+from ignite_travel.sdk import DimsInventoryClient
+from ignite_travel.sdk.circuit import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+from ignite_travel.sdk.exceptions import CircuitOpenError
+from ignite_travel.sdk.instrumentation import Instrumentation
+from ignite_travel.sdk.retry import NO_RETRY
+
+
+CLIENT_FAULT = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        <soap:Fault>
+            <faultcode>soap:Client</faultcode>
+            <faultstring>Server was unable to process request. ---&gt; Invalid ResortId</faultstring>
+        </soap:Fault>
+    </soap:Body>
+</soap:Envelope>"""
+ROOMLIST_RESPONSE = "<RewardsCorpIMS><Rooms><Room><RoomTypeId>18178</RoomTypeId><Description>Villa</Description></Room></Rooms></RewardsCorpIMS>"
+
+
+class EventInstrumentation(Instrumentation):
+
+    def __init__(self):
+        self.events = []
+
+    def on_event(self, event):
+        self.events.append(event)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Test the circuit breaker in the request path
+    """
+
+    def setUp(self):
+        self.instrumentation = EventInstrumentation()
+        self.breaker = CircuitBreaker(failure_rate=0.5, window=4, minimum_calls=4, cool_down=30)
+        self.client = DimsInventoryClient(
+            instrumentation=self.instrumentation,
+            retry_policy=NO_RETRY,
+            circuit_breakers={"inventory": self.breaker}
+        )
+        self.ok = MagicMock(status_code=200, text=ROOMLIST_RESPONSE, content=ROOMLIST_RESPONSE.encode())
+        self.unavailable = MagicMock(status_code=503)
+        self.unavailable.raise_for_status.side_effect = requests.HTTPError("503 Server Error")
+
+    def tearDown(self):
+        self.client.close()
+
+    def call(self):
+        try:
+            self.client.get_roomlist(1056)
+        except requests.RequestException:
+            pass
+
+    def test_opens_and_fails_fast(self):
+        """
+        Test that the circuit opens at the failure rate and then raises without sending requests
+        """
+        responses = [self.ok, requests.ConnectionError("connection reset"), self.ok, self.unavailable]
+        with patch.object(self.client.session, "request", side_effect=responses) as mock_request:
+            for _ in range(4):
+                self.call()
+            with self.assertRaises(CircuitOpenError) as context:
+                self.client.get_roomlist(1056)
+        self.assertEqual(mock_request.call_count, 4)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(context.exception.service, "inventory")
+        self.assertGreater(context.exception.retry_after, 29)
+        change = self.instrumentation.events[0]
+        self.assertEqual((change.previous, change.state, change.failure_rate), (CLOSED, OPEN, 0.5))
+
+    def test_client_errors_are_not_failures(self):
+        """
+        Test that 4xx responses leave the circuit closed
+        """
+        bad_request = MagicMock(status_code=400)
+        bad_request.raise_for_status.side_effect = requests.HTTPError("400 Client Error")
+        with patch.object(self.client.session, "request", return_value=bad_request):
+            for _ in range(8):
+                self.call()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_client_faults_are_not_failures(self):
+        """
+        Test that 500 responses carrying a soap:Client fault leave the circuit closed while 429 responses open it
+        """
+        client_fault = MagicMock(status_code=500, text=CLIENT_FAULT, content=CLIENT_FAULT.encode())
+        client_fault.raise_for_status.side_effect = requests.HTTPError("500 Server Error")
+        with patch.object(self.client.session, "request", return_value=client_fault):
+            for _ in range(8):
+                self.call()
+        self.assertEqual(self.breaker.state, CLOSED)
+        too_many = MagicMock(status_code=429)
+        too_many.raise_for_status.side_effect = requests.HTTPError("429 Client Error")
+        with patch.object(self.client.session, "request", return_value=too_many):
+            for _ in range(2):
+                self.call()
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_half_open_trial(self):
+        """
+        Test that a trial request is let through after the cool-down, reopening on failure and closing on success
+        """
+        with patch("ignite_travel.sdk.circuit.time.monotonic", return_value=100.0):
+            with patch.object(self.client.session, "request", return_value=self.unavailable):
+                for _ in range(4):
+                    self.call()
+        self.assertEqual(self.breaker.state, OPEN)
+        with patch("ignite_travel.sdk.circuit.time.monotonic", return_value=131.0):
+            with patch.object(self.client.session, "request", return_value=self.unavailable):
+                self.call()
+        self.assertEqual(self.breaker.state, OPEN)
+        with patch("ignite_travel.sdk.circuit.time.monotonic", return_value=162.0):
+            with patch.object(self.client.session, "request", return_value=self.ok):
+                room_list = self.client.get_roomlist(1056)
+        self.assertEqual(room_list.rooms[0].room_id, 18178)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(
+            [(event.previous, event.state) for event in self.instrumentation.events],
+            [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+        )
+
+    def test_one_trial_at_a_time(self):
+        """
+        Test that only half_open_calls trials are in flight, and outcomes of requests sent before a change are ignored
+        """
+        publish = self.instrumentation.events.append
+        with patch("ignite_travel.sdk.circuit.time.monotonic", return_value=100.0):
+            stale = self.breaker.before_request("inventory", publish)
+            for _ in range(4):
+                self.breaker.after_request("inventory", self.breaker.before_request("inventory", publish), True, publish)
+        with patch("ignite_travel.sdk.circuit.time.monotonic", return_value=131.0):
+            trial = self.breaker.before_request("inventory", publish)
+            with self.assertRaises(CircuitOpenError):
+                self.breaker.before_request("inventory", publish)
+            self.breaker.after_request("inventory", stale, False, publish)
+            self.assertEqual(self.breaker.state, HALF_OPEN)
+            # an abandoned trial lets the next one through
+            self.breaker.after_request("inventory", trial, None, publish)
+            trial = self.breaker.before_request("inventory", publish)
+            self.breaker.after_request("inventory", trial, False, publish)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_hung_server_opens_the_circuit(self):
+        """
+        Test that requests to a server that accepts connections but never answers time out and open the circuit
+        """
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen(8)
+        url = f"http://127.0.0.1:{server.getsockname()[1]}/"
+        breaker = CircuitBreaker(failure_rate=0.5, window=2, minimum_calls=2, cool_down=30)
+        client = DimsInventoryClient(retry_policy=NO_RETRY, circuit_breakers={"inventory": breaker}, timeout=(1.0, 0.1))
+        started = time.monotonic()
+        with patch.object(DimsInventoryClient, "_INVENTORY_SERVICE_URL_", url):
+            for _ in range(2):
+                with self.assertRaises(requests.Timeout):
+                    client.get_roomlist(1056)
+            with self.assertRaises(CircuitOpenError):
+                client.get_roomlist(1056)
+        client.close()
+        server.close()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertLess(time.monotonic() - started, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
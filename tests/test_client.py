@@ -0,0 +1,96 @@
+import os
+import unittest
+import xml.etree.ElementTree as ET
+from unittest.mock import patch, MagicMock
+
+from ignite_travel.sdk import DimsInventoryClient
+
+
+class TestConnectionPool(unittest.TestCase):
+    """
+    Test the pooled session used by make_request
+    """
+
+    def setUp(self):
+        self.client = DimsInventoryClient(pool_connections=2, pool_maxsize=4, keep_alive_timeout=30)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_session_is_shared_between_calls(self):
+        """
+        Test that every call goes through the same session
+        """
+        response = MagicMock(status_code=200, text="<Message>ok</Message>")
+        with patch.object(self.client.session, "request", return_value=response) as mock_request:
+            self.client.make_request("POST", "<Body/>", "GetRoomList")
+            self.client.make_request("POST", "<Body/>", "RetrieveAvailability")
+        self.assertEqual(mock_request.call_count, 2)
+
+    def test_pool_is_configured(self):
+        """
+        Test that the adapters use the configured pool sizes
+        """
+        adapter = self.client.session.get_adapter(DimsInventoryClient._INVENTORY_SERVICE_URL_)
+        self.assertEqual(adapter._pool_connections, 2)
+        self.assertEqual(adapter._pool_maxsize, 4)
+
+    def test_idle_connections_are_dropped(self):
+        """
+        Test that connections idle for longer than keep_alive_timeout are closed before the next call
+        """
+        response = MagicMock(status_code=200, text="<Message>ok</Message>")
+        with patch.object(self.client.session, "request", return_value=response), \
+                patch.object(self.client.session, "close") as mock_close, \
+                patch("ignite_travel.sdk.client.time.monotonic", side_effect=[100.0, 110.0, 200.0]):
+            self.client.make_request("POST", "<Body/>")
+            self.client.make_request("POST", "<Body/>")
+            mock_close.assert_not_called()
+            self.client.make_request("POST", "<Body/>")
+            mock_close.assert_called_once()
+
+    def test_context_manager_closes_session(self):
+        """
+        Test that leaving the context manager closes the pooled connections
+        """
+        client = DimsInventoryClient()
+        with patch.object(client.session, "close") as mock_close:
+            with client as entered:
+                self.assertIs(entered, client)
+            mock_close.assert_called_once()
+
+
+
+class TestEnvelope(unittest.TestCase):
+    """
+    Test the precompiled SOAP envelope
+    """
+
+    def test_credentials_are_escaped(self):
+        """
+        Test that credentials with XML special characters produce a well-formed envelope
+        """
+        with patch.dict(os.environ, {"IGNITE_PASSWORD": "p&ss<word>"}):
+            client = DimsInventoryClient()
+        envelope = client.build_envelope("<GetRoomList/>")
+        client.close()
+        root = ET.fromstring(envelope)
+        self.assertEqual(root.find(".//{https://dims.ignitetravel.com/IMSXML}PassWord").text, "p&ss<word>")
+        self.assertIsNotNone(root.find(".//GetRoomList"))
+
+    def test_body_is_sent_as_bytes(self):
+        """
+        Test that the envelope reaches the transport already encoded
+        """
+        client = DimsInventoryClient()
+        response = MagicMock(status_code=200, text="<Message>ok</Message>")
+        with patch.object(client.session, "request", return_value=response) as mock_request:
+            client.make_request("POST", "<Body>Café</Body>")
+        client.close()
+        data = mock_request.call_args.kwargs["data"]
+        self.assertIsInstance(data, bytes)
+        self.assertIn("<Body>Café</Body>".encode("utf-8"), data)
+        self.assertEqual(data.decode("utf-8"), client.format_soap_envelope("<Body>Café</Body>"))
+
+if __name__ == '__main__':
+    unittest.main()
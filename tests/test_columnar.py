@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch
+from datetime import date, timedelta
+
+from ignite_travel.sdk import DimsInventoryClient
+from ignite_travel.sdk import columnar
+from ignite_travel.sdk.columnar import MISSING
+from ignite_travel.sdk.entities import RoomList, Room
+
+
+def availability_response(days):
+    """
+    An availability response with the (day, inventory_available, literal_inventory) of days, in that order
+    """
+    datesets = "".join(
+        f"<DateSet><Date>{day.strftime('%d-%m-%Y')}</Date><InventoryAvailable>{available}</InventoryAvailable>"
+        f"<LiteralInventory>{literal}</LiteralInventory></DateSet>"
+        for day, available, literal in days
+    )
+    return f"<RewardsCorpIMS><Dates>{datesets}</Dates></RewardsCorpIMS>"
+
+
+@unittest.skipIf(columnar.np is None, "numpy is not installed")
+class TestColumnarAvailability(unittest.TestCase):
+    """
+    Test the NumPy-backed availability
+    """
+
+    def setUp(self):
+        self.client = DimsInventoryClient()
+        self.resort_id = 1056
+        self.start = date.today() + timedelta(days=1)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_columns_are_sorted_by_date(self):
+        """
+        Test that retrieve_availability_columns parses the days into arrays sorted by date
+        """
+        response = availability_response([
+            (self.start + timedelta(days=1), 3, 5),
+            (self.start, 4, 5),
+        ])
+        with patch.object(DimsInventoryClient, "make_request", return_value=response):
+            columns = self.client.retrieve_availability_columns(18178, self.resort_id, self.start.isoformat(), (self.start + timedelta(days=1)).isoformat())
+        self.assertEqual(columns.dates.tolist(), [self.start.toordinal(), self.start.toordinal() + 1])
+        self.assertEqual(columns.inventory_available.tolist(), [4, 3])
+        self.assertEqual(columns.booked.tolist(), [1, 2])
+        self.assertEqual(columns.day(1), self.start + timedelta(days=1))
+        self.assertEqual([day.inventory_available for day in columns.to_availability()], [4, 3])
+
+    def test_grid_lays_rooms_out_by_day(self):
+        """
+        Test that retrieve_availability_grid builds a room x date matrix with the days DIMS did not return missing
+        """
+        end = self.start + timedelta(days=2)
+        responses = {
+            "1": availability_response([(self.start, 2, 4), (self.start + timedelta(days=1), 1, 4), (end, 0, 4)]),
+            "2": availability_response([(end, 5, 6)]),
+        }
+
+        def fake_request(method, payload, action_header="GetRoomList", service_type="inventory", idempotent=False):
+            room_id = payload.split("<RoomId>")[1].split("</RoomId>")[0]
+            return responses[room_id]
+
+        room_list = RoomList(rooms=[Room(room_id=1, room_name="Single"), Room(room_id=2, room_name="Double")])
+        with patch.object(DimsInventoryClient, "get_roomlist", return_value=room_list), \
+                patch.object(DimsInventoryClient, "make_request", side_effect=fake_request):
+            grid = self.client.retrieve_availability_grid(self.resort_id, self.start.isoformat(), end.isoformat())
+        self.assertEqual(grid.shape, (2, 3))
+        self.assertEqual(grid.room_ids.tolist(), [1, 2])
+        self.assertEqual(grid.inventory_available.tolist(), [[2, 1, 0], [MISSING, MISSING, 5]])
+        self.assertEqual(grid.booked.tolist(), [[2, 3, 4], [MISSING, MISSING, 1]])
+        self.assertEqual(grid.room(2).dates.tolist(), [end.toordinal()])
+        self.assertEqual(grid.end, end)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+from ignite_travel.sdk import DimsInventoryClient, DiskCache
+from ignite_travel.sdk.entities import Availability, LinkedRate, Room, RoomList
+
+
+ROOMLIST_RESPONSE = "<RewardsCorpIMS><Rooms><Room><RoomTypeId>18178</RoomTypeId><Description>Villa</Description></Room></Rooms></RewardsCorpIMS>"
+
+
+def availability_response(days):
+    dates = "".join(
+        f"<DateSet><Date>{day.strftime('%d-%m-%Y')}</Date><InventoryAvailable>4</InventoryAvailable><LiteralInventory>5</LiteralInventory></DateSet>"
+        for day in days
+    )
+    return f"<RewardsCorpIMS>{dates}</RewardsCorpIMS>"
+
+
+class TestDiskCache(unittest.TestCase):
+    """
+    Test the SQLite cache shared between processes
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "dims.sqlite")
+        self.now = 1000.0
+        self.cache = DiskCache(self.path, ttl=60, maxsize=3, timer=lambda: self.now)
+        self.room_list = RoomList(rooms=[Room(room_id=1, room_name="Villa", linked_rates=[LinkedRate(rate_id=7, rate_description="BAR", room_id=1)])])
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_entries_are_shared_through_the_database(self):
+        """
+        Test that an entry stored by one cache is read by another cache on the same path, as another process would
+        """
+        self.cache.set("roomlist", ("GetRoomList", 1056), self.room_list, 1056)
+        other = DiskCache(self.path, timer=lambda: self.now)
+        self.assertEqual(other.get("roomlist", ("GetRoomList", 1056)), self.room_list)
+        self.assertIsNone(other.get("roomlist", ("GetRoomList", 1057)))
+        self.assertEqual((other.info().hits, other.info().misses, other.info().size), (1, 1, 1))
+        other.close()
+
+    def test_entries_expire(self):
+        """
+        Test that entries are served until their ttl, which can be set per kind
+        """
+        cache = DiskCache(self.path, ttl=60, ttls={"bookings": 5}, timer=lambda: self.now)
+        cache.set("roomlist", ("GetRoomList", 1056), self.room_list, 1056)
+        cache.set("bookings", ("GetBookingsListWithRoomRateIds", 1056), [], 1056)
+        self.now += 10
+        self.assertIsNotNone(cache.get("roomlist", ("GetRoomList", 1056)))
+        self.assertIsNone(cache.get("bookings", ("GetBookingsListWithRoomRateIds", 1056)))
+        self.now += 60
+        self.assertIsNone(cache.get("roomlist", ("GetRoomList", 1056)))
+        with self.assertRaises(ValueError):
+            DiskCache(self.path, ttls={"rates": 5})
+        cache.close()
+
+    def test_least_recently_used_are_evicted(self):
+        """
+        Test that the database keeps at most maxsize entries, dropping those used least recently
+        """
+        for resort_id in range(3):
+            self.now += 2
+            self.cache.set("roomlist", ("GetRoomList", resort_id), self.room_list, resort_id)
+        self.now += 2
+        self.assertIsNotNone(self.cache.get("roomlist", ("GetRoomList", 0)))
+        self.now += 2
+        self.cache.set("roomlist", ("GetRoomList", 3), self.room_list, 3)
+        self.assertEqual(self.cache.info().size, 3)
+        self.assertIsNone(self.cache.get("roomlist", ("GetRoomList", 1)))
+        for resort_id in (0, 2, 3):
+            self.assertIsNotNone(self.cache.get("roomlist", ("GetRoomList", resort_id)))
+
+    def test_invalidate(self):
+        """
+        Test that entries are dropped per resort and room
+        """
+        availability = [Availability(inventory_available=4, literal_inventory=5, dtm=datetime(2025, 7, 1).date())]
+        self.cache.set("availability", ("RetrieveAvailability", 1, 10), availability, 1056, 10)
+        self.cache.set("availability", ("RetrieveAvailability", 1, 11), availability, 1056, 11)
+        self.cache.invalidate("availability", 1056, 10)
+        self.assertIsNone(self.cache.get("availability", ("RetrieveAvailability", 1, 10)))
+        self.assertEqual(self.cache.get("availability", ("RetrieveAvailability", 1, 11)), availability)
+        self.cache.invalidate("availability", 1056)
+        self.assertEqual(self.cache.info().size, 0)
+
+
+class TestClientDiskCache(unittest.TestCase):
+    """
+    Test the disk cache in the client read path
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "dims.sqlite")
+        self.start = datetime.now().date() + timedelta(days=1)
+        self.dates = [self.start + timedelta(days=i) for i in range(3)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def client(self):
+        return DimsInventoryClient(disk_cache=DiskCache(self.path))
+
+    def test_reads_are_served_across_clients(self):
+        """
+        Test that a room list fetched by one client is served to another without a request
+        """
+        response = MagicMock(status_code=200, text=ROOMLIST_RESPONSE, content=ROOMLIST_RESPONSE.encode())
+        first, second = self.client(), self.client()
+        with patch.object(first.session, "request", return_value=response) as first_request:
+            first.get_roomlist(1056)
+        with patch.object(second.session, "request", return_value=response) as second_request:
+            room_list = second.get_roomlist(1056)
+        self.assertEqual(first_request.call_count, 1)
+        self.assertEqual(second_request.call_count, 0)
+        self.assertEqual(room_list.rooms[0].room_id, 18178)
+        second.invalidate_roomlist(1056)
+        with patch.object(second.session, "request", return_value=response) as second_request:
+            second.get_roomlist(1056)
+        self.assertEqual(second_request.call_count, 1)
+        first.close()
+        second.close()
+
+    def test_writes_drop_the_availability_of_the_room(self):
+        """
+        Test that availability is fetched again after an inventory write to the room
+        """
+        client = self.client()
+        text = availability_response(self.dates)
+        response = MagicMock(status_code=200, text=text, content=text.encode())
+        start, end = self.dates[0].strftime("%Y-%m-%d"), self.dates[-1].strftime("%Y-%m-%d")
+        with patch.object(client.session, "request", return_value=response) as request:
+            client.retrieve_availability(18178, 1056, start, end)
+            availability = client.retrieve_availability(18178, 1056, start, end)
+            self.assertEqual(request.call_count, 1)
+            self.assertEqual([day.inventory_available for day in availability], [4, 4, 4])
+        with patch.object(client, "make_request", return_value="<RewardsCorpIMS><Message>Update Successful</Message></RewardsCorpIMS>"):
+            client.update_availability(18178, 1056, self.dates[0].strftime("%d-%m-%Y"), 2)
+        with patch.object(client.session, "request", return_value=response) as request:
+            client.retrieve_availability(18178, 1056, start, end)
+        self.assertEqual(request.call_count, 1)
+        client.close()
+
+    def test_failures_fall_back_to_dims(self):
+        """
+        Test that a locked database or an unreadable entry is treated as a miss and the read is sent to DIMS
+        """
+        response = MagicMock(status_code=200, text=ROOMLIST_RESPONSE, content=ROOMLIST_RESPONSE.encode())
+        client = DimsInventoryClient(disk_cache=DiskCache(self.path, timeout=0.05))
+        locker = sqlite3.connect(self.path, isolation_level=None)
+        locker.execute("BEGIN IMMEDIATE")
+        with patch.object(client.session, "request", return_value=response) as request:
+            with self.assertLogs("ignite_travel.sdk.base", level="WARNING"):
+                room_list = client.get_roomlist(1056)
+        locker.execute("ROLLBACK")
+        self.assertEqual(room_list.rooms[0].room_id, 18178)
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(client.disk_cache.info().size, 0)
+
+        with patch.object(client.session, "request", return_value=response):
+            client.get_roomlist(1056)
+        locker.execute("UPDATE entries SET value = '{\"rooms\": 1}'")
+        locker.close()
+        with patch.object(client.session, "request", return_value=response) as request:
+            with self.assertLogs("ignite_travel.sdk.base", level="WARNING"):
+                room_list = client.get_roomlist(1056)
+        self.assertEqual(room_list.rooms[0].room_id, 18178)
+        self.assertEqual(request.call_count, 1)
+        client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from ignite_travel.sdk import DimsInventoryClient, HistogramCollector, Instrumentation
+from ignite_travel.sdk.instrumentation import LatencyHistogram
+
+
+ROOMLIST_RESPONSE = """<RewardsCorpIMS>
+    <Rooms>
+        <Room><RoomTypeId>1</RoomTypeId><Description>Single Room</Description></Room>
+    </Rooms>
+</RewardsCorpIMS>"""
+
+
+class ListInstrumentation(Instrumentation):
+
+    def __init__(self):
+        self.calls = []
+
+    def on_call(self, metrics):
+        self.calls.append(metrics)
+
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    Test the per-call instrumentation hooks
+    """
+
+    def setUp(self):
+        self.instrumentation = ListInstrumentation()
+        self.client = DimsInventoryClient(instrumentation=self.instrumentation)
+        self.response = MagicMock(status_code=200, text=ROOMLIST_RESPONSE, content=ROOMLIST_RESPONSE.encode())
+
+    def test_call_reports_every_phase(self):
+        """
+        Test that a call reports its operation, phases and byte counts
+        """
+        with patch.object(self.client.session, "request", return_value=self.response):
+            self.client.get_roomlist(1056)
+        self.assertEqual(len(self.instrumentation.calls), 1)
+        metrics = self.instrumentation.calls[0]
+        self.assertEqual(metrics.operation, "GetRoomList")
+        self.assertEqual(set(metrics.phases), {"build", "network", "parse", "validate"})
+        self.assertEqual(metrics.response_bytes, len(ROOMLIST_RESPONSE))
+        self.assertGreater(metrics.request_bytes, 0)
+        self.assertGreaterEqual(metrics.total, sum(metrics.phases.values()))
+        self.assertIsNone(metrics.error)
+
+    def test_failed_call_is_reported(self):
+        """
+        Test that a call that raises is still reported with its error
+        """
+        with patch.object(self.client.session, "request", side_effect=ConnectionError("connection reset")):
+            with self.assertRaises(ConnectionError):
+                self.client.get_roomlist(1056)
+        self.assertIn("connection reset", self.instrumentation.calls[0].error)
+
+    def test_failing_hook_does_not_fail_the_call(self):
+        """
+        Test that an exception raised by a hook is not propagated to the caller
+        """
+        self.instrumentation.on_call = MagicMock(side_effect=RuntimeError("broken hook"))
+        with patch.object(self.client.session, "request", return_value=self.response):
+            room_list = self.client.get_roomlist(1056)
+        self.assertEqual(len(room_list.rooms), 1)
+
+    def test_histogram_collector(self):
+        """
+        Test that the histogram collector aggregates calls per operation
+        """
+        collector = HistogramCollector()
+        client = DimsInventoryClient(instrumentation=collector)
+        with patch.object(client.session, "request", return_value=self.response):
+            for _ in range(5):
+                client.get_roomlist(1056)
+        summary = collector.summary()
+        self.assertEqual(summary["GetRoomList"]["count"], 5)
+        self.assertEqual(summary["GetRoomList"]["response_bytes"], 5 * len(ROOMLIST_RESPONSE))
+        percentiles = collector.percentiles("GetRoomList", "parse")
+        self.assertEqual(set(percentiles), {"p50", "p95", "p99"})
+        self.assertLessEqual(percentiles["p50"], percentiles["p99"])
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """
+    Test the log-bucketed latency histogram
+    """
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for millis in range(1, 101):
+            histogram.record(millis / 1000)
+        self.assertAlmostEqual(histogram.percentile(50), 0.050, delta=0.050 * 0.05)
+        self.assertAlmostEqual(histogram.percentile(99), 0.099, delta=0.099 * 0.05)
+        self.assertEqual(histogram.percentile(100), 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+import requests
+
+from ignite_travel.sdk import DimsInventoryClient
+from ignite_travel.sdk.instrumentation import HistogramCollector
+from ignite_travel.sdk.retry import RetryPolicy
+
+
+UPDATE_RESPONSE = "<RewardsCorpIMS><Message>Update Successful</Message></RewardsCorpIMS>"
+SOAP_FAULT = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        <soap:Fault>
+            <faultcode>soap:{code}</faultcode>
+            <faultstring>Server was unable to process request. ---&gt; Invalid ResortId</faultstring>
+        </soap:Fault>
+    </soap:Body>
+</soap:Envelope>"""
+ROOMLIST_RESPONSE = "<RewardsCorpIMS><Rooms><Room><RoomTypeId>18178</RoomTypeId><Description>Villa</Description></Room></Rooms></RewardsCorpIMS>"
+
+
+def response(status_code: int, text: str = "", headers: dict = None) -> MagicMock:
+    mock = MagicMock(status_code=status_code, text=text, content=text.encode(), headers=headers or {})
+    if status_code >= 400:
+        mock.raise_for_status.side_effect = requests.HTTPError(f"{status_code} Server Error")
+    return mock
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """
+    Test the retries of failed requests
+    """
+
+    def setUp(self):
+        self.collector = HistogramCollector()
+        self.client = DimsInventoryClient(instrumentation=self.collector, retry_policy=RetryPolicy(max_attempts=3, backoff=0))
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_reads_are_retried(self):
+        """
+        Test that a read is sent again after a retryable status or a connection error, and the retries are counted
+        """
+        responses = [response(503), requests.ConnectionError("connection reset"), response(200, ROOMLIST_RESPONSE)]
+        with patch.object(self.client.session, "request", side_effect=responses) as mock_request:
+            room_list = self.client.get_roomlist(1056)
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(room_list.rooms[0].room_id, 18178)
+        summary = self.collector.summary()["GetRoomList"]
+        self.assertEqual(summary["retries"], 2)
+        self.assertEqual(summary["errors"], 0)
+
+    def test_attempts_are_bounded(self):
+        """
+        Test that the last failure is raised once max_attempts requests were sent
+        """
+        with patch.object(self.client.session, "request", side_effect=[response(502), response(502), response(502)]) as mock_request:
+            with self.assertRaises(requests.HTTPError):
+                self.client.get_roomlist(1056)
+        self.assertEqual(mock_request.call_count, 3)
+
+    def test_client_errors_are_not_retried(self):
+        """
+        Test that statuses and exceptions outside the policy are raised on the first attempt
+        """
+        with patch.object(self.client.session, "request", side_effect=[response(400)]) as mock_request:
+            with self.assertRaises(requests.HTTPError):
+                self.client.get_roomlist(1056)
+        with patch.object(self.client.session, "request", side_effect=ValueError("bad url")) as mock_request:
+            with self.assertRaises(ValueError):
+                self.client.get_roomlist(1056)
+        self.assertEqual(mock_request.call_count, 1)
+
+    def test_client_faults_are_not_retried(self):
+        """
+        Test that a 500 carrying a soap:Client fault is raised on the first attempt while a soap:Server fault is retried
+        """
+        with patch.object(self.client.session, "request", side_effect=[response(500, SOAP_FAULT.format(code="Client"))]) as mock_request:
+            with self.assertRaises(requests.HTTPError):
+                self.client.get_roomlist(1056)
+        self.assertEqual(mock_request.call_count, 1)
+        responses = [response(500, SOAP_FAULT.format(code="Server")), response(200, ROOMLIST_RESPONSE)]
+        with patch.object(self.client.session, "request", side_effect=responses) as mock_request:
+            room_list = self.client.get_roomlist(1056)
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(room_list.rooms[0].room_id, 18178)
+
+    def test_writes_are_retried_when_idempotent(self):
+        """
+        Test that inventory writes are only sent again when they are marked idempotent
+        """
+        with patch.object(self.client.session, "request", side_effect=[response(503), response(200, UPDATE_RESPONSE)]) as mock_request:
+            with self.assertRaises(requests.HTTPError):
+                self.client.update_availability(1, 1056, "01-06-2030", 5)
+        self.assertEqual(mock_request.call_count, 1)
+        with patch.object(self.client.session, "request", side_effect=[response(503), response(200, UPDATE_RESPONSE)]) as mock_request:
+            message = self.client.update_availability(1, 1056, "01-06-2030", 5, idempotent=True)
+        self.assertEqual(message, "Update Successful")
+        self.assertEqual(mock_request.call_count, 2)
+
+    def test_make_request_is_sent_once_by_default(self):
+        """
+        Test that requests sent with make_request directly, such as rates writes, are only retried when marked idempotent
+        """
+        with patch.object(self.client.session, "request", side_effect=[response(503), response(200, UPDATE_RESPONSE)]) as mock_request:
+            with self.assertRaises(requests.HTTPError):
+                self.client.make_request("POST", "<UpdateRates/>", "UpdateRates", "rates")
+        self.assertEqual(mock_request.call_count, 1)
+        with patch.object(self.client.session, "request", side_effect=[response(503), response(200, UPDATE_RESPONSE)]) as mock_request:
+            self.client.make_request("POST", "<UpdateRates/>", "UpdateRates", "rates", idempotent=True)
+        self.assertEqual(mock_request.call_count, 2)
+
+    def test_delay(self):
+        """
+        Test that the delay grows exponentially up to max_backoff, with jitter below it, and honours Retry-After
+        """
+        policy = RetryPolicy(backoff=1, max_backoff=5, jitter=False)
+        self.assertEqual([policy.delay(attempt) for attempt in range(1, 5)], [1, 2, 4, 5])
+        self.assertEqual(policy.delay(1, {"Retry-After": "3"}), 3)
+        self.assertEqual(policy.delay(1, {"Retry-After": "60"}), 5)
+        jittered = RetryPolicy(backoff=1, max_backoff=5)
+        self.assertTrue(all(0 <= jittered.delay(3) <= 4 for _ in range(100)))
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
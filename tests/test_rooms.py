@@ -45,6 +45,34 @@ class TestGetRoomList(unittest.TestCase):
         self.assertEqual(room_list.rooms[0].room_name, "Single Room")
         self.assertIsNone(room_list.rooms[0].linked_rate)
 
+    @patch.object(DimsInventoryClient, 'make_request')
+    def test_get_roomlist_multiple_linked_rates(self, mock_make_request):
+        """
+        Test that every linked rate of a room is kept
+        """
+        mock_make_request.return_value = """<RewardsCorpIMS>
+            <Rooms>
+                <Room><RoomTypeId>1</RoomTypeId><Description>Single Room</Description></Room>
+                <Room><RoomTypeId>2</RoomTypeId><Description>Double Room</Description></Room>
+            </Rooms>
+            <LinkedRates>
+                <LinkedRate><RateId>10</RateId><RateDescription>Best Available Rate</RateDescription><RoomId>1</RoomId></LinkedRate>
+                <LinkedRate><RateId>11</RateId><RateDescription>Breakfast Included</RateDescription><RoomId>1</RoomId></LinkedRate>
+                <LinkedRate><RateId>12</RateId><RateDescription>Best Available Rate</RateDescription><RoomId>3</RoomId></LinkedRate>
+                <LinkedRate><RateId>13</RateId><RoomId>2</RoomId></LinkedRate>
+            </LinkedRates>
+        </RewardsCorpIMS>"""
+        trusted_client = DimsInventoryClient(validate_entities=False)
+        for client in (self.client, trusted_client):
+            with self.subTest(validate_entities=client.validate_entities):
+                room_list = client.get_roomlist("1056")
+                single, double = room_list.rooms
+                self.assertEqual([rate.rate_id for rate in single.linked_rates], [10, 11])
+                self.assertEqual(single.linked_rate.rate_id, 11)
+                self.assertEqual(double.linked_rates, [])
+                self.assertIsNone(double.linked_rate)
+        trusted_client.close()
+
 
     def test_get_roomlist_invalid_resort_id(self):
         """
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+
+from ignite_travel.sdk import async_client
+from ignite_travel.sdk import AsyncDimsInventoryClient, DimsInventoryClient, HistogramCollector
+from ignite_travel.sdk.singleflight import SingleFlight
+
+
+ROOMLIST_RESPONSE = "<RewardsCorpIMS><Rooms><Room><RoomTypeId>18178</RoomTypeId><Description>Villa</Description></Room></Rooms></RewardsCorpIMS>"
+
+
+class TestSingleFlight(unittest.TestCase):
+    """
+    Test that identical concurrent reads share one request
+    """
+
+    def setUp(self):
+        self.collector = HistogramCollector()
+        self.sent = 0
+        self.lock = threading.Lock()
+
+    def fake_request(self, **kwargs):
+        with self.lock:
+            self.sent += 1
+        time.sleep(0.1)
+        return MagicMock(status_code=200, text=ROOMLIST_RESPONSE, content=ROOMLIST_RESPONSE.encode())
+
+    def test_identical_reads_are_coalesced(self):
+        """
+        Test that threads reading the same room list at once send a single request, other resorts are sent separately
+        """
+        client = DimsInventoryClient(instrumentation=self.collector)
+        with patch.object(client.session, "request", side_effect=self.fake_request):
+            with ThreadPoolExecutor(max_workers=6) as executor:
+                room_lists = list(executor.map(client.get_roomlist, [1056] * 5 + [1057]))
+        client.close()
+        self.assertEqual(self.sent, 2)
+        self.assertTrue(all(room_list.rooms[0].room_id == 18178 for room_list in room_lists))
+        summary = self.collector.summary()["GetRoomList"]
+        self.assertEqual(summary["count"], 6)
+        self.assertEqual(summary["coalesced"], 4)
+
+    def test_coalescing_can_be_disabled(self):
+        """
+        Test that every read is sent with coalesce_reads=False
+        """
+        client = DimsInventoryClient(coalesce_reads=False)
+        with patch.object(client.session, "request", side_effect=self.fake_request):
+            with ThreadPoolExecutor(max_workers=5) as executor:
+                list(executor.map(client.get_roomlist, [1056] * 5))
+        client.close()
+        self.assertEqual(self.sent, 5)
+
+    def test_errors_are_shared(self):
+        """
+        Test that every caller waiting on a failed call gets its error, and the next call is sent again
+        """
+        flights = SingleFlight()
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(0.05)
+            raise ConnectionError("connection reset")
+
+        def call(function):
+            try:
+                return flights.do("key", function)
+            except ConnectionError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            leader = executor.submit(call, fail)
+            started.wait()
+            followers = [executor.submit(call, lambda: self.fail("followers must not call")) for _ in range(2)]
+            errors = [future.result() for future in [leader] + followers]
+        self.assertTrue(all(isinstance(error, ConnectionError) for error in errors))
+        self.assertEqual(flights.do("key", lambda: "sent again"), ("sent again", False))
+
+
+@unittest.skipIf(async_client.httpx is None, "httpx is not installed")
+class TestAsyncSingleFlight(unittest.IsolatedAsyncioTestCase):
+    """
+    Test that identical concurrent reads share one request on the asyncio client
+    """
+
+    async def asyncSetUp(self):
+        self.client = AsyncDimsInventoryClient()
+        self.sent = 0
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def fake_request(self, **kwargs):
+        self.sent += 1
+        await asyncio.sleep(0.05)
+        return MagicMock(status_code=200, text=ROOMLIST_RESPONSE, content=ROOMLIST_RESPONSE.encode())
+
+    async def test_identical_reads_are_coalesced(self):
+        """
+        Test that tasks reading the same room list at once send a single request
+        """
+        with patch.object(self.client.session, "request", side_effect=self.fake_request):
+            room_lists = await asyncio.gather(*(self.client.get_roomlist(1056) for _ in range(5)))
+        self.assertEqual(self.sent, 1)
+        self.assertTrue(all(room_list.rooms[0].room_id == 18178 for room_list in room_lists))
+
+    async def test_cancelled_caller_does_not_cancel_the_others(self):
+        """
+        Test that the request completes for the other callers when the task that started it is cancelled
+        """
+        with patch.object(self.client.session, "request", side_effect=self.fake_request):
+            first = asyncio.ensure_future(self.client.get_roomlist(1056))
+            await asyncio.sleep(0.01)
+            second = asyncio.ensure_future(self.client.get_roomlist(1056))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            room_list = await second
+        self.assertEqual(self.sent, 1)
+        self.assertEqual(room_list.rooms[0].room_id, 18178)
+        self.assertTrue(first.cancelled())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+
+from ignite_travel.sdk import DimsInventoryClient
+from ignite_travel.sdk import throttle
+from ignite_travel.sdk.throttle import RateLimit, TokenBucket
+
+
+ROOMLIST_RESPONSE = "<RewardsCorpIMS><Rooms><Room><RoomTypeId>18178</RoomTypeId><Description>Villa</Description></Room></Rooms></RewardsCorpIMS>"
+
+
+class TestRateLimit(unittest.TestCase):
+    """
+    Test the client-side rate limits
+    """
+
+    def test_token_bucket(self):
+        """
+        Test that a burst is served at once and later requests are spaced by 1 / rate
+        """
+        with patch("ignite_travel.sdk.throttle.time.monotonic", return_value=100.0):
+            bucket = TokenBucket(rate=10, burst=2)
+            self.assertEqual([bucket.reserve() for _ in range(4)], [0.0, 0.0, 0.1, 0.2])
+        with patch("ignite_travel.sdk.throttle.time.monotonic", return_value=101.0):
+            self.assertEqual(bucket.reserve(), 0.0)
+
+    def test_in_flight_requests_are_bounded(self):
+        """
+        Test that max_in_flight bounds the concurrent requests of every thread using the client, per service
+        """
+        client = DimsInventoryClient(rate_limits={"inventory": RateLimit(max_in_flight=2)})
+        lock = threading.Lock()
+        in_flight = peak = 0
+
+        def fake_request(**kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return MagicMock(status_code=200, text=ROOMLIST_RESPONSE, content=ROOMLIST_RESPONSE.encode())
+
+        with patch.object(client.session, "request", side_effect=fake_request):
+            with ThreadPoolExecutor(max_workers=6) as executor:
+                list(executor.map(client.get_roomlist, range(1056, 1062)))
+        client.close()
+        self.assertEqual(peak, 2)
+
+    def test_slots_are_shared_by_threads_and_event_loops(self):
+        """
+        Test that sync callers and coroutines of several event loops share the max_in_flight slots of one instance
+        """
+        limit = RateLimit(max_in_flight=2)
+        lock = threading.Lock()
+        in_flight = peak = 0
+
+        def enter():
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+
+        def leave():
+            nonlocal in_flight
+            with lock:
+                in_flight -= 1
+
+        def sync_request():
+            with limit.acquire():
+                enter()
+                time.sleep(0.02)
+                leave()
+
+        async def async_request():
+            async with limit.acquire_async():
+                enter()
+                await asyncio.sleep(0.02)
+                leave()
+
+        async def async_requests():
+            await asyncio.gather(*(async_request() for _ in range(3)))
+
+        threads = [threading.Thread(target=sync_request) for _ in range(3)]
+        threads += [threading.Thread(target=asyncio.run, args=(async_requests(),)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # a new event loop reuses the same slots
+        asyncio.run(async_requests())
+        self.assertEqual(peak, 2)
+        self.assertEqual(in_flight, 0)
+
+    def test_waiters_are_served_in_order(self):
+        """
+        Test that coroutines get a released slot in the order they started waiting, newcomers do not jump the queue
+        and a cancelled waiter passes its turn on
+        """
+        limit = RateLimit(max_in_flight=1)
+        served = []
+
+        async def request(index: int):
+            async with limit.acquire_async():
+                served.append(index)
+                await asyncio.sleep(0.005)
+
+        async def requests():
+            async with limit.acquire_async():
+                tasks = []
+                for index in range(6):
+                    tasks.append(asyncio.create_task(request(index)))
+                    # let each task start waiting before the next one is created
+                    await asyncio.sleep(0)
+                tasks[2].cancel()
+            # arrives as the slot is released, it queues behind the coroutines already waiting
+            await request("late")
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run(requests())
+        self.assertEqual(served, [0, 1, 3, 4, 5, "late"])
+        # the slot is free again
+        with limit.acquire():
+            pass
+
+    def test_requests_are_spaced(self):
+        """
+        Test that requests beyond the burst wait for the bucket to refill
+        """
+        client = DimsInventoryClient(rate_limits={"inventory": RateLimit(rate=50, burst=1)})
+        response = MagicMock(status_code=200, text=ROOMLIST_RESPONSE, content=ROOMLIST_RESPONSE.encode())
+        started = time.monotonic()
+        with patch.object(client.session, "request", return_value=response):
+            for _ in range(5):
+                client.get_roomlist(1056)
+        client.close()
+        self.assertGreaterEqual(time.monotonic() - started, 0.07)
+
+    def test_invalid_limits(self):
+        """
+        Test that limits of unknown services and non-positive limits are refused
+        """
+        with self.assertRaises(ValueError):
+            DimsInventoryClient(rate_limits={"bookings": RateLimit(rate=1)})
+        with self.assertRaises(ValueError):
+            RateLimit(rate=0)
+        with self.assertRaises(ValueError):
+            RateLimit(max_in_flight=0)
+
+    @unittest.skipIf(throttle.fcntl is None, "file locks are not available")
+    def test_limits_are_shared_through_files(self):
+        """
+        Test that limits with the same shared_path share their tokens and slots, as separate processes would
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "inventory")
+            first = RateLimit(rate=10, burst=1, max_in_flight=1, shared_path=path)
+            second = RateLimit(rate=10, burst=1, max_in_flight=1, shared_path=path)
+            self.assertEqual(first._bucket.reserve(), 0.0)
+            self.assertGreater(second._bucket.reserve(), 0.0)
+            slot = first._slots.try_acquire()
+            self.assertIsNotNone(slot)
+            self.assertIsNone(second._slots.try_acquire())
+            first._slots.release(slot)
+            slot = second._slots.try_acquire()
+            self.assertIsNotNone(slot)
+            second._slots.release(slot)
+
+
+if __name__ == '__main__':
+    unittest.main()
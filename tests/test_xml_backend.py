@@ -0,0 +1,132 @@
+import unittest
+from io import BytesIO
+
+from ignite_travel.sdk import DimsInventoryClient
+from ignite_travel.sdk.base import BookingEventReader
+from ignite_travel.sdk.xml_backend import XmlBackend, etree, get_backend
+
+
+ROOMLIST = """<?xml version="1.0" encoding="utf-8"?>
+<RewardsCorpIMS>
+    <Rooms>
+        <Room><RoomTypeId>18178</RoomTypeId><Description>Prestige Water Villa</Description></Room>
+        <Room><RoomTypeId>18179</RoomTypeId><Description>Garden Suite</Description></Room>
+    </Rooms>
+    <LinkedRates>
+        <LinkedRate><RateId>5</RateId><RateDescription>Room Only</RateDescription><RoomId>18178</RoomId></LinkedRate>
+        <LinkedRate><RateId>6</RateId><RoomId>18179</RoomId></LinkedRate>
+    </LinkedRates>
+</RewardsCorpIMS>"""
+
+AVAILABILITY = """<RewardsCorpIMS><Dates>
+    <DateSet><Date>01-06-2025</Date><InventoryAvailable>3</InventoryAvailable><LiteralInventory>5</LiteralInventory></DateSet>
+    <DateSet><InventoryAvailable>4</InventoryAvailable><LiteralInventory>5</LiteralInventory><Date>02-06-2025</Date></DateSet>
+</Dates></RewardsCorpIMS>"""
+
+BOOKINGS = """<RewardsCorpIMS><Bookings><Booking>
+    <BookingDetails>
+        <BookingNumber>E-IG1RT</BookingNumber>
+        <Rooms><Room><RoomDetails>
+            <BookingId>7</BookingId>
+            <RoomDescription>Prestige Water Villa</RoomDescription>
+            <RoomId>18178</RoomId>
+            <DateBooked>01-06-2025 10:30:00</DateBooked>
+            <CheckIn>03-06-2025</CheckIn>
+            <Nights>2</Nights>
+            <Adults>2</Adults>
+            <Children>1</Children>
+            <Infants>0</Infants>
+            <Surname>Smith &amp; Sons</Surname>
+        </RoomDetails></Room></Rooms>
+        <ResortId>1056</ResortId>
+        <ResortName>Best In Town</ResortName>
+        <ResortCurrency>USD</ResortCurrency>
+        <BookingStatusId>2</BookingStatusId>
+        <BookingStatusDescription>Booking Confirmed</BookingStatusDescription>
+    </BookingDetails>
+</Booking></Bookings></RewardsCorpIMS>"""
+
+CANCELLED = """<RewardsCorpIMS><Message>List of Cancelled Bookings</Message><Bookings>
+    <Booking>
+        <BookingId>1644663</BookingId>
+        <BookingNumber>E-IG1237837MG</BookingNumber>
+        <BookingStatusId>5</BookingStatusId>
+        <BookingStatusDescription>Cancelled booking</BookingStatusDescription>
+        <BookingChangeDate>26-05-2025 09:48:00</BookingChangeDate>
+    </Booking>
+    <Booking>
+        <Details>
+            <BookingId>1644664</BookingId>
+            <BookingNumber>E-IG1237838MG</BookingNumber>
+            <BookingStatusId>5</BookingStatusId>
+            <BookingStatusDescription>Cancelled booking</BookingStatusDescription>
+            <BookingChangeDate>27-05-2025 10:00:00</BookingChangeDate>
+        </Details>
+    </Booking>
+</Bookings></RewardsCorpIMS>"""
+
+
+class TestXmlBackend(unittest.TestCase):
+    """
+    Test the XML parsing backends
+    """
+
+    def test_get_backend(self):
+        """
+        Test that backends are looked up by name and unknown names are refused
+        """
+        self.assertIsInstance(get_backend("stdlib"), XmlBackend)
+        backend = XmlBackend()
+        self.assertIs(get_backend(backend), backend)
+        # lxml is opt-in, it is not faster on every response
+        self.assertEqual(get_backend().name, "stdlib")
+        with self.assertRaises(ValueError):
+            get_backend("sax")
+
+    def test_descendant_search_skips_the_element(self):
+        """
+        Test that the descendant fast path matches ElementPath, which never returns the element searched from
+        """
+        backend = XmlBackend()
+        root = backend.fromstring("<Room><Room><RoomId>1</RoomId></Room><RoomId>2</RoomId></Room>")
+        self.assertEqual(len(backend.findall(root, ".//Room")), len(root.findall(".//Room")))
+        self.assertEqual(backend.find(root, ".//RoomId").text, "1")
+        self.assertIsNone(backend.find(root, ".//Rate"))
+        self.assertEqual(backend.texts(root, ("RoomId", "Rate")), ["2", None])
+
+    @unittest.skipIf(etree is None, "lxml is not installed")
+    def test_backends_parse_alike(self):
+        """
+        Test that lxml builds the same entities as the standard library for every response type
+        """
+        clients = [DimsInventoryClient(xml_backend=backend) for backend in ("stdlib", "lxml")]
+        try:
+            for parse, response in (("_parse_roomlist", ROOMLIST), ("_parse_availability", AVAILABILITY),
+                                    ("_parse_bookings", BOOKINGS), ("_parse_cancelled_bookings", CANCELLED)):
+                with self.subTest(parse=parse):
+                    stdlib, lxml = (getattr(client, parse)(response) for client in clients)
+                    self.assertEqual(repr(lxml), repr(stdlib))
+            streamed = [
+                list(BookingEventReader(client._parse_booking).consume(client.xml.iterparse(BytesIO(BOOKINGS.encode()), events=("start", "end"))))
+                for client in clients
+            ]
+            self.assertEqual(streamed[1], streamed[0])
+            self.assertEqual(streamed[0][0].rooms[0].surname, "Smith & Sons")
+        finally:
+            for client in clients:
+                client.close()
+
+    @unittest.skipIf(etree is None, "lxml is not installed")
+    def test_lxml_does_not_resolve_entities(self):
+        """
+        Test that the lxml backend leaves external entities unresolved
+        """
+        backend = get_backend("lxml")
+        root = backend.fromstring(
+            '<?xml version="1.0"?><!DOCTYPE r [<!ENTITY secret SYSTEM "file:///etc/passwd">]><r><Message>&secret;</Message></r>'
+        )
+        self.assertFalse(backend.find(root, "Message").text)
+
+
+if __name__ == '__main__':
+    unittest.main()